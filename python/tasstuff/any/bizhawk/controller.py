@@ -1,4 +1,10 @@
+import sys
+
+# inputs are made in bulk, so the ones that are just values don't get a
+# __dict__. groups and anything else that doesn't declare __slots__ still do.
 class Input():
+    __slots__ = ("name", "held")
+
     def __init__(self, name):
         self.name     = name
         self.held     = False
@@ -35,6 +41,19 @@ class Input():
         # to analyze them 
         self.release()
 
+    def mnemonicLayout(self):
+        # how this input's mnemonic is laid out, for mnemonic.MnemonicFormat
+        #
+        # a list of tokens, each one of:
+        #
+        # - a string, which is written as is
+        #
+        # - a Button, which takes one character
+        #
+        # - an (AnalogInput, width) tuple, which is the whole number value
+        #   right justified in that many characters
+        raise NotImplementedError("This input doesn't have a fixed mnemonic layout, sorry!")
+
 class InputGroup(Input):
     def __init__(self, name):
         super().__init__(name)
@@ -66,12 +85,15 @@ class InputGroup(Input):
         self.children.append(child)
 
 class Button(Input):
+    __slots__ = ("pressed", "onStr", "offStr")
+
     def __init__(self, name, onString, offString="."):
         super().__init__(name)
 
+        # every button shares the same few mnemonic strings
         self.pressed = False
-        self.onStr   = onString
-        self.offStr  = offString
+        self.onStr   = sys.intern(onString)
+        self.offStr  = sys.intern(offString)
     
     def reset(self):
         self.pressed = False
@@ -103,7 +125,12 @@ class Button(Input):
         else:
             self.press()
 
+    def mnemonicLayout(self):
+        return [self]
+
 class AnalogInput(Input):
+    __slots__ = ("min", "max", "center", "current")
+
     def __init__(self, name, minVal, maxVal, center = 0):
         super().__init__(name)
 
@@ -178,6 +205,9 @@ class SnesConsole(InputGroup):
         self.resetBttn.fromMnemonic(mnemonic[0])
         self.power.fromMnemonic(mnemonic[1])
 
+    def mnemonicLayout(self):
+        return [self.resetBttn, self.power]
+
 class SnesMouse(InputGroup):
     def __init__(self, name="SNES Mouse"):
         super().__init__(name)
@@ -213,6 +243,9 @@ class SnesMouse(InputGroup):
         self.l.fromMnemonic(msegs[2][0])
         self.r.fromMnemonic(msegs[2][1])
 
+    def mnemonicLayout(self):
+        return [(self.x, 5), ",", (self.y, 5), ",", self.l, self.r]
+
 class SnesController(InputGroup):
     def __init__(self, name="SNES Controller"):
         super().__init__(name)
@@ -269,9 +302,18 @@ class SnesController(InputGroup):
         self.l.fromMnemonic(     mnemonic[10])
         self.r.fromMnemonic(     mnemonic[11])
 
+    def mnemonicLayout(self):
+        return list(self.children)
+
 
 # specifically, the controller group needed for mario paint
 class SnesPreset_MarioPaint(InputGroup):
+    # what BizHawk calls each column, for the LogKey line of an input log
+    logKey = ("#Reset|Power|"
+              "#P1 Mouse X|P1 Mouse Y|P1 Mouse Left|P1 Mouse Right|"
+              "#P2 Up|P2 Down|P2 Left|P2 Right|P2 Select|P2 Start|"
+              "P2 Y|P2 B|P2 X|P2 A|P2 L|P2 R|")
+
     def __init__(self, name="Mario Paint Controls"):
         super().__init__(name)
 
@@ -324,6 +366,11 @@ class SnesPreset_MarioPaint(InputGroup):
         self.p1.fromMnemonic(     mSegs[2])
         self.p2.fromMnemonic(     mSegs[3])
 
+    def mnemonicLayout(self):
+        return (["|"] + self.console.mnemonicLayout() +
+                ["|"] + self.p1.mnemonicLayout() +
+                ["|"] + self.p2.mnemonicLayout() + ["|"])
+
 
     # I think this part is cool, though
     def __repr__(self):
@@ -0,0 +1,243 @@
+# Checkpoints for getting to any frame of a piano roll without replaying the
+# whole thing - what TAStudio calls the greenzone.
+#
+# A Greenzone snapshots where things stand every so many frames: the frame's
+# packed controller state, plus whatever else builds up frame by frame that
+# the caller wants tracked - where Mario Paint's cursor is, say. That's
+# worked out by a step function, given the last frame's tracked state and
+# this frame's packed input.
+#
+# Getting to a frame means starting from the nearest checkpoint at or before
+# it - or from the last frame sought, if that's nearer - and replaying just
+# the frames in between, so as long as that checkpoint's still around, no
+# more than interval frames get replayed.
+# Checkpoints are kept to a memory budget, and the ones used least recently
+# go first when it's over. The state before the first frame is always kept,
+# so any frame can still be got to, just slower.
+import collections
+import sys
+
+from tasstuff.any.bizhawk.history import PackedPianoRoll
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+
+# a rough allowance for the dict entry each checkpoint is filed under
+_ENTRY_OVERHEAD = 100
+
+class Checkpoint():
+    """
+    Where things stood just after a frame.
+    """
+    __slots__ = ("frame", "bits", "axes", "tracked")
+
+    def __init__(self, frame, bits, axes, tracked):
+        """Creates a checkpoint.
+
+        Args:
+            frame (int): frame it's for. -1 is before the first frame.
+            bits (int): button bits on the frame
+            axes (tuple): one value per analog input on the frame
+            tracked (object): whatever the step function's keeping track of
+        """
+        self.frame   = frame
+        self.bits    = bits
+        self.axes    = axes
+        self.tracked = tracked
+
+def _sizeOf(value):
+    # a rough count of the bytes a checkpoint's holding on to
+    ret = sys.getsizeof(value)
+
+    if (isinstance(value, Checkpoint)):
+        ret = ret + _sizeOf(value.axes) + _sizeOf(value.tracked)
+    elif (isinstance(value, (tuple, list))):
+        ret = ret + sum(_sizeOf(v) for v in value)
+
+    return ret
+
+class Greenzone():
+    """
+    Checkpoints every so many frames of a piano roll, for seeking around it.
+    """
+    def __init__(self, roll, controller, interval=256, budget=16 << 20,
+                 step=None, start=None):
+        """Creates a greenzone with nothing in it yet. Checkpoints are made as
+        frames get sought to.
+
+        Args:
+            roll (PianoRoll): frames to seek around, or any other roll with an
+                input(frame) and a length. A PackedPianoRoll's frames are
+                read already packed.
+            controller (Input): controller the frames are for. It needs a
+                mnemonicLayout().
+            interval (uint, optional): frames between checkpoints. Defaults
+                to 256.
+            budget (uint, optional): bytes the checkpoints can take up, more
+                or less. Defaults to 16 MiB.
+            step (function, optional): (tracked, bits, axes) -> tracked, for
+                the next frame. Defaults to None, for nothing tracked.
+            start (object, optional): what's tracked before the first frame.
+                Defaults to None.
+
+        Raises:
+            ValueError: interval is less than 1
+        """
+        if (interval < 1):
+            raise ValueError(f"Can't checkpoint every {interval} frames!")
+
+        self.roll       = roll
+        self.controller = controller
+        self.format     = MnemonicFormat(controller)
+        self.interval   = interval
+        self.budget     = budget
+        self.step       = step
+
+        self.start = Checkpoint(-1, 0, tuple(a.center
+                                             for a in self.format.analogs),
+                                start)
+
+        # frame -> Checkpoint, least recently used first
+        self.checkpoints = collections.OrderedDict()
+
+        # bytes the checkpoints take up, more or less
+        self.used = 0
+
+        # frames replayed, over every seek
+        self.replayed = 0
+
+        # whatever was sought last, so scrubbing forward carries on from it
+        self._cursor = self.start
+
+    def __len__(self):
+        return len(self.checkpoints)
+
+    def _frames(self, start, stop):
+        # packed states for a range of frames
+        if (isinstance(self.roll, PackedPianoRoll)):
+            ret = [self.roll.state(f) for f in range(start, stop)]
+        else:
+            bits, axes = self.format.parseMany([self.roll.input(f)
+                                                for f in range(start, stop)])
+
+            if (len(axes) > 0):
+                ret = list(zip(bits, zip(*axes)))
+            else:
+                ret = [(b, ()) for b in bits]
+
+        return ret
+
+    def _keep(self, checkpoint):
+        size = _sizeOf(checkpoint) + _ENTRY_OVERHEAD
+
+        if (checkpoint.frame in self.checkpoints):
+            self._forget(checkpoint.frame)
+
+        self.checkpoints[checkpoint.frame] = checkpoint
+        self.used = self.used + size
+
+        # the newest one stays, even if it's over the budget on its own
+        while ((self.used > self.budget) and (len(self.checkpoints) > 1)):
+            self._forget(next(iter(self.checkpoints)))
+
+    def _forget(self, frame):
+        self.used = self.used - (_sizeOf(self.checkpoints.pop(frame)) +
+                                 _ENTRY_OVERHEAD)
+
+    def _nearest(self, frame):
+        # the closest checkpoint at or before frame, on the interval's grid
+        at = ((frame + 1) // self.interval) * self.interval - 1
+
+        while ((at >= 0) and (at not in self.checkpoints)):
+            at = at - self.interval
+
+        if (at < 0):
+            ret = self.start
+        else:
+            ret = self.checkpoints[at]
+            self.checkpoints.move_to_end(at)
+
+        if (ret.frame < self._cursor.frame <= frame):
+            ret = self._cursor
+
+        return ret
+
+    def seek(self, frame):
+        """Works out where things stand just after a frame.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            Checkpoint: the state for the frame
+        """
+        if ((frame < 0) or (frame >= len(self.roll))):
+            raise IndexError(f"No frame {frame} in a roll of {len(self.roll)}!")
+
+        ret = self._nearest(frame)
+
+        if (ret.frame < frame):
+            step    = self.step
+            tracked = ret.tracked
+            current = ret.frame + 1
+
+            for bits, axes in self._frames(current, frame + 1):
+                if (step is not None):
+                    tracked = step(tracked, bits, axes)
+
+                # checkpoints are kept on the way past them
+                if (0 == (current + 1) % self.interval):
+                    self._keep(Checkpoint(current, bits, axes, tracked))
+
+                current = current + 1
+
+            self.replayed = self.replayed + (frame - ret.frame)
+
+            if (frame in self.checkpoints):
+                ret = self.checkpoints[frame]
+            else:
+                ret = Checkpoint(frame, bits, axes, tracked)
+
+        self._cursor = ret
+
+        return ret
+
+    def load(self, frame):
+        """Puts a frame's controller state onto the controller, like its
+        fromMnemonic would.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            object: whatever's tracked just after the frame
+        """
+        found = self.seek(frame)
+
+        self.controller.release()
+        self.format.apply(found.bits, found.axes)
+
+        return found.tracked
+
+    def invalidate(self, frame):
+        """Forgets every checkpoint from a frame on, for when the roll's been
+        changed there.
+
+        Args:
+            frame (uint): first frame that changed
+        """
+        for stale in [f for f in self.checkpoints if (f >= frame)]:
+            self._forget(stale)
+
+        if (self._cursor.frame >= frame):
+            self._cursor = self.start
+
+    def clear(self):
+        """Forgets every checkpoint."""
+        self.checkpoints.clear()
+        self.used    = 0
+        self._cursor = self.start
@@ -1,5 +1,14 @@
+import array
+import bisect
+import itertools
+import operator
+
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+
 class PianoRollEntry():
     # at the end of the day, this is just a frame and a set of inputs
+    __slots__ = ("input", "frame")
+
     def __init__(self, inpt="", frame=-1):
         self.input = inpt
         self.frame = frame
@@ -13,4 +22,856 @@ class PianoRoll():
     def addFrame(self, inpt):
         swp = PianoRollEntry(inpt, self.currentFrame)
         self.frames.append(swp)
-        self.currentFrame = self.currentFrame + 1
\ No newline at end of file
+        self.currentFrame = self.currentFrame + 1
+
+    def __len__(self):
+        return self.currentFrame
+
+    def input(self, frame):
+        """Gets a frame's mnemonic.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Returns:
+            str: the mnemonic
+        """
+        return self.frames[frame].input
+
+    def inputs(self):
+        """Goes through every frame's mnemonic, start to finish.
+
+        Yields:
+            str: the mnemonic for each frame
+        """
+        for entry in self.frames:
+            yield entry.input
+
+# smallest array typecodes that hold whole numbers in a range, signed first
+_INT_TYPECODES = ["b", "B", "h", "H", "i", "I", "l", "L", "q", "Q"]
+
+def _typecodeFor(minVal, maxVal):
+    ret = "d"
+
+    if ((minVal == int(minVal)) and (maxVal == int(maxVal))):
+        for code in _INT_TYPECODES:
+            bits = array.array(code).itemsize * 8
+
+            if (code.islower()):
+                low  = -(1 << (bits - 1))
+                high = (1 << (bits - 1)) - 1
+            else:
+                low  = 0
+                high = (1 << bits) - 1
+
+            if ((low <= minVal) and (maxVal <= high)):
+                ret = code
+                break
+
+    return ret
+
+class PackedPianoRoll():
+    """
+    A piano roll kept as columns of numbers instead of strings.
+    """
+    def __init__(self, controller):
+        """Creates an empty roll for a controller layout.
+
+        Each frame is stored as one integer of button bits - bit n is the nth
+        button in the controller's mnemonic layout - plus one number per
+        analog input, in a typed array sized to that input's range.
+        Mnemonics are only built when something asks for them.
+
+        Args:
+            controller (Input): controller the frames are for. It needs a
+                mnemonicLayout().
+        """
+        self.controller = controller
+        self.format     = MnemonicFormat(controller)
+        self.buttons    = self.format.buttons
+        self.analogs    = self.format.analogs
+
+        self.buttonBits = array.array(_typecodeFor(0,
+                                      (1 << len(self.buttons)) - 1))
+        self.axes       = [array.array(_typecodeFor(a.min, a.max))
+                           for a in self.analogs]
+
+        self.currentFrame = 0
+
+    def __len__(self):
+        return self.currentFrame
+
+    def buttonMask(self, button):
+        """Gets the bit a button is stored in.
+
+        Args:
+            button (Button): one of the controller's buttons
+
+        Returns:
+            int: a single set bit
+        """
+        return self.format.buttonMask(button)
+
+    def addState(self, bits, axes):
+        """Adds a frame that's already packed. Analog values outside their
+        input's range are clamped into it, same as fromMnemonic.
+
+        Args:
+            bits (int): button bits
+            axes (list): one value per analog input, in order
+        """
+        self.buttonBits.append(bits)
+
+        for analog, column, value in zip(self.analogs, self.axes, axes):
+            column.append(self._fit(analog, column, value))
+
+        self.currentFrame = self.currentFrame + 1
+
+    def addController(self):
+        """Adds a frame from whatever the controller is doing right now."""
+        self.addState(*self.format.pack())
+
+    def addFrame(self, inpt):
+        """Adds a frame from its mnemonic.
+
+        Args:
+            inpt (str): mnemonic for the frame
+        """
+        self.addState(*self.format.parse(inpt))
+
+    def addFrames(self, inpts):
+        """Adds a whole batch of frames from their mnemonics at once. Analog
+        values are clamped the same as addState's.
+
+        Args:
+            inpts (list): mnemonics, one per frame, in order
+        """
+        bits, axes = self.format.parseMany(inpts, self.buttonBits.typecode,
+                                           [a.typecode for a in self.axes])
+
+        self.buttonBits.extend(bits)
+
+        for column, values in zip(self.axes, axes):
+            column.extend(values)
+
+        self.currentFrame = self.currentFrame + len(bits)
+
+    def _fit(self, analog, column, value):
+        # clamped so it fits the column, and whole number columns can't take
+        # floats
+        ret = min(max(value, analog.min), analog.max)
+
+        if ("d" != column.typecode):
+            ret = int(ret)
+
+        return ret
+
+    def state(self, frame):
+        """Gets a frame's packed state.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Returns:
+            tuple: (button bits, tuple of analog values)
+        """
+        return (self.buttonBits[frame],
+                tuple(column[frame] for column in self.axes))
+
+    def input(self, frame):
+        """Builds a frame's mnemonic.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Returns:
+            str: the mnemonic
+        """
+        return self.format.serialize(*self.state(frame))
+
+    def inputs(self):
+        """Goes through every frame's mnemonic, start to finish.
+
+        Yields:
+            str: the mnemonic for each frame
+        """
+        # a chunk at a time, so nothing huge gets built all at once
+        for start in range(0, self.currentFrame, 65536):
+            end = start + 65536
+
+            yield from self.format.serializeMany(self.buttonBits[start:end],
+                                                 [column[start:end]
+                                                  for column in self.axes])
+
+    def countHeld(self, button):
+        """Counts the frames a button is down on.
+
+        Args:
+            button (Button): one of the controller's buttons
+
+        Returns:
+            int: how many frames it's down on
+        """
+        mask = self.buttonMask(button)
+
+        # all builtins, so no Python level loop
+        return sum(map(bool, map(mask.__and__, self.buttonBits)))
+
+    def toRoll(self):
+        """Builds an ordinary piano roll with every mnemonic filled in.
+
+        Returns:
+            PianoRoll: the same frames
+        """
+        ret = PianoRoll()
+
+        for inpt in self.inputs():
+            ret.addFrame(inpt)
+
+        return ret
+
+class RunLengthPianoRoll():
+    """
+    A piano roll kept as runs of identical frames.
+    """
+    def __init__(self):
+        """Creates an empty roll.
+
+        Each run is a mnemonic and the frame just past its end, so a wait of
+        a thousand frames costs the same as a wait of one. Finding a frame is
+        a binary search over the ends.
+        """
+        self.states = []
+        self.ends   = array.array("Q")
+
+        self.currentFrame = 0
+
+    def __len__(self):
+        return self.currentFrame
+
+    def addRun(self, inpt, count):
+        """Adds the same frame a number of times over.
+
+        Args:
+            inpt (str): mnemonic for the frames
+            count (uint): how many frames
+        """
+        if (count > 0):
+            self.currentFrame = self.currentFrame + count
+
+            if ((len(self.states) > 0) and (self.states[-1] == inpt)):
+                self.ends[-1] = self.currentFrame
+            else:
+                self.states.append(inpt)
+                self.ends.append(self.currentFrame)
+
+    def addFrame(self, inpt):
+        """Adds a frame.
+
+        Args:
+            inpt (str): mnemonic for the frame
+        """
+        self.addRun(inpt, 1)
+
+    def addFrames(self, inpts):
+        """Adds a whole batch of frames.
+
+        Args:
+            inpts (iterable): mnemonics, one per frame, in order
+        """
+        for inpt, group in itertools.groupby(inpts):
+            self.addRun(inpt, sum(1 for ignored in group))
+
+    def _runAt(self, frame):
+        if ((frame < 0) or (frame >= self.currentFrame)):
+            raise IndexError(f"No frame {frame} in a roll of {len(self)}!")
+
+        return bisect.bisect_right(self.ends, frame)
+
+    def input(self, frame):
+        """Gets a frame's mnemonic.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            str: the mnemonic
+        """
+        return self.states[self._runAt(frame)]
+
+    def entry(self, frame):
+        """Gets a frame.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            PianoRollEntry: that frame
+        """
+        return PianoRollEntry(self.input(frame), frame)
+
+    def runs(self):
+        """Goes through the runs, start to finish.
+
+        Yields:
+            tuple: (mnemonic, how many frames in a row)
+        """
+        start = 0
+
+        for inpt, end in zip(self.states, self.ends):
+            yield inpt, end - start
+            start = end
+
+    def inputs(self):
+        """Goes through every frame's mnemonic, start to finish.
+
+        Yields:
+            str: the mnemonic for each frame
+        """
+        for inpt, count in self.runs():
+            yield from itertools.repeat(inpt, count)
+
+    def toRoll(self):
+        """Builds an ordinary piano roll with every frame filled in.
+
+        Returns:
+            PianoRoll: the same frames
+        """
+        ret = PianoRoll()
+
+        for inpt in self.inputs():
+            ret.addFrame(inpt)
+
+        return ret
+
+def _runsOf(roll):
+    # (mnemonic, count) runs for any roll, with or without runs of its own
+    if (hasattr(roll, "runs")):
+        ret = roll.runs()
+    else:
+        ret = ((inpt, sum(1 for ignored in group))
+               for inpt, group in itertools.groupby(roll.inputs()))
+
+    return ret
+
+class RollDiff():
+    """
+    Where two piano rolls have different frames.
+    """
+    def __init__(self, ranges, leftLength, rightLength):
+        """Records a diff.
+
+        Args:
+            ranges (list): (first frame, frame just past the last) for each
+                stretch of frames that differ, in order
+            leftLength (uint): how many frames the first roll has
+            rightLength (uint): how many frames the second roll has
+        """
+        self.ranges      = ranges
+        self.leftLength  = leftLength
+        self.rightLength = rightLength
+
+        # the first frame they disagree on, or None if they never do. a roll
+        # that stops early disagrees from where it stops
+        self.firstDesync = ranges[0][0] if (len(ranges) > 0) else None
+
+    def __bool__(self):
+        return len(self.ranges) > 0
+
+    def changedFrames(self):
+        """Counts the frames that differ.
+
+        Returns:
+            uint: frames in all the ranges together
+        """
+        return sum(end - start for start, end in self.ranges)
+
+def diffRolls(left, right):
+    """Finds every frame where two piano rolls differ.
+
+    Run length rolls are walked a run at a time, so long runs are compared
+    in far fewer steps than they have frames. Two rolls that are neither are
+    compared frame by frame through builtins instead.
+
+    Args:
+        left (PianoRoll): first roll, or anything with runs() or inputs()
+        right (PianoRoll): second roll, same
+
+    Returns:
+        RollDiff: the differences
+    """
+    if (not (hasattr(left, "runs") or hasattr(right, "runs"))):
+        return _diffFrames(left, right)
+
+    ranges = []
+    frame  = 0
+
+    leftRuns  = _runsOf(left)
+    rightRuns = _runsOf(right)
+
+    leftInput,  leftLeft  = next(leftRuns,  (None, 0))
+    rightInput, rightLeft = next(rightRuns, (None, 0))
+
+    # every frame either side has, counted as runs come in
+    leftLength  = leftLeft
+    rightLength = rightLeft
+
+    while ((leftLeft > 0) or (rightLeft > 0)):
+        if (0 == leftLeft):
+            # left's run out, everything else on the right is different
+            step = rightLeft
+            same = False
+        elif (0 == rightLeft):
+            step = leftLeft
+            same = False
+        else:
+            step = min(leftLeft, rightLeft)
+            same = (leftInput == rightInput)
+
+        if (not same):
+            if ((len(ranges) > 0) and (ranges[-1][1] == frame)):
+                ranges[-1] = (ranges[-1][0], frame + step)
+            else:
+                ranges.append((frame, frame + step))
+
+        frame = frame + step
+
+        if (leftLeft > 0):
+            leftLeft = leftLeft - step
+
+            if (0 == leftLeft):
+                leftInput, leftLeft = next(leftRuns, (None, 0))
+                leftLength = leftLength + leftLeft
+
+        if (rightLeft > 0):
+            rightLeft = rightLeft - step
+
+            if (0 == rightLeft):
+                rightInput, rightLeft = next(rightRuns, (None, 0))
+                rightLength = rightLength + rightLeft
+
+    return RollDiff(ranges, leftLength, rightLength)
+
+def _diffFrames(left, right):
+    # every frame compared at once, then only the differences are walked
+    leftInputs  = list(left.inputs())
+    rightInputs = list(right.inputs())
+    common      = min(len(leftInputs), len(rightInputs))
+
+    changed = itertools.compress(range(common),
+                                 map(operator.ne, leftInputs, rightInputs))
+    ranges  = []
+
+    for frame in changed:
+        if ((len(ranges) > 0) and (ranges[-1][1] == frame)):
+            ranges[-1] = (ranges[-1][0], frame + 1)
+        else:
+            ranges.append((frame, frame + 1))
+
+    # whatever one has past the end of the other is different too
+    longest = max(len(leftInputs), len(rightInputs))
+
+    if (longest > common):
+        if ((len(ranges) > 0) and (ranges[-1][1] == common)):
+            ranges[-1] = (ranges[-1][0], longest)
+        else:
+            ranges.append((common, longest))
+
+    return RollDiff(ranges, len(leftInputs), len(rightInputs))
+
+# a rope node holds a chunk of mnemonics plus the nodes before and after it.
+# nodes are never changed once made - edits build new ones along the path
+# they touch and share everything else - so a copy of a roll is just another
+# reference to the same root.
+#
+# it's kept balanced by height, AVL style, rather than by random priorities -
+# once nodes are shared a paste can meet its own nodes again, and a treap's
+# priorities stop meaning anything
+class _RopeNode():
+    __slots__ = ("left", "right", "chunk", "size", "height")
+
+    def __init__(self, left, right, chunk):
+        self.left   = left
+        self.right  = right
+        self.chunk  = chunk
+        self.size   = (len(chunk) + (left.size if left else 0) +
+                       (right.size if right else 0))
+        self.height = 1 + max(_ropeHeight(left), _ropeHeight(right))
+
+def _ropeHeight(node):
+    return node.height if node else 0
+
+def _ropeBalance(left, chunk, right):
+    # a node of the three, rotated back into shape if one side's 2 taller
+    leftHeight  = _ropeHeight(left)
+    rightHeight = _ropeHeight(right)
+
+    if (rightHeight > leftHeight + 1):
+        if (_ropeHeight(right.left) > _ropeHeight(right.right)):
+            inner = right.left
+            ret   = _RopeNode(_RopeNode(left, inner.left, chunk),
+                              _RopeNode(inner.right, right.right, right.chunk),
+                              inner.chunk)
+        else:
+            ret = _RopeNode(_RopeNode(left, right.left, chunk), right.right,
+                            right.chunk)
+    elif (leftHeight > rightHeight + 1):
+        if (_ropeHeight(left.right) > _ropeHeight(left.left)):
+            inner = left.right
+            ret   = _RopeNode(_RopeNode(left.left, inner.left, left.chunk),
+                              _RopeNode(inner.right, right, chunk),
+                              inner.chunk)
+        else:
+            ret = _RopeNode(left.left, _RopeNode(left.right, right, chunk),
+                            left.chunk)
+    else:
+        ret = _RopeNode(left, right, chunk)
+
+    return ret
+
+def _ropeJoin(left, chunk, right):
+    # everything in left, then chunk, then everything in right. the shorter
+    # side gets hung off the taller one's spine where the heights meet, then
+    # the path back up is rebalanced, so it costs the difference in height
+    leftHeight  = _ropeHeight(left)
+    rightHeight = _ropeHeight(right)
+    path        = []
+
+    if (leftHeight > rightHeight + 1):
+        node = left
+
+        while (_ropeHeight(node) > rightHeight + 1):
+            path.append(node)
+            node = node.right
+
+        ret = _RopeNode(node, right, chunk)
+
+        for node in reversed(path):
+            ret = _ropeBalance(node.left, node.chunk, ret)
+    elif (rightHeight > leftHeight + 1):
+        node = right
+
+        while (_ropeHeight(node) > leftHeight + 1):
+            path.append(node)
+            node = node.left
+
+        ret = _RopeNode(left, node, chunk)
+
+        for node in reversed(path):
+            ret = _ropeBalance(ret, node.chunk, node.right)
+    else:
+        ret = _RopeNode(left, right, chunk)
+
+    return ret
+
+def _ropeMerge(left, right):
+    # everything in left, then everything in right
+    if (left is None):
+        ret = right
+    elif (right is None):
+        ret = left
+    else:
+        # take left's last chunk off to join the two with
+        path = []
+        node = left
+
+        while (node.right is not None):
+            path.append(node)
+            node = node.right
+
+        chunk = node.chunk
+        rest  = node.left
+
+        for node in reversed(path):
+            rest = _ropeBalance(node.left, node.chunk, rest)
+
+        ret = _ropeJoin(rest, chunk, right)
+
+    return ret
+
+def _ropeSplit(node, frame):
+    # (the first frame frames, the rest), cutting a chunk in two if need be
+    path  = []
+    left  = None
+    right = None
+
+    while (node is not None):
+        before = node.left.size if node.left else 0
+        after  = before + len(node.chunk)
+
+        if (frame <= before):
+            path.append((node, False))
+            node = node.left
+        elif (frame >= after):
+            path.append((node, True))
+            frame = frame - after
+            node  = node.right
+        else:
+            cut   = frame - before
+            left  = _ropeJoin(node.left, node.chunk[:cut], None)
+            right = _ropeJoin(None, node.chunk[cut:], node.right)
+            node  = None
+
+    # join the pieces back up on the way out
+    for node, wentRight in reversed(path):
+        if (wentRight):
+            left = _ropeJoin(node.left, node.chunk, left)
+        else:
+            right = _ropeJoin(right, node.chunk, node.right)
+
+    return (left, right)
+
+class RopePianoRoll():
+    """
+    A piano roll that frames can be put in or taken out of anywhere.
+    """
+    # most frames in a chunk built from new frames
+    CHUNK_SIZE = 512
+
+    def __init__(self, inpts=()):
+        """Creates a roll.
+
+        Frames live in chunks in a balanced tree ordered by position, so inserting,
+        deleting, splicing or copying any range of frames only touches the
+        chunks along two paths through it - O(log n), not O(n). No frame
+        numbers are stored anywhere; a frame's number is however many frames
+        come before it.
+
+        Args:
+            inpts (iterable, optional): mnemonics to start with. Defaults to
+                none at all.
+        """
+        self._root = None
+
+        # frames added on the end that haven't been chunked up yet
+        self._tail = []
+
+        self.addFrames(inpts)
+
+    def __len__(self):
+        return (self._root.size if self._root else 0) + len(self._tail)
+
+    @property
+    def currentFrame(self):
+        return len(self)
+
+    def _build(self, inpts):
+        # a new rope of the frames, chunked up
+        ret   = None
+        inpts = list(inpts)
+
+        for start in range(0, len(inpts), self.CHUNK_SIZE):
+            ret = _ropeMerge(ret, _RopeNode(None, None,
+                                            tuple(inpts[start:start +
+                                                        self.CHUNK_SIZE])))
+
+        return ret
+
+    def _flush(self):
+        # the tail goes into the rope before anything edits it
+        if (len(self._tail) > 0):
+            self._root = _ropeMerge(self._root, self._build(self._tail))
+            self._tail = []
+
+    def _ropeOf(self, inpts):
+        # another roll's rope is shared outright, anything else gets built
+        if (isinstance(inpts, RopePianoRoll)):
+            inpts._flush()
+            ret = inpts._root
+        else:
+            ret = self._build(inpts)
+
+        return ret
+
+    def _check(self, start, stop):
+        if ((start < 0) or (stop < start) or (stop > len(self))):
+            raise IndexError(f"Can't take frames {start} to {stop} from a "
+                             f"roll of {len(self)}!")
+
+    def addFrame(self, inpt):
+        """Adds a frame on the end.
+
+        Args:
+            inpt (str): mnemonic for the frame
+        """
+        self._tail.append(inpt)
+
+        if (len(self._tail) >= self.CHUNK_SIZE):
+            self._flush()
+
+    def addFrames(self, inpts):
+        """Adds a whole batch of frames on the end.
+
+        Args:
+            inpts (iterable): mnemonics, one per frame, in order
+        """
+        self._tail.extend(inpts)
+
+        if (len(self._tail) >= self.CHUNK_SIZE):
+            self._flush()
+
+    def input(self, frame):
+        """Gets a frame's mnemonic.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            str: the mnemonic
+        """
+        if ((frame < 0) or (frame >= len(self))):
+            raise IndexError(f"No frame {frame} in a roll of {len(self)}!")
+
+        node = self._root
+        ret  = None
+
+        if ((node is not None) and (frame < node.size)):
+            while (ret is None):
+                before = node.left.size if node.left else 0
+
+                if (frame < before):
+                    node = node.left
+                elif (frame < before + len(node.chunk)):
+                    ret = node.chunk[frame - before]
+                else:
+                    frame = frame - before - len(node.chunk)
+                    node  = node.right
+        else:
+            ret = self._tail[frame - (node.size if node else 0)]
+
+        return ret
+
+    def entry(self, frame):
+        """Gets a frame.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Raises:
+            IndexError: the roll doesn't have that frame
+
+        Returns:
+            PianoRollEntry: that frame, numbered by where it is right now
+        """
+        return PianoRollEntry(self.input(frame), frame)
+
+    def inputs(self):
+        """Goes through every frame's mnemonic, start to finish.
+
+        Yields:
+            str: the mnemonic for each frame
+        """
+        # in order, without recursion
+        stack = []
+        node  = self._root
+
+        while ((node is not None) or (len(stack) > 0)):
+            while (node is not None):
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            yield from node.chunk
+            node = node.right
+
+        yield from list(self._tail)
+
+    def insert(self, frame, inpts):
+        """Puts frames in before the given one.
+
+        Args:
+            frame (uint): where the first new frame ends up. len(self) puts
+                them on the end.
+            inpts (iterable): mnemonics to put in, or another RopePianoRoll,
+                which is shared rather than copied
+
+        Raises:
+            IndexError: frame is past the end
+        """
+        self.splice(frame, frame, inpts)
+
+    def delete(self, start, stop):
+        """Takes frames out.
+
+        Args:
+            start (uint): first frame to take out
+            stop (uint): frame just past the last one to take out
+
+        Raises:
+            IndexError: the range isn't in the roll
+        """
+        self.splice(start, stop, ())
+
+    def splice(self, start, stop, inpts):
+        """Swaps a range of frames for others, which can be more or fewer.
+
+        Args:
+            start (uint): first frame to replace
+            stop (uint): frame just past the last one to replace
+            inpts (iterable): mnemonics to put in their place, or another
+                RopePianoRoll, which is shared rather than copied
+
+        Raises:
+            IndexError: the range isn't in the roll
+        """
+        self._check(start, stop)
+        self._flush()
+
+        middle = self._ropeOf(inpts)
+
+        before, rest = _ropeSplit(self._root, start)
+        ignored, after = _ropeSplit(rest, stop - start)
+
+        self._root = _ropeMerge(_ropeMerge(before, middle), after)
+
+    def copy(self, start=0, stop=None):
+        """Copies a range of frames into a roll of their own.
+
+        Nothing is copied frame by frame - the new roll shares chunks with
+        this one, and editing either leaves the other alone.
+
+        Args:
+            start (uint, optional): first frame to copy. Defaults to 0.
+            stop (uint, optional): frame just past the last one to copy.
+                Defaults to None, meaning the end.
+
+        Raises:
+            IndexError: the range isn't in the roll
+
+        Returns:
+            RopePianoRoll: the frames
+        """
+        if (stop is None):
+            stop = len(self)
+
+        self._check(start, stop)
+        self._flush()
+
+        ret = RopePianoRoll()
+
+        ignored, rest  = _ropeSplit(self._root, start)
+        ret._root, ignored = _ropeSplit(rest, stop - start)
+
+        return ret
+
+    def toRoll(self):
+        """Builds an ordinary piano roll with every frame filled in.
+
+        Returns:
+            PianoRoll: the same frames
+        """
+        ret = PianoRoll()
+
+        for inpt in self.inputs():
+            ret.addFrame(inpt)
+
+        return ret
@@ -0,0 +1,141 @@
+# Places to send frames of input once they've been generated.
+#
+# Every sink takes frames as mnemonic strings - one frame per string, no
+# line ending - in batches through write(), and should be closed once
+# nothing else is coming.
+import sys
+
+INPUT_HEADER = "[Input]"
+INPUT_FOOTER = "[/Input]"
+
+class Sink():
+    """
+    Somewhere frames of input go. Does nothing with them on its own.
+    """
+    def write(self, frames):
+        """Takes a batch of frames.
+
+        Args:
+            frames (list): mnemonic strings, one per frame, in order
+        """
+        pass
+
+    def flush(self):
+        """Pushes anything held back on to wherever it's going."""
+        pass
+
+    def close(self):
+        """Finishes up. Nothing should be written after this."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+class MemorySink(Sink):
+    """
+    Keeps every frame in a list.
+    """
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frames):
+        self.frames.extend(frames)
+
+class StreamSink(Sink):
+    """
+    Writes frames to a text stream, one per line, in large chunks.
+    """
+    def __init__(self, stream, chunkSize=65536, newline="\n"):
+        """Creates a sink over an already open stream.
+
+        Args:
+            stream (file): text stream to write to. It's left open on close.
+            chunkSize (uint, optional): how many frames to gather before
+                writing them out in one go. Defaults to 65536.
+            newline (str, optional): what ends each line. Defaults to "\\n".
+        """
+        self.stream    = stream
+        self.chunkSize = chunkSize
+        self.newline   = newline
+        self.pending   = []
+        self.written   = 0
+
+    def write(self, frames):
+        self.pending.extend(frames)
+
+        if (len(self.pending) >= self.chunkSize):
+            self.flush()
+
+    def flush(self):
+        if (len(self.pending) > 0):
+            self.stream.write(self.newline.join(self.pending) + self.newline)
+            self.written = self.written + len(self.pending)
+            self.pending = []
+
+        self.stream.flush()
+
+class FileSink(StreamSink):
+    """
+    Writes frames straight into a BizHawk style Input Log.txt.
+    """
+    def __init__(self, path, logKey=None, chunkSize=65536, newline="\n"):
+        """Creates the file and writes the header.
+
+        Args:
+            path (str): where to write the log
+            logKey (str, optional): the LogKey line's value, which tells
+                BizHawk what each column is. Left out if None. Defaults to
+                None.
+            chunkSize (uint, optional): how many frames to gather before
+                writing them out in one go. Defaults to 65536.
+            newline (str, optional): what ends each line. Defaults to "\\n".
+        """
+        super().__init__(open(path, "w", newline=""), chunkSize, newline)
+
+        self.path = path
+
+        self.stream.write(INPUT_HEADER + newline)
+
+        if (logKey is not None):
+            self.stream.write("LogKey:" + logKey + newline)
+
+    def close(self):
+        if (not self.stream.closed):
+            self.flush()
+            self.stream.write(INPUT_FOOTER + self.newline)
+            self.stream.close()
+
+class PagerSink(Sink):
+    """
+    Prints frames to the console a page at a time, waiting on enter between
+    pages so they can be copied out of the scrollback.
+    """
+    def __init__(self, pageSize=5000, stream=None, prompt=input):
+        """Creates a pager.
+
+        Args:
+            pageSize (uint, optional): most frames to print before waiting.
+                Defaults to 5000.
+            stream (file, optional): where to print. Defaults to None, which
+                means sys.stdout at the time of printing.
+            prompt (function, optional): called with the prompt text to wait
+                on the user. Defaults to input.
+        """
+        self.pageSize = pageSize
+        self.stream   = stream
+        self.prompt   = prompt
+
+    def write(self, frames):
+        stream = self.stream if (self.stream is not None) else sys.stdout
+
+        for start in range(0, len(frames), self.pageSize):
+            page = frames[start:start + self.pageSize]
+
+            stream.write("\n" + "\n".join(page) + "\n\n")
+            stream.flush()
+
+            # burn some time
+            self.prompt("< Input enter to continue script. >")
@@ -0,0 +1,392 @@
+# Reading and writing mnemonics without going through the controller objects.
+#
+# Every controller that gives a mnemonicLayout() has a mnemonic that's the
+# same width every frame, with each button and analog value always in the
+# same columns. A MnemonicFormat works those columns out once, and after
+# that reading a frame is just slicing and a couple of builtin calls, and
+# writing one is a single str.format.
+#
+# Frames come out packed the same way history.PackedPianoRoll keeps them:
+# an integer with bit n set if the nth button in the layout is down, and a
+# tuple with one whole number per analog input, in layout order.
+#
+# Written mnemonics come out exactly as the controller's __repr__ would have
+# them for the same state.
+import array
+import itertools
+import operator
+
+from tasstuff.any.bizhawk.controller import AnalogInput
+from tasstuff.any.bizhawk.controller import Button
+
+# takes the 0s and 1s out of a string, so anything left means it isn't binary.
+# int() would happily skip whitespace and _s, which aren't bits at all
+_NOT_BITS = str.maketrans("", "", "01")
+
+class MnemonicFormat():
+    """
+    The column layout of a controller's mnemonic.
+    """
+    def __init__(self, controller):
+        """Works out where everything is in a controller's mnemonic.
+
+        Args:
+            controller (Input): controller to lay out. Only its layout is
+                used - none of its state is read or changed here.
+
+        Raises:
+            ValueError: a button's on or off string isn't one character, or
+                the layout has something in it that isn't a token
+        """
+        self.controller = controller
+        self.buttons    = []
+        self.analogs    = []
+        self.widths     = []
+        self.width      = 0
+
+        buttonColumns = []
+        analogSlices  = []
+        # what a button's character means, for turning them into bits
+        self._bitTable = {}
+
+        layout = controller.mnemonicLayout()
+
+        for token in layout:
+            if (isinstance(token, str)):
+                self.width = self.width + len(token)
+            elif (isinstance(token, Button)):
+                if ((1 != len(token.onStr)) or (1 != len(token.offStr))):
+                    raise ValueError(f"{token.name} needs one character mnemonics!")
+
+                self._bitTable[ord(token.offStr)] = "0"
+
+                # anything but "." counts as pressed, same as fromMnemonic
+                if ("." != token.onStr):
+                    self._bitTable[ord(token.onStr)] = "1"
+
+                self.buttons.append(token)
+                buttonColumns.append(self.width)
+                self.width = self.width + 1
+            elif (isinstance(token, tuple) and
+                  isinstance(token[0], AnalogInput)):
+                analog, width = token
+
+                self.analogs.append(analog)
+                self.widths.append(width)
+                analogSlices.append(slice(self.width, self.width + width))
+                self.width = self.width + width
+            else:
+                raise ValueError(f"Can't lay out {token!r}!")
+
+        # a stray 0 would read as a 0 bit, but it isn't "." so it's pressed
+        self._bitTable.setdefault(ord("0"), "1")
+
+        self.buttonColumns = buttonColumns
+        self.analogSlices  = analogSlices
+
+        # highest bit first, so the joined characters read as a binary
+        # number. a single column comes back as a string instead of a tuple,
+        # which joins just the same
+        if (len(buttonColumns) > 0):
+            self._buttonGetter = operator.itemgetter(*reversed(buttonColumns))
+        else:
+            self._buttonGetter = None
+
+        self._analogGetters = [operator.itemgetter(s) for s in analogSlices]
+
+        # values past an analog's range get clamped, same as fromMnemonic
+        self._bounds = [(_whole(a.min), _whole(a.max)) for a in self.analogs]
+
+        self._buildWriter(layout)
+
+    def _buildWriter(self, layout):
+        # every run of buttons between other tokens, and every analog,
+        # becomes a field in one format template. a run is looked up in a
+        # table of every way its buttons can be set, at most eight buttons to
+        # a table. each field is (bit shift, mask, table, analog number), and
+        # the template's pieces are kept as literals or field numbers
+        self._fields = []
+        self._pieces = []
+
+        run   = []
+        first = 0
+
+        # the empty string on the end finishes off a trailing run
+        for token in layout + [""]:
+            if (isinstance(token, Button)):
+                if (0 == len(run)):
+                    first = self.buttons.index(token)
+
+                run.append(token)
+                continue
+
+            for start in range(0, len(run), 8):
+                chunk = run[start:start + 8]
+                table = []
+
+                for value in range(1 << len(chunk)):
+                    text = ""
+
+                    for n, button in enumerate(chunk):
+                        if (value & (1 << n)):
+                            text = text + button.onStr
+                        else:
+                            text = text + button.offStr
+
+                    table.append(text)
+
+                self._pieces.append(len(self._fields))
+                self._fields.append((first + start, (1 << len(chunk)) - 1,
+                                     table, None))
+
+            run = []
+
+            if (isinstance(token, str)):
+                self._pieces.append(_escape(token))
+            else:
+                analog, width = token
+
+                self._pieces.append(len(self._fields))
+                self._fields.append((0, 0, None, self.analogs.index(analog)))
+
+        self.template = self.analogTemplate(None)
+
+    def analogTemplate(self, bits):
+        """Gets a template with the buttons already filled in.
+
+        For writing lots of frames where only the analog inputs change, as
+        the template's format() just needs the analog values, in order, as
+        whole numbers.
+
+        Args:
+            bits (int): button bits to fill in. None leaves a field for each
+                run of buttons as well, which is what serialize uses.
+
+        Returns:
+            str: a str.format template
+        """
+        ret = ""
+
+        for piece in self._pieces:
+            if (isinstance(piece, str)):
+                ret = ret + piece
+            else:
+                shift, mask, table, axis = self._fields[piece]
+
+                if (table is None):
+                    ret = ret + "{:>" + str(self.widths[axis]) + "}"
+                elif (bits is None):
+                    ret = ret + "{}"
+                else:
+                    ret = ret + _escape(table[(bits >> shift) & mask])
+
+        return ret
+
+    def buttonMask(self, button):
+        """Gets the bit a button is packed into.
+
+        Args:
+            button (Button): one of the controller's buttons
+
+        Raises:
+            ValueError: it isn't part of this layout
+
+        Returns:
+            int: a single set bit
+        """
+        for i, other in enumerate(self.buttons):
+            if (other is button):
+                return 1 << i
+
+        raise ValueError("Button isn't part of this controller's layout!")
+
+    def _bitsOf(self, line):
+        ret = 0
+
+        if (self._buttonGetter is not None):
+            keys = "".join(self._buttonGetter(line)).translate(self._bitTable)
+
+            if ("" == keys.translate(_NOT_BITS)):
+                ret = int(keys, 2)
+            else:
+                # something other than an on or off string, which is still
+                # pressed as far as fromMnemonic is concerned
+                ret = 0
+
+                for i, column in enumerate(self.buttonColumns):
+                    if ("." != line[column]):
+                        ret = ret | (1 << i)
+
+        return ret
+
+    def parse(self, line):
+        """Reads a single mnemonic.
+
+        Args:
+            line (str): the mnemonic, without its line ending
+
+        Analog values outside their input's range are clamped into it.
+
+        Raises:
+            ValueError: it's not the right width for this layout
+
+        Returns:
+            tuple: (button bits, tuple of analog values)
+        """
+        if (len(line) != self.width):
+            raise ValueError(f"Expected {self.width} characters, got {len(line)}!")
+
+        return (self._bitsOf(line),
+                tuple(min(max(int(line[s]), low), high)
+                      for s, (low, high) in zip(self.analogSlices,
+                                                self._bounds)))
+
+    def parseMany(self, lines, bitsTypecode="Q", axisTypecodes=None):
+        """Reads a whole batch of mnemonics at once.
+
+        Everything's done a column at a time through builtins, so there's
+        no Python level loop per frame unless a line has an odd character
+        in a button's column. Analog values are clamped the same as parse's.
+
+        Args:
+            lines (list): mnemonics, without line endings
+            bitsTypecode (str, optional): array typecode for the button
+                bits. Defaults to "Q".
+            axisTypecodes (list, optional): array typecode for each analog
+                input. Defaults to None, meaning "l" for all of them.
+
+        Raises:
+            ValueError: a line isn't the right width for this layout
+
+        Returns:
+            tuple: (array of button bits, list of arrays of analog values)
+        """
+        lines = list(lines)
+
+        if (len(set(map(len, lines)) - {self.width}) > 0):
+            raise ValueError(f"Every line needs to be {self.width} characters!")
+
+        if (axisTypecodes is None):
+            axisTypecodes = ["l"] * len(self.analogs)
+
+        if (self._buttonGetter is None):
+            bits = array.array(bitsTypecode, bytes(
+                               array.array(bitsTypecode).itemsize * len(lines)))
+        else:
+            keys = list(map(str.translate, map("".join,
+                                               map(self._buttonGetter, lines)),
+                            itertools.repeat(self._bitTable)))
+
+            # one check over every frame's keys at once
+            if ("" == "".join(keys).translate(_NOT_BITS)):
+                bits = array.array(bitsTypecode,
+                                   map(int, keys, itertools.repeat(2)))
+            else:
+                bits = array.array(bitsTypecode, map(self._bitsOf, lines))
+
+        axes = [array.array(code, map(min, map(max, map(int, map(getter,
+                                                                 lines)),
+                                                itertools.repeat(low)),
+                                      itertools.repeat(high)))
+                for code, getter, (low, high) in zip(axisTypecodes,
+                                                     self._analogGetters,
+                                                     self._bounds)]
+
+        return bits, axes
+
+    def apply(self, bits, axes):
+        """Puts a packed frame's state onto the controller. Analog values are
+        clamped into range, same as fromMnemonic.
+
+        Args:
+            bits (int): button bits
+            axes (tuple): one value per analog input
+        """
+        for i, button in enumerate(self.buttons):
+            button.pressed = (0 != (bits & (1 << i)))
+
+        for analog, value, (low, high) in zip(self.analogs, axes,
+                                              self._bounds):
+            analog.current = min(max(value, low), high)
+
+    def load(self, line):
+        """Reads a mnemonic onto the controller, like its fromMnemonic.
+
+        Args:
+            line (str): the mnemonic, without its line ending
+        """
+        self.controller.release()
+        self.apply(*self.parse(line))
+
+    def pack(self):
+        """Packs whatever the controller is doing right now.
+
+        Returns:
+            tuple: (button bits, tuple of analog values)
+        """
+        bits = 0
+
+        for i, button in enumerate(self.buttons):
+            if (button.pressed):
+                bits = bits | (1 << i)
+
+        return bits, tuple(analog.current for analog in self.analogs)
+
+    def serialize(self, bits, axes):
+        """Writes a packed frame as a mnemonic.
+
+        Args:
+            bits (int): button bits
+            axes (tuple): one value per analog input
+
+        Returns:
+            str: the mnemonic, same as the controller's __repr__ would give
+        """
+        args = []
+
+        for shift, mask, table, axis in self._fields:
+            if (table is None):
+                args.append(int(axes[axis]))
+            else:
+                args.append(table[(bits >> shift) & mask])
+
+        return self.template.format(*args)
+
+    def serializeMany(self, bits, axes):
+        """Writes a whole batch of packed frames as mnemonics at once.
+
+        Like parseMany, this goes a column at a time through builtins.
+
+        Args:
+            bits (list): button bits for each frame
+            axes (list): one list of values per analog input, each with a
+                value for every frame
+
+        Returns:
+            list: the mnemonics, in order
+        """
+        columns = []
+
+        for shift, mask, table, axis in self._fields:
+            if (table is None):
+                columns.append(map(int, axes[axis]))
+            else:
+                columns.append(map(table.__getitem__,
+                                   map(mask.__and__,
+                                       map(operator.rshift, bits,
+                                           itertools.repeat(shift)))))
+
+        return list(map(self.template.format, *columns))
+
+def _whole(value):
+    # bounds that are whole numbers clamp to ints, not floats
+    ret = value
+
+    if (value == int(value)):
+        ret = int(value)
+
+    return ret
+
+def _escape(text):
+    # so literal braces survive str.format
+    return text.replace("{", "{{").replace("}", "}}")
@@ -0,0 +1,298 @@
+# BizHawk .bk2 movies.
+#
+# A .bk2 is just a zip. The parts that matter here are Header.txt (one
+# "Key Value" per line), SyncSettings.json (core settings, as BizHawk saved
+# them), and Input Log.txt (the same format inputlog.FileSink writes).
+import array
+import contextlib
+import io
+import mmap
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+
+from tasstuff.any.bizhawk.history import PianoRoll
+from tasstuff.any.bizhawk.history import PianoRollEntry
+from tasstuff.any.bizhawk.inputlog import INPUT_FOOTER
+from tasstuff.any.bizhawk.inputlog import INPUT_HEADER
+from tasstuff.any.bizhawk.inputlog import StreamSink
+
+HEADER_NAME        = "Header.txt"
+SYNC_SETTINGS_NAME = "SyncSettings.json"
+INPUT_LOG_NAME     = "Input Log.txt"
+
+# anything not given to the writer falls back to these
+DEFAULT_HEADER = {
+    "MovieVersion" : "BizHawk v2.0.0",
+}
+
+class Bk2Writer(StreamSink):
+    """
+    Writes a .bk2, streaming frames into its input log as they come.
+    """
+    def __init__(self, path, header=None, syncSettings="{}", logKey=None,
+                 chunkSize=65536, newline="\n"):
+        """Creates the archive and writes everything but the frames.
+
+        Only one file in a zip can be open for writing at a time, so the
+        header and sync settings go in first and the input log stays open
+        until close.
+
+        Args:
+            path (str): where to write the movie
+            header (dict, optional): Header.txt entries, on top of
+                DEFAULT_HEADER. Defaults to None.
+            syncSettings (str, optional): contents of SyncSettings.json.
+                Defaults to "{}".
+            logKey (str, optional): the LogKey line's value. Left out if
+                None. Defaults to None.
+            chunkSize (uint, optional): how many frames to gather before
+                writing them out in one go. Defaults to 65536.
+            newline (str, optional): what ends each line. Defaults to "\\n".
+        """
+        self.path    = path
+        self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+
+        fullHeader = dict(DEFAULT_HEADER)
+
+        if (header is not None):
+            fullHeader.update(header)
+
+        headerText = ""
+
+        for key, value in fullHeader.items():
+            headerText = headerText + f"{key} {value}{newline}"
+
+        self.archive.writestr(HEADER_NAME, headerText)
+        self.archive.writestr(SYNC_SETTINGS_NAME, syncSettings)
+
+        info = zipfile.ZipInfo(INPUT_LOG_NAME, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+
+        # no telling how big it'll get, so plan for huge
+        log = self.archive.open(info, "w", force_zip64=True)
+
+        super().__init__(io.TextIOWrapper(log, encoding="utf-8", newline=""),
+                         chunkSize, newline)
+
+        self.stream.write(INPUT_HEADER + newline)
+
+        if (logKey is not None):
+            self.stream.write("LogKey:" + logKey + newline)
+
+    def writeRoll(self, roll):
+        """Writes every frame of a piano roll, a chunk at a time.
+
+        Args:
+            roll (PianoRoll): frames to write, or anything else with an
+                inputs() that gives mnemonics in order
+        """
+        chunk = []
+
+        for inpt in roll.inputs():
+            chunk.append(inpt)
+
+            if (len(chunk) >= self.chunkSize):
+                self.write(chunk)
+                chunk = []
+
+        self.write(chunk)
+
+    def close(self):
+        if (not self.stream.closed):
+            self.flush()
+            self.stream.write(INPUT_FOOTER + self.newline)
+            self.stream.close()
+            self.archive.close()
+
+def writeBk2(path, roll, header=None, syncSettings="{}", logKey=None):
+    """Writes a piano roll out as a .bk2 in one go.
+
+    Args:
+        path (str): where to write the movie
+        roll (PianoRoll): frames to write
+        header (dict, optional): Header.txt entries, on top of
+            DEFAULT_HEADER. Defaults to None.
+        syncSettings (str, optional): contents of SyncSettings.json. Defaults
+            to "{}".
+        logKey (str, optional): the LogKey line's value. Left out if None.
+            Defaults to None.
+    """
+    with Bk2Writer(path, header, syncSettings, logKey) as writer:
+        writer.writeRoll(roll)
+
+class InputLogReader():
+    """
+    Reads frames out of a .bk2 or a bare Input Log.txt on demand.
+    """
+    def __init__(self, path):
+        """Opens a movie or input log for reading. Nothing is read yet.
+
+        Args:
+            path (str): .bk2 or input log to read. Anything that's a zip is
+                taken to be a .bk2.
+        """
+        self.path  = path
+        self.isBk2 = zipfile.is_zipfile(path)
+
+        # built the first time something needs random access
+        self._map     = None
+        self._mapFile = None
+        self._offsets = None
+
+    @contextlib.contextmanager
+    def _open(self):
+        # a fresh binary stream over the input log
+        if (self.isBk2):
+            with zipfile.ZipFile(self.path) as archive:
+                with archive.open(INPUT_LOG_NAME) as log:
+                    yield log
+        else:
+            with open(self.path, "rb") as log:
+                yield log
+
+    def lines(self):
+        """Goes through the frames one at a time, start to finish.
+
+        Yields:
+            str: the mnemonic for each frame, without its line ending
+        """
+        with self._open() as log:
+            # let io do the line splitting, it's far quicker at it than a zip
+            # member is on its own
+            for line in io.TextIOWrapper(log, encoding="utf-8", newline=""):
+                if (line.startswith("|")):
+                    yield line.rstrip("\r\n")
+
+    def entries(self):
+        """Goes through the frames one at a time, start to finish.
+
+        Yields:
+            PianoRollEntry: each frame, numbered from 0
+        """
+        for frame, line in enumerate(self.lines()):
+            yield PianoRollEntry(line, frame)
+
+    def __iter__(self):
+        return self.entries()
+
+    def logKey(self):
+        """Finds the LogKey line, which only ever comes before the frames.
+
+        Returns:
+            str: its value, or None if there isn't one
+        """
+        ret = None
+
+        with self._open() as log:
+            for line in log:
+                if (line.startswith(b"LogKey:")):
+                    ret = line[len(b"LogKey:"):].rstrip(b"\r\n")
+                    ret = ret.decode("utf-8")
+                    break
+                elif (line.startswith(b"|")):
+                    break
+
+        return ret
+
+    def buildIndex(self):
+        """Maps the log into memory and notes where every frame starts.
+
+        A .bk2's log is compressed, so it's copied out to a temporary file
+        first and that gets mapped instead. Only the offsets are kept in
+        memory - eight bytes a frame.
+        """
+        if (self._offsets is None):
+            if (self.isBk2):
+                self._mapFile = tempfile.TemporaryFile()
+
+                with self._open() as log:
+                    shutil.copyfileobj(log, self._mapFile, 1 << 20)
+
+                self._mapFile.flush()
+            else:
+                self._mapFile = open(self.path, "rb")
+
+            self._offsets = array.array("Q")
+
+            # mmap won't take an empty file
+            self._mapFile.seek(0, io.SEEK_END)
+
+            if (self._mapFile.tell() > 0):
+                self._map = mmap.mmap(self._mapFile.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+                # every frame is a line starting with a bar
+                for found in re.finditer(rb"^\|", self._map, re.MULTILINE):
+                    self._offsets.append(found.start())
+
+    def __len__(self):
+        self.buildIndex()
+
+        return len(self._offsets)
+
+    def frame(self, frame):
+        """Reads a single frame from anywhere in the log.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Returns:
+            str: the mnemonic for that frame
+        """
+        self.buildIndex()
+
+        start = self._offsets[frame]
+        end   = self._map.find(b"\n", start)
+
+        if (-1 == end):
+            end = len(self._map)
+
+        return self._map[start:end].rstrip(b"\r").decode("utf-8")
+
+    def entry(self, frame):
+        """Reads a single frame from anywhere in the log.
+
+        Args:
+            frame (uint): frame number, counting from 0
+
+        Returns:
+            PianoRollEntry: that frame
+        """
+        return PianoRollEntry(self.frame(frame), frame)
+
+    def close(self):
+        """Lets go of the memory map and any temporary copy."""
+        if (self._map is not None):
+            self._map.close()
+            self._map = None
+
+        if (self._mapFile is not None):
+            self._mapFile.close()
+            self._mapFile = None
+
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+def readRoll(path):
+    """Reads a whole .bk2 or input log into a piano roll.
+
+    Args:
+        path (str): .bk2 or input log to read
+
+    Returns:
+        PianoRoll: every frame in it
+    """
+    ret = PianoRoll()
+
+    for line in InputLogReader(path).lines():
+        ret.addFrame(line)
+
+    return ret
@@ -1,12 +1,270 @@
+import array
+import heapq
+import itertools
+import math
+import operator
+import time
+
 # constants
 FLAG_TARGET  = "flag.target"
 FLAG_CHECKED = "flag.checked"
 
+# flags are interned to bits the first time anything sets them, so a node's
+# flags can live in a single int. the table's shared by every graph and only
+# ever grows - a name's bit has to mean the same thing on every node for as
+# long as any of them might have it set - so flag names should be a fixed
+# handful, not made up per node or per search
+_flagBits  = {}
+_flagNames = []
+
+def flagBit(flag):
+    """Gets the bit a flag is stored in, interning it if it's new.
+
+    Args:
+        flag (str): flag to look up
+
+    Returns:
+        int: a single set bit, unique to this flag
+    """
+    ret = _flagBits.get(flag)
+
+    if (ret is None):
+        ret = 1 << len(_flagNames)
+        _flagBits[flag] = ret
+        _flagNames.append(flag)
+
+    return ret
+
+# edge costs are interned the same way, so a graph full of edges costing
+# the same handful of amounts only holds each amount once
+_costs = {}
+
+def internCost(cost):
+    """Gets the shared float for an edge cost.
+
+    Args:
+        cost (float): cost to look up
+
+    Returns:
+        float: equal to cost, and the same object every time for that amount
+    """
+    cost = float(cost)
+
+    return _costs.setdefault(cost, cost)
+
+# heuristics for A*, each is (node, goal) -> estimated cost remaining
+def manhattanDistance(node, goal):
+    """Distance moving only north, south, east and west, at 1 per step.
+
+    Args:
+        node (Node2D): node to estimate from
+        goal (Node2D): node to estimate to
+
+    Returns:
+        float: estimated cost remaining
+    """
+    return abs(node.x - goal.x) + abs(node.y - goal.y)
+
+def chebyshevDistance(node, goal):
+    """Distance moving in all eight directions, at 1 per step.
+
+    Args:
+        node (Node2D): node to estimate from
+        goal (Node2D): node to estimate to
+
+    Returns:
+        float: estimated cost remaining
+    """
+    return max(abs(node.x - goal.x), abs(node.y - goal.y))
+
+def octileDistance(node, goal):
+    """Distance moving in all eight directions, at 1 per cardinal step and
+    sqrt(2) per diagonal step.
+
+    Args:
+        node (Node2D): node to estimate from
+        goal (Node2D): node to estimate to
+
+    Returns:
+        float: estimated cost remaining
+    """
+    dx = abs(node.x - goal.x)
+    dy = abs(node.y - goal.y)
+
+    return max(dx, dy) + ((math.sqrt(2) - 1) * min(dx, dy))
+
+def noHeuristic(node, goal):
+    """No estimate at all, which turns A* back into Dijkstra.
+
+    Args:
+        node (Node): node to estimate from
+        goal (Node): node to estimate to
+
+    Returns:
+        float: always 0
+    """
+    return 0
+
+# connectivity for the swept distance transforms - how a step is allowed to
+# go, and what it costs
+CONNECT_CARDINAL  = "cardinal"   # north, south, east and west, 1 per step
+CONNECT_DIAGONAL  = "diagonal"   # all eight, sqrt(2) per diagonal step
+CONNECT_CHEBYSHEV = "chebyshev"  # all eight, 1 per step
+
+_diagonalCosts = {
+    CONNECT_CARDINAL  : None,
+    CONNECT_DIAGONAL  : math.sqrt(2),
+    CONNECT_CHEBYSHEV : 1.0,
+}
+
+# rounds of sweeps _distanceTransform makes before giving up on them
+_SWEEP_ROUNDS = 4
+
+def _sweepRow(numpy, row, along, offsets, cap):
+    # each cell becomes the cheapest of itself and anything before it in the
+    # row, plus 1 per cell between. that's min(row[k] - k) + x, which is a
+    # single minimum.accumulate. with walls, each open run is pushed down by
+    # more than any run before it could undercut, so runs can't leak into
+    # each other - which needs stand ins for inf, since inf can't be pushed
+    if (offsets is None):
+        ret = numpy.minimum.accumulate(row - along) + along
+    else:
+        ret = numpy.minimum(row, cap) - along - offsets
+        ret = numpy.minimum.accumulate(ret) + offsets + along
+        ret[ret >= cap] = numpy.inf
+
+    return ret
+
+def _distanceTransform(numpy, blocked, seeds, connectivity):
+    # distances over a 2D array of cells from every seed (row, column), by
+    # sweeping the rows top to bottom and then back up. each row takes what
+    # it can from the row before it, then gets swept along both ways. that's
+    # exact with nothing blocked, since a cheapest path never has to double
+    # back; walls can make one, so then the sweeps go again until nothing
+    # changes. every time a path has to turn back up or down the grid costs
+    # another round, and a maze can make it turn hundreds of times, so after
+    # _SWEEP_ROUNDS it's handed to _floodDistances instead
+    if (connectivity not in _diagonalCosts):
+        raise ValueError(f"Unknown connectivity {connectivity!r}!")
+
+    diagonal = _diagonalCosts[connectivity]
+    rows     = blocked.shape[0]
+    columns  = blocked.shape[1]
+
+    dist    = numpy.full((rows, columns), numpy.inf)
+    blocked = blocked.copy()
+
+    for row, column in seeds:
+        dist[row, column]    = 0.0
+        blocked[row, column] = False
+
+    along   = numpy.arange(columns, dtype=float)
+    walled  = blocked.any(axis=1)
+
+    # no real distance gets anywhere near cap, and span is more than any
+    # row's values can differ by
+    cap  = 2.0 * (blocked.size + 1)
+    span = cap + columns + 1
+
+    # per row, going forward and going back (the reversed row). rows without
+    # walls don't need any
+    forward  = [None] * rows
+    backward = [None] * rows
+
+    for row in numpy.flatnonzero(walled):
+        forward[row]  = numpy.cumsum(blocked[row]) * span
+        backward[row] = numpy.cumsum(blocked[row][::-1]) * span
+
+    def sweep(order):
+        prev = None
+
+        for row in order:
+            cur = dist[row]
+
+            if (prev is not None):
+                cur = numpy.minimum(cur, prev + 1.0)
+
+                if (diagonal is not None):
+                    cur[1:]  = numpy.minimum(cur[1:],  prev[:-1] + diagonal)
+                    cur[:-1] = numpy.minimum(cur[:-1], prev[1:]  + diagonal)
+
+                if (walled[row]):
+                    cur[blocked[row]] = numpy.inf
+
+            cur = _sweepRow(numpy, cur, along, forward[row], cap)
+            cur = _sweepRow(numpy, cur[::-1], along, backward[row], cap)[::-1]
+
+            if (walled[row]):
+                cur[blocked[row]] = numpy.inf
+
+            dist[row] = cur
+            prev      = cur
+
+    for ignored in range(_SWEEP_ROUNDS):
+        before = dist.copy() if (walled.any()) else None
+
+        sweep(range(rows))
+        sweep(range(rows - 1, -1, -1))
+
+        if ((before is None) or numpy.array_equal(before, dist)):
+            break
+    else:
+        dist = _floodDistances(numpy, blocked, seeds, diagonal)
+
+    return dist
+
+def _floodDistances(numpy, blocked, seeds, diagonal):
+    # the same distances by searching out from the seeds a cell at a time.
+    # much slower than sweeping an open grid, but it's O(cells) however the
+    # walls wind. seeds have already been unblocked
+    rows    = blocked.shape[0]
+    columns = blocked.shape[1]
+    inf     = float("inf")
+    opened  = (~blocked).ravel().tolist()
+    dist    = [inf] * blocked.size
+
+    steps = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0)]
+
+    if (diagonal is not None):
+        steps.extend((dr, dc, diagonal) for dr in (-1, 1) for dc in (-1, 1))
+
+    toSearch = []
+
+    for row, column in seeds:
+        dist[row * columns + column] = 0.0
+        toSearch.append((0.0, row, column))
+
+    heapq.heapify(toSearch)
+
+    while (len(toSearch) > 0):
+        cost, row, column = heapq.heappop(toSearch)
+
+        if (cost > dist[row * columns + column]):
+            continue
+
+        for dr, dc, step in steps:
+            nr = row + dr
+            nc = column + dc
+
+            if ((0 <= nr < rows) and (0 <= nc < columns)):
+                cell      = nr * columns + nc
+                costGuess = cost + step
+
+                if (opened[cell] and (costGuess < dist[cell])):
+                    dist[cell] = costGuess
+                    heapq.heappush(toSearch, (costGuess, nr, nc))
+
+    return numpy.array(dist).reshape(rows, columns)
+
 # "and all the rest"
 class Edge():
     """
     A single connection in a search graph
     """
+    # graphs make these by the hundreds of thousands, so no __dict__ unless a
+    # subclass wants one
+    __slots__ = ("left", "right", "cost")
+
     def __init__(self, left, right, cost=1.0):
         """Creates a link between two nodes.
 
@@ -55,6 +313,9 @@ class Node():
     """
     A single location in a search graph
     """
+    __slots__ = ("flagBits", "edges", "cost", "_edgeClass", "_costGeneration",
+                 "_checkedGeneration", "_neighbors", "_strays")
+
     def __init__(self, edgeClass=Edge):
         """Creates simple Node.
 
@@ -62,62 +323,270 @@ class Node():
             edgeClass (Class(Edge), optional): Class to use when creating edges
             for this node. Defaults to Edge.
         """
-        self.flags = []
+        self.flagBits = 0
         self.edges = []
         self.cost  = 0
         self._edgeClass = edgeClass
 
-    def addNeighbor(self, neighbor, cost=1.0, mirror=True):
-        swp = self._edgeClass(self, neighbor, float(cost))
+        # which search generation cost and checked status belong to
+        self._costGeneration    = -1
+        self._checkedGeneration = -1
+
+        # id(neighbor) -> edge leading to it, built the first time a neighbor
+        # is looked up and kept in step with edges from then on, so edges
+        # should only be changed through add and removeNeighbor
+        self._neighbors = None
+
+        # id(other) -> other, for nodes with an edge leading here that this
+        # node has none leading back along. None until there are any
+        self._strays = None
+
+    def _index(self):
+        # the neighbor index, built if it hasn't been yet
+        if (self._neighbors is None):
+            self._neighbors = {}
+
+            # the latest edge to a neighbor is the one that counts
+            for edge in self.edges:
+                self._neighbors[id(edge.traverse(self)[0])] = edge
+
+        return self._neighbors
+
+    def _link(self, neighbor, cost):
+        # one edge from here to neighbor
+        swp = self._edgeClass(self, neighbor, internCost(cost))
         self.edges.append(swp)
 
+        if (self._neighbors is not None):
+            self._neighbors[id(neighbor)] = swp
+
+    def _addStray(self, other):
+        if (self._strays is None):
+            self._strays = {}
+
+        self._strays[id(other)] = other
+
+    def _dropStray(self, other):
+        if (self._strays is not None):
+            self._strays.pop(id(other), None)
+
+            if (0 == len(self._strays)):
+                self._strays = None
+
+    def addNeighbor(self, neighbor, cost=1.0, mirror=True):
+        self._link(neighbor, cost)
+
         if (mirror):
-            neighbor.addNeighbor(self, cost, False)
+            neighbor._link(self, cost)
+        elif (neighbor.hasNeighbor(self)):
+            # it's both ways now
+            self._dropStray(neighbor)
+        else:
+            # one way, so neighbor needs to know to find it when isolated
+            neighbor._addStray(self)
     
     def hasNeighbor(self, neighbor):
-        ret = False
-
-        for edge in self.edges:
-            if (edge.traverse(self)[0] is neighbor):
-                ret = True
-        
-        return ret
+        return id(neighbor) in self._index()
 
     def getConnectingEdge(self, neighbor):
-        ret = None
-        
-        for edge in self.edges:
-            if (edge.traverse(self)[0] is neighbor):
-                ret = edge
-
-        return ret
+        return self._index().get(id(neighbor))
     
     def removeNeighbor(self, neighbor, mirror=True):
-        edge = self.getConnectingEdge(neighbor)
+        index = self._index()
+        edge  = index.pop(id(neighbor), None)
 
         if (edge is not None):
             self.edges.remove(edge)
+
+            # there may have been more than one edge to the same neighbor, in
+            # which case the latest of those takes over
+            for other in self.edges:
+                if (other.traverse(self)[0] is neighbor):
+                    index[id(neighbor)] = other
+
+            if (id(neighbor) not in index):
+                neighbor._dropStray(self)
+
         if (mirror):
-                neighbor.removeNeighbor(self, False)
+            neighbor.removeNeighbor(self, False)
+
+        # whatever neighbor still has leading back here is one way now. that's
+        # checked after the mirror, which only takes one of neighbor's edges
+        # if it had more than one
+        if ((id(neighbor) not in index) and neighbor.hasNeighbor(self)):
+            self._addStray(neighbor)
+
+    def isolate(self):
+        """Destroys all edges leading to and from this node."""
+        others = [edge.traverse(self)[0] for edge in self.edges]
+
+        if (self._strays is not None):
+            others.extend(self._strays.values())
+
+        for other in others:
+            while (other.hasNeighbor(self)):
+                other.removeNeighbor(self, False)
+
+        while (len(self.edges) > 0):
+            self.removeNeighbor(self.edges[-1].traverse(self)[0], False)
+
+        self._strays = None
+
+    @property
+    def flags(self):
+        """list: names of the flags on this node, in the order interned"""
+        ret = []
+
+        for bit, name in enumerate(_flagNames):
+            if (self.flagBits & (1 << bit)):
+                ret.append(name)
+
+        return ret
+
+    @flags.setter
+    def flags(self, flags):
+        self.resetFlags()
+
+        for flag in flags:
+            self.addFlag(flag)
 
     def addFlag(self, flag):
-        if (flag not in self.flags):
-            self.flags.append(flag)
+        self.flagBits = self.flagBits | flagBit(flag)
     
     def hasFlag(self, flag):
-        ret = False
+        return 0 != (self.flagBits & _flagBits.get(flag, 0))
 
-        if (flag in self.flags):
-            ret = True
+    def removeFlag(self, flag):
+        self.flagBits = self.flagBits & ~_flagBits.get(flag, 0)
+
+    def resetFlags(self):
+        self.flagBits = 0
+
+class SearchQuery():
+    """
+    What one search took.
+    """
+    __slots__ = ("kind", "expanded", "relaxed", "peakFrontier", "seconds",
+                 "cost")
+
+    def __init__(self, kind, expanded=0, relaxed=0, peakFrontier=0,
+                 seconds=0.0, cost=None):
+        """Records a search.
+
+        For a graph, expanded is nodes settled, relaxed is edges that led
+        somewhere cheaper, and the frontier is the heap. For a PointIndex2D
+        they're buckets looked in, points compared and rings of buckets.
+
+        Args:
+            kind (str): what was searched for, usually the method's name
+            expanded (uint, optional): nodes expanded. Defaults to 0.
+            relaxed (uint, optional): edges relaxed. Defaults to 0.
+            peakFrontier (uint, optional): most nodes waiting to be searched
+                at once. Defaults to 0.
+            seconds (float, optional): wall time. Defaults to 0.0.
+            cost (float, optional): cost of what was found, None if nothing
+                was. Defaults to None.
+        """
+        self.kind         = kind
+        self.expanded     = expanded
+        self.relaxed      = relaxed
+        self.peakFrontier = peakFrontier
+        self.seconds      = seconds
+        self.cost         = cost
+
+    def __repr__(self):
+        return (f"SearchQuery({self.kind!r}, {self.expanded}, {self.relaxed}, "
+                f"{self.peakFrontier}, {self.seconds!r}, {self.cost!r})")
+
+class SearchStats():
+    """
+    Running totals over every search that's measured.
+
+    Anything that takes one of these (Graph.searchStats, say) checks it once
+    per search and runs a separate measured search only when it's asked to,
+    so leaving it as None costs nothing.
+    """
+    def __init__(self, sampleEvery=1, callback=None, keep=False):
+        """Starts collecting.
+
+        Args:
+            sampleEvery (uint, optional): measure one search in this many,
+                starting with the first. Defaults to 1, every search.
+            callback (function, optional): called with each SearchQuery as
+                it's measured. Defaults to None.
+            keep (bool, optional): whether to hold on to every SearchQuery in
+                history. Defaults to False.
+        """
+        self.sampleEvery = max(1, int(sampleEvery))
+        self.callback    = callback
+        self.keep        = keep
+
+        self.reset()
+
+    def reset(self):
+        """Forgets everything collected so far."""
+        self.seen         = 0     # searches, measured or not
+        self.queries      = 0     # searches measured
+        self.found        = 0     # measured searches that found something
+        self.expanded     = 0
+        self.relaxed      = 0
+        self.peakFrontier = 0
+        self.seconds      = 0.0
+        self.slowest      = None
+        self.history      = []
+
+    def sample(self):
+        """Counts a search, and says whether to measure it.
+
+        Returns:
+            bool: whether this one's measured
+        """
+        ret = (0 == (self.seen % self.sampleEvery))
+
+        self.seen = self.seen + 1
 
         return ret
 
-    def removeFlag(self, flag):
-        if (self.hasFlag(flag)):
-            self.flags.remove(flag)
+    def record(self, query):
+        """Adds a measured search to the totals.
 
-    def resetFlags(self):
-        self.flags = []
+        Args:
+            query (SearchQuery): what it took
+        """
+        self.queries  = self.queries + 1
+        self.expanded = self.expanded + query.expanded
+        self.relaxed  = self.relaxed + query.relaxed
+        self.seconds  = self.seconds + query.seconds
+
+        if (query.cost is not None):
+            self.found = self.found + 1
+
+        if (query.peakFrontier > self.peakFrontier):
+            self.peakFrontier = query.peakFrontier
+
+        if ((self.slowest is None) or (query.seconds > self.slowest.seconds)):
+            self.slowest = query
+
+        if (self.keep):
+            self.history.append(query)
+
+        if (self.callback is not None):
+            self.callback(query)
+
+    def summary(self):
+        """Sums it all up in a line.
+
+        Returns:
+            str: the totals, and averages per measured search
+        """
+        per = max(1, self.queries)
+
+        return (f"{self.queries} of {self.seen} searches measured, "
+                f"{self.found} found something; "
+                f"{self.expanded / per:.1f} expanded, "
+                f"{self.relaxed / per:.1f} relaxed, "
+                f"{self.seconds * 1000 / per:.3f} ms each; "
+                f"peak frontier {self.peakFrontier}")
 
 class Path():
     # represents a series of nodes that are connected, start to end
@@ -130,9 +599,11 @@ class Path():
     
     def moveto(self, node):
         if (not self.failed):
-            if (self.nodes[-1].hasNeighbor(node)):
+            edge = self.end.getConnectingEdge(node)
+
+            if (edge is not None):
                 # has link to next
-                self.cost = self.cost + self.end.getConnectingEdge(node).cost
+                self.cost = self.cost + edge.cost
                 self.nodes.append(node)
                 self.end  = node
                 
@@ -146,11 +617,59 @@ class Graph():
     # very barebones graph
     def __init__(self):
         self.contents = []
+        self.searchGeneration = 0
+
+        # a SearchStats to measure searches into, or None not to
+        self.searchStats = None
 
     def resetSearch(self):
+        """Starts a new search generation.
+
+        Nothing on the nodes is touched, so this is O(1) however big the
+        graph is. A node's cost and checked status only count if they were
+        stamped with the current generation - node.cost itself keeps whatever
+        an older search left there, so read it through costOf, which gives
+        inf for anything the latest search didn't reach.
+        """
+        self.searchGeneration = self.searchGeneration + 1
+
+    def costOf(self, node):
+        """Gets a node's cost from the latest search.
+
+        Args:
+            node (Node): node to look up
+
+        Returns:
+            float: cost to reach it, or inf if the latest search didn't
+        """
+        ret = float("inf")
+
+        if (node._costGeneration == self.searchGeneration):
+            ret = node.cost
+
+        return ret
+
+    def wasChecked(self, node):
+        """Whether the latest search got as far as expanding a node.
+
+        Args:
+            node (Node): node to look up
+
+        Returns:
+            bool: True if it was expanded
+        """
+        return node._checkedGeneration == self.searchGeneration
+
+    def clearFlag(self, flag):
+        """Removes a flag from every node in the graph.
+
+        Args:
+            flag (str): flag to remove
+        """
+        mask = ~_flagBits.get(flag, 0)
+
         for node in self.contents:
-            node.removeFlag("___checked")
-            node.cost = float("inf")
+            node.flagBits = node.flagBits & mask
 
     def isolateNode(self, node):
         """Destroys all edges leading to and from the indicated node.
@@ -160,8 +679,7 @@ class Graph():
         Args:
             node (Node): node to isolate
         """
-        for other in self.contents:
-            other.removeNeighbor(node)
+        node.isolate()
         
     def removeNode(self, node):
         """Removes node completely from the graph.
@@ -177,53 +695,187 @@ class Graph():
             self.contents.append(node)
 
     def findClosestFlaggedTo(self, flag, node):
-        ret = None
+        """Finds the cheapest node to reach from the given one with a flag.
+
+        This is a plain Dijkstra search over a binary heap. Nodes can be
+        pushed more than once as cheaper routes turn up; the stale entries
+        are simply skipped when they come off the heap rather than being
+        searched for and removed.
+
+        Args:
+            flag (str): flag to look for
+            node (Node): node to start searching from
+
+        Returns:
+            Node: the closest flagged node, or None if none can be reached.
+        """
+        stats = self.searchStats
+
+        # whether to record is decided once, out here, and the search itself
+        # is the same either way
+        if ((stats is not None) and stats.sample()):
+            query   = SearchQuery("findClosestFlaggedTo")
+            started = time.perf_counter()
+
+            found = self._closestFlagged(flag, node)
+            ret, query.expanded, query.relaxed, query.peakFrontier = found
+
+            query.seconds = time.perf_counter() - started
+
+            if (ret is not None):
+                query.cost = ret.cost
+
+            stats.record(query)
+        else:
+            ret = self._closestFlagged(flag, node)[0]
+
+        return ret
+
+    def _closestFlagged(self, flag, node):
+        # the search itself, giving back (closest, nodes expanded, nodes
+        # relaxed, biggest the heap got). the counts are kept in locals, and
+        # relaxed falls out of the tiebreak counter, so they cost next to
+        # nothing when nobody wants them
+        ret      = None
+        expanded = 0
+        relaxed  = 0
+        peak     = 0
 
         self.resetSearch()
 
         if (node in self.contents):
-            stopSearching = False
-            
+            gen  = self.searchGeneration
+            bit  = _flagBits.get(flag, 0)
+
             node.cost = 0
-            toSearch = [node]
+            node._costGeneration = gen
 
-            while (not stopSearching):
-                    
-                # get cheapest from the toSearch stack
-                swp = toSearch[0]
+            # (cost, tiebreak, node) - the tiebreak keeps heapq from ever
+            # trying to compare two nodes directly
+            tiebreak = itertools.count()
+            toSearch = [(0, next(tiebreak), node)]
+            peak     = 1
 
-                for node in toSearch:
-                    if node.cost < swp.cost:
-                        swp = node
-                
-                toSearch.remove(swp)
-
-                if not(swp.hasFlag("___checked")):
-                    # peek in on the neighbors
-                    for edge in swp.edges:
-                        if edge.canTraverse(swp):
-                            # update costs
-                            costGuess = swp.cost + edge.cost
-                            nxt = edge.traverse(swp)[0]
-                            if (nxt.cost > costGuess):
-                                nxt.cost = costGuess
-                    
-                            # add any unchecked neighbors to the search array
-                            if (not nxt.hasFlag("___checked")):
-                                toSearch.append(nxt)
-                    
-                    # give swap the checked flag so it won't be checked twice
-                    swp.addFlag("___checked")
-
-                # end conditions
-                if (swp.hasFlag(flag)):
-                    # found a target
-                    stopSearching = True
+            while (len(toSearch) > 0):
+                # get cheapest from the toSearch heap
+                cost, ignored, swp = heapq.heappop(toSearch)
+
+                # skip anything stale or already settled
+                if ((swp._checkedGeneration == gen) or (cost > swp.cost)):
+                    continue
+
+                # mark swap as checked so it won't be checked twice
+                swp._checkedGeneration = gen
+                expanded = expanded + 1
+
+                # end condition - cheapest unchecked node is a target
+                if (swp.flagBits & bit):
                     ret = swp
-                elif (0 == len(toSearch)):
-                    # no more connections to search
-                    stopSearching = True
-                    ret = None
+                    break
+
+                # peek in on the neighbors
+                for edge in swp.edges:
+                    if edge.canTraverse(swp):
+                        # update costs, anything from an older search is
+                        # as good as infinite
+                        costGuess = cost + edge.cost
+                        nxt = edge.traverse(swp)[0]
+
+                        if ((nxt._costGeneration != gen) or
+                            (nxt.cost > costGuess)):
+                            nxt.cost = costGuess
+                            nxt._costGeneration = gen
+                            heapq.heappush(toSearch,
+                                           (costGuess, next(tiebreak), nxt))
+
+                if (len(toSearch) > peak):
+                    peak = len(toSearch)
+
+            # every push took a tiebreak, and the start took the first
+            relaxed = next(tiebreak) - 1
+
+        return ret, expanded, relaxed, peak
+
+    def findPath(self, start, goal, heuristic=noHeuristic):
+        """Finds the cheapest path between two nodes with A*.
+
+        The heuristic has to be admissible and consistent for the graph at
+        hand - it should never guess higher than the real remaining cost - or
+        the path found may not be the cheapest one.
+
+        Args:
+            start (Node): node to start from
+            goal (Node): node to finish at
+            heuristic (function, optional): (node, goal) -> estimated cost
+                remaining. Defaults to noHeuristic, which makes this plain
+                Dijkstra.
+
+        Returns:
+            Path: the cheapest path found, or None if goal can't be reached.
+        """
+        ret = None
+
+        self.resetSearch()
+
+        if ((start in self.contents) and (goal in self.contents)):
+            gen     = self.searchGeneration
+            parents = {id(start): None}
+            found   = False
+
+            start.cost = 0
+            start._costGeneration = gen
+
+            # (estimated total, estimated remaining, tiebreak, cost, node)
+            # preferring low remaining estimates on a tie heads straight for
+            # the goal instead of fanning out across equally good nodes
+            tiebreak = itertools.count()
+            guess    = heuristic(start, goal)
+            toSearch = [(guess, guess, next(tiebreak), 0, start)]
+
+            while (len(toSearch) > 0):
+                ignored, ignored, ignored, cost, swp = heapq.heappop(toSearch)
+
+                # skip anything stale or already settled
+                if ((swp._checkedGeneration == gen) or (cost > swp.cost)):
+                    continue
+
+                swp._checkedGeneration = gen
+
+                if (swp is goal):
+                    found = True
+                    break
+
+                for edge in swp.edges:
+                    if edge.canTraverse(swp):
+                        costGuess = cost + edge.cost
+                        nxt = edge.traverse(swp)[0]
+
+                        if ((nxt._costGeneration != gen) or
+                            (nxt.cost > costGuess)):
+                            nxt.cost = costGuess
+                            nxt._costGeneration = gen
+                            parents[id(nxt)] = swp
+
+                            guess = heuristic(nxt, goal)
+                            heapq.heappush(toSearch,
+                                           (costGuess + guess, guess,
+                                            next(tiebreak), costGuess, nxt))
+
+            if (found):
+                # walk it back, then lay it out front to back
+                route = []
+                swp   = goal
+
+                while (swp is not None):
+                    route.append(swp)
+                    swp = parents[id(swp)]
+
+                route.reverse()
+
+                ret = Path(start)
+
+                for node in route[1:]:
+                    ret.moveto(node)
 
         return ret
 
@@ -231,6 +883,8 @@ class Node2D(Node):
     """
     A single location in the search graph.
     """
+    __slots__ = ("x", "y")
+
     def __init__(self):
         # parent constructor
         super().__init__()
@@ -273,6 +927,9 @@ class Graph2D(Graph):
         self.width  = width
         self.height = height
 
+        self.cardinalNeighbors = cardinalNeighbors
+        self.diagonalNeighbors = diagonalNeighbors
+
         self.grid = [] # the contents laid out in a coordinate grid
 
         # build the basic graph first
@@ -302,21 +959,125 @@ class Graph2D(Graph):
         if (diagonalNeighbors):
             self.connectDiagonals()
 
-    def connectCardinals(self):
+    def findPath(self, start, goal, heuristic=None):
+        """Finds the cheapest path between two nodes with A*.
+
+        Args:
+            start (Node2D): node to start from
+            goal (Node2D): node to finish at
+            heuristic (function, optional): (node, goal) -> estimated cost
+                remaining. Defaults to None, which picks chebyshevDistance if
+                diagonal neighbors are connected or manhattanDistance if not.
+                Both assume the default edge cost of 1.0; pass octileDistance
+                if diagonal edges cost sqrt(2).
+
+        Returns:
+            Path: the cheapest path found, or None if goal can't be reached.
         """
-        Connect nodes in this graph to their cardinal neighbors. North, south,
-        east, and west.
+        if (heuristic is None):
+            if (self.diagonalNeighbors):
+                heuristic = chebyshevDistance
+            else:
+                heuristic = manhattanDistance
+
+        return super().findPath(start, goal, heuristic)
+
+    def distanceTransform(self, seeds, connectivity=None):
+        """Works out the distance from every node to the closest seed at once.
+
+        This is for when every step costs the same, like pixels on a canvas.
+        Rather than searching node by node, the whole grid's swept a row at a
+        time through numpy, so a full field comes back in milliseconds. Edge
+        costs aren't looked at; isolated nodes are taken to be walls, and
+        apart from that the grid's taken to be fully connected.
+
+        Walls can mean sweeping more than once. Anything that winds back and
+        forth like a maze would take a round of sweeps per turn, so after a
+        few it's finished with an ordinary search over every cell instead,
+        which is about as slow as findClosestFlaggedTo searching the whole
+        grid.
+
+        Args:
+            seeds (list): nodes to measure from
+            connectivity (str, optional): CONNECT_CARDINAL, CONNECT_DIAGONAL
+                or CONNECT_CHEBYSHEV. Defaults to None, which picks chebyshev
+                if diagonal neighbors are connected or cardinal if not, same
+                as findPath's heuristic.
+
+        Raises:
+            ValueError: the connectivity isn't one of those
+
+        Returns:
+            numpy.ndarray: distances indexed [x, y] like grid, inf wherever
+                no seed can be reached
         """
-        for x in range (self.width):
-            for y in range (self.height):
-                # west
-                if (x > 0):
-                    self.grid[x][y].addNeighbor(self.grid[x-1][y])
-                # north
-                if (y > 0):
-                    self.grid[x][y].addNeighbor(self.grid[x][y-1])
-                # east
-                if (x < self.width - 1):
+        import numpy
+
+        if (connectivity is None):
+            if (self.diagonalNeighbors):
+                connectivity = CONNECT_CHEBYSHEV
+            else:
+                connectivity = CONNECT_CARDINAL
+
+        blocked = numpy.fromiter((0 == len(node.edges) for node in
+                                  itertools.chain.from_iterable(self.grid)),
+                                 dtype=bool, count=self.width * self.height)
+
+        return _distanceTransform(numpy,
+                                  blocked.reshape(self.width, self.height),
+                                  [(node.x, node.y) for node in seeds],
+                                  connectivity)
+
+    def nearestFlagged(self, flag, distances):
+        """Finds the flagged node with the least distance in a transform.
+
+        Given a distanceTransform from a single node, that's the closest
+        flagged node to it.
+
+        Args:
+            flag (str): flag to look for
+            distances (numpy.ndarray): a distanceTransform of this graph
+
+        Returns:
+            Node2D: the closest flagged node, or None if none can be reached.
+        """
+        import numpy
+
+        ret = None
+        bit = _flagBits.get(flag, 0)
+
+        flagged = numpy.fromiter(map(bit.__and__,
+                                     map(operator.attrgetter("flagBits"),
+                                         itertools.chain.from_iterable(
+                                             self.grid))),
+                                 dtype=bool, count=self.width * self.height)
+
+        found = numpy.where(flagged.reshape(self.width, self.height),
+                            distances, numpy.inf)
+
+        if (found.size > 0):
+            x, y = numpy.unravel_index(numpy.argmin(found), found.shape)
+
+            if (found[x, y] < numpy.inf):
+                ret = self.grid[x][y]
+
+        return ret
+
+    def connectCardinals(self):
+        """
+        Connect nodes in this graph to their cardinal neighbors. North, south,
+        east, and west.
+        """
+        for x in range (self.width):
+            for y in range (self.height):
+                # west
+                if (x > 0):
+                    self.grid[x][y].addNeighbor(self.grid[x-1][y])
+                # north
+                if (y > 0):
+                    self.grid[x][y].addNeighbor(self.grid[x][y-1])
+                # east
+                if (x < self.width - 1):
                     self.grid[x][y].addNeighbor(self.grid[x+1][y])
                 # south
                 if (y < self.height - 1):
@@ -340,4 +1101,707 @@ class Graph2D(Graph):
                     self.grid[x][y].addNeighbor(self.grid[x-1][y+1])
                 # southeast
                 if ((x < self.width - 1) and (y < self.height - 1)):
-                    self.grid[x][y].addNeighbor(self.grid[x+1][y+1])
\ No newline at end of file
+                    self.grid[x][y].addNeighbor(self.grid[x+1][y+1])
+
+class GridGraph2D():
+    """
+    A 2D search graph that never builds any Node or Edge objects.
+    """
+    def __init__(self, width, height, cardinalNeighbors=True,
+                 diagonalNeighbors=False):
+        """Create an implicit 2D search graph.
+
+        This covers the same ground as Graph2D, but everything about a cell is
+        kept in flat arrays indexed by `y * width + x`, and neighbors are
+        worked out from the position when they're needed. A node here is just
+        that index - an int.
+
+        Args:
+            width (uint):
+                width in nodes to make the graph
+            height (uint):
+                height in nodes to make the graph
+            cardinalNeighbors (bool, optional):
+                Whether north, south, east, and west nodes are neighbors.
+                Defaults to True.
+            diagonalNeighbors (bool, optional):
+                Whether northeast, northwest, southeast, and southwest nodes
+                are neighbors. Defaults to False.
+        """
+        self.width  = width
+        self.height = height
+        self.size   = width * height
+
+        self.cardinalNeighbors = cardinalNeighbors
+        self.diagonalNeighbors = diagonalNeighbors
+
+        # every node, and the same laid out so grid[x][y] is the node at
+        # (x, y) like Graph2D's. a column's just a range, so there's still
+        # nothing built per node
+        self.contents = range(self.size)
+        self.grid     = tuple(range(x, self.size, width) for x in range(width))
+
+        # what it costs to step into each node
+        self.costs    = array.array("d", [1.0]) * self.size
+
+        # whether each node can be stepped into at all
+        self.walkable = bytearray(b"\x01") * self.size
+
+        # one column per flag, a nonzero byte means the node has it
+        self.flags    = {}
+
+        # (x offset, y offset, index offset) for each kind of neighbor
+        self.steps = []
+
+        if (cardinalNeighbors):
+            self.steps.extend([(-1,  0, -1),
+                               ( 0, -1, -width),
+                               ( 1,  0,  1),
+                               ( 0,  1,  width)])
+
+        if (diagonalNeighbors):
+            self.steps.extend([(-1, -1, -width - 1),
+                               ( 1, -1, -width + 1),
+                               (-1,  1,  width - 1),
+                               ( 1,  1,  width + 1)])
+
+    def nodeAt(self, x, y):
+        """Gets the node at a position.
+
+        Args:
+            x (uint): x position
+            y (uint): y position
+
+        Returns:
+            int: the node at that position
+        """
+        return (y * self.width) + x
+
+    def positionOf(self, node):
+        """Gets the position of a node.
+
+        Args:
+            node (int): node to look up
+
+        Returns:
+            tuple: (x, y) of the node
+        """
+        return (node % self.width), (node // self.width)
+
+    def neighbors(self, node):
+        """Lists the nodes that can be stepped into from the given one.
+
+        Args:
+            node (int): node to start from
+
+        Returns:
+            list: (node, cost) tuples for each walkable neighbor
+        """
+        ret = []
+        x, y = self.positionOf(node)
+
+        for dx, dy, step in self.steps:
+            nx = x + dx
+            ny = y + dy
+
+            if ((0 <= nx < self.width) and (0 <= ny < self.height)):
+                nxt = node + step
+
+                if (self.walkable[nxt]):
+                    ret.append((nxt, self.costs[nxt]))
+
+        return ret
+
+    def setCost(self, node, cost):
+        """Sets what it costs to step into a node.
+
+        A DistanceField over the graph needs telling with nodeChanged.
+
+        Args:
+            node (int): node to change
+            cost (float): cost of stepping into it from any neighbor
+        """
+        self.costs[node] = float(cost)
+
+    def setWalkable(self, node, walkable):
+        """Sets whether a node can be stepped into at all.
+
+        A DistanceField over the graph needs telling with nodeChanged.
+
+        Args:
+            node (int): node to change
+            walkable (bool): False makes it a wall
+        """
+        self.walkable[node] = 1 if walkable else 0
+
+    def addFlag(self, node, flag):
+        if (flag not in self.flags):
+            self.flags[flag] = bytearray(self.size)
+
+        self.flags[flag][node] = 1
+
+    def hasFlag(self, node, flag):
+        ret = False
+
+        if (flag in self.flags):
+            ret = (0 != self.flags[flag][node])
+
+        return ret
+
+    def removeFlag(self, node, flag):
+        if (flag in self.flags):
+            self.flags[flag][node] = 0
+
+    def resetFlags(self):
+        self.flags = {}
+
+    def clearFlag(self, flag):
+        """Removes a flag from every node in the graph in one go.
+
+        Args:
+            flag (str): flag to remove
+        """
+        if (flag in self.flags):
+            self.flags[flag][:] = bytes(self.size)
+
+    def distanceField(self, flag):
+        """Starts keeping track of how far every node is from a flag.
+
+        Flag changes need to go through the field from here on (or be
+        reported to it) for it to stay right. See DistanceField.
+
+        Args:
+            flag (str): flag to measure distance to
+
+        Returns:
+            DistanceField: the field, with nothing worked out yet
+        """
+        return DistanceField(self, flag)
+
+    def distanceTransform(self, seeds, connectivity=None):
+        """Works out the distance from every node to the closest seed at once.
+
+        Same as Graph2D.distanceTransform, over the walkable array. Every
+        step costs 1 (or sqrt(2) going diagonally, for CONNECT_DIAGONAL)
+        whatever the costs array says, so this only matches
+        findClosestFlaggedTo on a graph where those are all 1.
+
+        Args:
+            seeds (list): nodes to measure from
+            connectivity (str, optional): CONNECT_CARDINAL, CONNECT_DIAGONAL
+                or CONNECT_CHEBYSHEV. Defaults to None, which picks chebyshev
+                if there are diagonal neighbors or cardinal if not.
+
+        Raises:
+            ValueError: the connectivity isn't one of those
+
+        Returns:
+            numpy.ndarray: distances indexed by node, inf wherever no seed can
+                be reached
+        """
+        import numpy
+
+        if (connectivity is None):
+            if (any((0 != dx) and (0 != dy) for dx, dy, step in self.steps)):
+                connectivity = CONNECT_CHEBYSHEV
+            else:
+                connectivity = CONNECT_CARDINAL
+
+        walkable = numpy.frombuffer(self.walkable, dtype=numpy.uint8)
+        blocked  = (0 == walkable).reshape(self.height, self.width)
+
+        return _distanceTransform(numpy, blocked,
+                                  [divmod(node, self.width) for node in seeds],
+                                  connectivity).reshape(self.size)
+
+    def nearestFlagged(self, flag, distances):
+        """Finds the flagged node with the least distance in a transform.
+
+        Given a distanceTransform from a single node, that's the closest
+        flagged node to it.
+
+        Args:
+            flag (str): flag to look for
+            distances (numpy.ndarray): a distanceTransform of this graph
+
+        Returns:
+            int: the closest flagged node, or None if none can be reached.
+        """
+        import numpy
+
+        ret    = None
+        column = self.flags.get(flag)
+
+        if ((column is not None) and (self.size > 0)):
+            flagged = numpy.frombuffer(column, dtype=numpy.uint8)
+            found   = numpy.where(flagged, distances, numpy.inf)
+            node    = int(numpy.argmin(found))
+
+            if (found[node] < numpy.inf):
+                ret = node
+
+        return ret
+
+    def findClosestFlaggedTo(self, flag, node):
+        """Finds the cheapest node to reach from the given one with a flag.
+
+        Same Dijkstra search as Graph.findClosestFlaggedTo, just run over the
+        arrays instead of over objects.
+
+        Args:
+            flag (str): flag to look for
+            node (int): node to start searching from
+
+        Returns:
+            int: the closest flagged node, or None if none can be reached.
+        """
+        ret = None
+
+        column = self.flags.get(flag)
+
+        if ((column is not None) and (0 <= node < self.size)):
+            width    = self.width
+            height   = self.height
+            costs    = self.costs
+            walkable = self.walkable
+            steps    = self.steps
+
+            dist     = array.array("d", [float("inf")]) * self.size
+            checked  = bytearray(self.size)
+
+            dist[node] = 0.0
+            toSearch   = [(0.0, node)]
+
+            while (len(toSearch) > 0):
+                cost, swp = heapq.heappop(toSearch)
+
+                # skip anything stale or already settled
+                if (checked[swp] or (cost > dist[swp])):
+                    continue
+
+                checked[swp] = 1
+
+                # end condition - cheapest unchecked node is a target
+                if (column[swp]):
+                    ret = swp
+                    break
+
+                # peek in on the neighbors
+                x = swp % width
+                y = swp // width
+
+                for dx, dy, step in steps:
+                    nx = x + dx
+                    ny = y + dy
+
+                    if ((0 <= nx < width) and (0 <= ny < height)):
+                        nxt = swp + step
+
+                        if (walkable[nxt]):
+                            costGuess = cost + costs[nxt]
+
+                            if (dist[nxt] > costGuess):
+                                dist[nxt] = costGuess
+                                heapq.heappush(toSearch, (costGuess, nxt))
+
+        return ret
+
+class DistanceField():
+    """
+    The cost from every node in a GridGraph2D to the closest node with a
+    flag, kept between queries.
+    """
+    def __init__(self, graph, flag, bucketSize=8):
+        """Creates a field over a graph. Nothing is searched until asked.
+
+        This is D* Lite run backwards from every flagged node at once. Each
+        node keeps its cost (dist) and what its neighbors say its cost should
+        be (rhs), and only nodes where those disagree ever get searched - in
+        order of how much they could matter to wherever the query is from.
+        Taking away a target, or asking from somewhere new, only repairs as
+        much of the field as that question needs rather than starting over.
+
+        Unlike D* Lite, nodes waiting to be searched aren't kept in one queue
+        between queries. They're filed in square buckets by where they are,
+        and each query only queues up the buckets close enough to matter to
+        it, keyed from scratch. That way nothing has to be keyed again as
+        queries move around, however far they wander.
+
+        Args:
+            graph (GridGraph2D): graph to measure over
+            flag (str): flag to measure distance to
+            bucketSize (uint, optional): width and height of each bucket of
+                waiting nodes. Defaults to 8.
+        """
+        self.graph = graph
+        self.flag  = flag
+
+        if (flag not in graph.flags):
+            graph.flags[flag] = bytearray(graph.size)
+
+        inf = float("inf")
+
+        self.dist = array.array("d", [inf]) * graph.size
+        self.rhs  = array.array("d", [inf]) * graph.size
+
+        # the neighbor each node's rhs came from, -1 for none. only nodes
+        # counting on one that gets dearer have to be worked out again
+        self._parent = array.array("i", [-1]) * graph.size
+
+        # nodes expanded by the last query, and by every query so far
+        self.expanded      = 0
+        self.totalExpanded = 0
+        self.queries       = 0
+
+        self._offsets = [step for dx, dy, step in graph.steps]
+
+        # the heuristic is a step count times the cheapest step, so it never
+        # guesses high. any diagonal steps mean chebyshev steps
+        self._diagonal = any((0 != dx) and (0 != dy)
+                             for dx, dy, step in graph.steps)
+        self._minCost  = max(0.0, min(graph.costs)) if (graph.size > 0) else 0.0
+
+        # where the running query's from, and the heuristic to it from each
+        # column and row
+        self._startX = 0
+        self._startY = 0
+        self._guessX = []
+        self._guessY = []
+
+        # every node whose dist and rhs disagree, once each, by bucket
+        self.bucketSize = bucketSize
+        self._columns   = ((graph.width - 1) // bucketSize) + 1
+        self._rows      = ((graph.height - 1) // bucketSize) + 1
+        self._pending   = [set() for i in range(self._columns * self._rows)] # pylint: disable=unused-variable
+        self._bucketOf  = array.array("i", [
+            (y // bucketSize) * self._columns + (x // bucketSize)
+            for y in range(graph.height) for x in range(graph.width)])
+
+        # (key, tiebreak, node) for the running query, None between queries
+        self._queue = None
+
+        column = graph.flags[flag]
+
+        for node in itertools.compress(range(graph.size), column):
+            self.rhs[node] = 0.0
+            self._mark(node)
+
+    def _key(self, node):
+        # the best guess at a path from the start through node, then a
+        # tiebreak - nodes getting dearer go first, then the furthest from a
+        # target, which is the closest to the start. see _repair
+        dist = self.dist[node]
+        rhs  = self.rhs[node]
+
+        if (dist < rhs):
+            best     = dist
+            tiebreak = float("-inf")
+        else:
+            best     = rhs
+            tiebreak = -rhs
+
+        y, x = divmod(node, self.graph.width)
+        dx   = self._guessX[x]
+        dy   = self._guessY[y]
+
+        if (self._diagonal):
+            ret = (best + (dx if (dx > dy) else dy), tiebreak)
+        else:
+            ret = (best + dx + dy, tiebreak)
+
+        return ret
+
+    def _push(self, node):
+        key = self._key(node)
+        heapq.heappush(self._queue, (key[0], key[1], node))
+
+    def _mark(self, node):
+        # file node as pending or not, depending on whether it's consistent,
+        # and queue it up if a query's running
+        pending = self._pending[self._bucketOf[node]]
+
+        if (self.dist[node] != self.rhs[node]):
+            pending.add(node)
+
+            if (self._queue is not None):
+                self._push(node)
+        else:
+            pending.discard(node)
+
+    def _ring(self, bx, by, ring):
+        # the buckets exactly ring steps away, clipped to the graph
+        ret = []
+
+        if (0 == ring):
+            ret.append((bx, by))
+        else:
+            left   = bx - ring
+            right  = bx + ring
+            top    = by - ring
+            bottom = by + ring
+
+            for cx in range(max(left, 0), min(right, self._columns - 1) + 1):
+                if (top >= 0):
+                    ret.append((cx, top))
+                if (bottom < self._rows):
+                    ret.append((cx, bottom))
+
+            for cy in range(max(top + 1, 0), min(bottom - 1, self._rows - 1) + 1):
+                if (left >= 0):
+                    ret.append((left, cy))
+                if (right < self._columns):
+                    ret.append((right, cy))
+
+        return ret
+
+    def _around(self, node):
+        # every node one step away, walkable or not
+        graph = self.graph
+        x     = node % graph.width
+        y     = node // graph.width
+
+        if ((0 < x < graph.width - 1) and (0 < y < graph.height - 1)):
+            # nowhere near an edge, which is nearly everywhere
+            ret = list(map(node.__add__, self._offsets))
+        else:
+            ret = []
+
+            for dx, dy, step in graph.steps:
+                if ((0 <= x + dx < graph.width) and
+                    (0 <= y + dy < graph.height)):
+                    ret.append(node + step)
+
+        return ret
+
+    def _reparent(self, node):
+        # work out what node's cost should be from its neighbors, and file it
+        # as pending if that's not what it is. gives back whether it only
+        # looks settled because of a free step - see _raise
+        rhs    = self.rhs
+        dist   = self.dist
+        costs  = self.graph.costs
+        parent = -1
+
+        if (self.graph.flags[self.flag][node]):
+            rhs[node] = 0.0
+        else:
+            walkable = self.graph.walkable
+            best     = float("inf")
+
+            for nxt in self._around(node):
+                if (walkable[nxt]):
+                    costGuess = costs[nxt] + dist[nxt]
+
+                    if (costGuess < best):
+                        best   = costGuess
+                        parent = nxt
+
+            rhs[node] = best
+
+        self._parent[node] = parent
+
+        self._mark(node)
+
+        return ((parent >= 0) and (0 == costs[parent]) and
+                (dist[node] == rhs[node]) and (dist[node] < float("inf")))
+
+    def _updateNode(self, node):
+        if (self._reparent(node)):
+            self._raise(node)
+
+    def _raise(self, node):
+        # node's cost is going up, so it and anything counting on it need
+        # working out again. normally those just get queued and raised in
+        # turn, but a zero cost step can make one look just as cheap through
+        # its own kids - which were counting on node too - so those get
+        # raised straight away and take their kids down with them
+        dist    = self.dist
+        parents = self._parent
+        raised  = [node]
+
+        dist[node] = float("inf")
+        self._reparent(node)
+
+        while (len(raised) > 0):
+            prev = raised.pop()
+
+            for kid in self._around(prev):
+                if ((parents[kid] == prev) and self._reparent(kid)):
+                    dist[kid] = float("inf")
+                    self._mark(kid)
+                    raised.append(kid)
+
+    def _repair(self, start):
+        # settle nodes in key order until start's cost can't change any more.
+        # pending nodes come into the queue a ring of buckets at a time, once
+        # the nearest a ring's nodes could be is no further than what's at
+        # the front. every queued node gets pushed again whenever it changes,
+        # so an entry whose key's out of date has a newer one behind it.
+        #
+        # D* Lite breaks ties on the smaller cost, which on an open grid
+        # means settling every node that's as good a guess as the start
+        # before the start itself. with a consistent heuristic anything that
+        # could make a node cheaper has a strictly lower key, so among nodes
+        # getting cheaper the order doesn't matter, and going deepest first
+        # heads straight for the start. anything getting dearer could still
+        # be holding up something with the same key, so those go first
+        dist     = self.dist
+        rhs      = self.rhs
+        column   = self.graph.flags[self.flag]
+        costs    = self.graph.costs
+        walkable = self.graph.walkable
+        inf      = float("inf")
+
+        size   = self.bucketSize
+        bx     = self._startX // size
+        by     = self._startY // size
+        rings  = max(bx, by, self._columns - 1 - bx, self._rows - 1 - by)
+        ring   = 0
+        nearby = 0.0
+
+        queue = self._queue = []
+
+        while (True):
+            # the heuristic's nothing at the start itself
+            settled  = (dist[start] == rhs[start])
+            startKey = min(dist[start], rhs[start])
+            startTie = -startKey if (settled) else -inf
+
+            # the lowest key anything not queued yet could have is nearby
+            while ((ring <= rings) and
+                   (nearby <= min(queue[0][0] if (len(queue) > 0) else inf,
+                                  startKey if (settled) else inf))):
+                for cx, cy in self._ring(bx, by, ring):
+                    for node in self._pending[cy * self._columns + cx]:
+                        self._push(node)
+
+                ring   = ring + 1
+                nearby = ((ring - 1) * size + 1) * self._minCost
+
+            if ((len(queue) == 0) or
+                (settled and ((queue[0][0], queue[0][1]) >= (startKey,
+                                                             startTie)))):
+                break
+
+            k1, k2, node = heapq.heappop(queue)
+
+            if ((dist[node] == rhs[node]) or ((k1, k2) != self._key(node))):
+                # consistent already, or there's a newer entry
+                continue
+
+            self.expanded = self.expanded + 1
+
+            if (dist[node] > rhs[node]):
+                # got cheaper, which can only make it cheaper to get here
+                dist[node] = rhs[node]
+                costGuess  = costs[node] + dist[node]
+                around     = self._around(node) if (walkable[node]) else []
+
+                self._mark(node)
+
+                for prev in around:
+                    if ((not column[prev]) and (costGuess < rhs[prev])):
+                        rhs[prev]          = costGuess
+                        self._parent[prev] = node
+                        self._mark(prev)
+            else:
+                # got dearer, so it and anything that was counting on it
+                # need working out again
+                self._raise(node)
+
+        self._queue = None
+
+    def _query(self, start):
+        self.expanded = 0
+        self.queries  = self.queries + 1
+
+        self._startY, self._startX = divmod(start, self.graph.width)
+
+        # the heuristic from each column and row, so keys are just lookups
+        minCost      = self._minCost
+        self._guessX = [abs(x - self._startX) * minCost
+                        for x in range(self.graph.width)]
+        self._guessY = [abs(y - self._startY) * minCost
+                        for y in range(self.graph.height)]
+
+        self._repair(start)
+
+        self.totalExpanded = self.totalExpanded + self.expanded
+
+    def distance(self, node):
+        """Gets the cost from a node to the closest flagged one.
+
+        Args:
+            node (int): node to measure from
+
+        Returns:
+            float: the cost, or inf if no flagged node can be reached
+        """
+        self._query(node)
+
+        return self.dist[node]
+
+    def nearest(self, node):
+        """Finds the cheapest flagged node to reach from the given one.
+
+        Args:
+            node (int): node to start from
+
+        Returns:
+            int: the closest flagged node, or None if none can be reached.
+        """
+        ret = None
+
+        self._query(node)
+
+        if (self.dist[node] < float("inf")):
+            column = self.graph.flags[self.flag]
+            ret    = node
+
+            # each node's cost came from its parent, so following parents
+            # walks a cheapest path. zero cost steps mean it can't just roll
+            # downhill, it'd stop on the flat
+            steps = 0
+
+            while ((ret is not None) and (not column[ret])):
+                ret   = self._parent[ret]
+                steps = steps + 1
+
+                if ((ret < 0) or (steps > self.graph.size)):
+                    ret = None
+
+        return ret
+
+    def addTarget(self, node):
+        """Flags a node and lets the field know.
+
+        Args:
+            node (int): node to flag
+        """
+        self.graph.addFlag(node, self.flag)
+        self._updateNode(node)
+
+    def removeTarget(self, node):
+        """Unflags a node and lets the field know.
+
+        Args:
+            node (int): node to unflag
+        """
+        self.graph.removeFlag(node, self.flag)
+        self._updateNode(node)
+
+    def nodeChanged(self, node):
+        """Lets the field know a node's cost or walkability has changed.
+
+        Args:
+            node (int): node that changed
+        """
+        if (self.graph.costs[node] < self._minCost):
+            # the heuristic has to come down to stay a lower bound. keys are
+            # worked out fresh every query, so nothing else needs to change
+            self._minCost = max(0.0, self.graph.costs[node])
+
+        self._updateNode(node)
+
+        for prev in self._around(node):
+            self._updateNode(prev)
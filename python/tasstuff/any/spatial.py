@@ -0,0 +1,354 @@
+import time
+
+from tasstuff.any.search import FLAG_TARGET
+from tasstuff.any.search import GridGraph2D
+from tasstuff.any.search import SearchQuery
+
+class PointIndex2D():
+    """
+    A bucketed grid of points for fast "what's closest to here" questions.
+    """
+    def __init__(self, minX, minY, maxX, maxY, bucketSize=8):
+        """Creates an empty index covering a rectangle.
+
+        Distance here is Chebyshev distance - the larger of the x and y
+        distances - with ties going to whichever point has the smaller
+        Manhattan distance. That's the same as the number of frames a mouse
+        takes to get somewhere when it moves both axes at once, with a
+        preference for straight lines.
+
+        Args:
+            minX (int): smallest x the index accepts
+            minY (int): smallest y the index accepts
+            maxX (int): largest x the index accepts, inclusive
+            maxY (int): largest y the index accepts, inclusive
+            bucketSize (uint, optional): width and height of each bucket.
+                Defaults to 8.
+        """
+        self.minX = minX
+        self.minY = minY
+        self.maxX = maxX
+        self.maxY = maxY
+
+        self.bucketSize = bucketSize
+
+        self.columns = ((maxX - minX) // bucketSize) + 1
+        self.rows    = ((maxY - minY) // bucketSize) + 1
+
+        # each bucket is a set of (x, y, item) entries
+        self.buckets = [set() for i in range(self.columns * self.rows)] # pylint: disable=unused-variable
+
+        self.count = 0
+
+        # a SearchStats to measure nearest into, or None not to
+        self.stats = None
+
+    def __len__(self):
+        return self.count
+
+    def _bucketOf(self, x, y):
+        if ((x < self.minX) or (x > self.maxX) or
+            (y < self.minY) or (y > self.maxY)):
+            raise ValueError(f"({x}, {y}) is outside the index!")
+
+        bx = (x - self.minX) // self.bucketSize
+        by = (y - self.minY) // self.bucketSize
+
+        return (by * self.columns) + bx
+
+    def add(self, x, y, item=None):
+        """Adds a point. Adding the same point and item twice does nothing.
+
+        Args:
+            x (int): x position
+            y (int): y position
+            item (hashable, optional): anything to carry along with the point.
+                Defaults to None.
+        """
+        bucket = self.buckets[self._bucketOf(x, y)]
+        entry  = (x, y, item)
+
+        if (entry not in bucket):
+            bucket.add(entry)
+            self.count = self.count + 1
+
+    def remove(self, x, y, item=None):
+        """Removes a point.
+
+        Args:
+            x (int): x position
+            y (int): y position
+            item (hashable, optional): item it was added with. Defaults to
+                None.
+
+        Returns:
+            bool: whether the point was there to remove
+        """
+        bucket = self.buckets[self._bucketOf(x, y)]
+        entry  = (x, y, item)
+        ret    = False
+
+        if (entry in bucket):
+            bucket.remove(entry)
+            self.count = self.count - 1
+            ret = True
+
+        return ret
+
+    def __contains__(self, entry):
+        x, y, item = entry
+
+        return entry in self.buckets[self._bucketOf(x, y)]
+
+    def nearest(self, x, y):
+        """Finds the closest point to a position.
+
+        Buckets are checked in rings around the one the position falls into,
+        stopping once nothing in the next ring could possibly beat what's
+        already been found.
+
+        Args:
+            x (int): x position, which may be outside the index
+            y (int): y position, which may be outside the index
+
+        Returns:
+            tuple: (x, y, item) of the closest point, or None if empty.
+        """
+        stats = self.stats
+
+        # whether to record is decided once, out here, and the search itself
+        # is the same either way
+        if ((stats is not None) and stats.sample()):
+            query   = SearchQuery("nearest")
+            started = time.perf_counter()
+
+            found = self._nearest(x, y)
+            ret, query.expanded, query.relaxed, query.peakFrontier = found[:4]
+
+            if (ret is not None):
+                query.cost = found[4]
+
+            query.seconds = time.perf_counter() - started
+            stats.record(query)
+        else:
+            ret = self._nearest(x, y)[0]
+
+        return ret
+
+    def _nearest(self, x, y):
+        # the search itself, giving back (closest, buckets looked in, points
+        # compared, rings searched, chebyshev distance to the closest). the
+        # counts are kept in locals and bumped once a bucket, so they cost
+        # next to nothing when nobody wants them
+        best     = None
+        bestCheb = 0
+        buckets  = 0
+        points   = 0
+        ring     = 0
+
+        if (self.count > 0):
+            size = self.bucketSize
+
+            # clamp into the index just to pick a starting bucket
+            bx = (min(max(x, self.minX), self.maxX) - self.minX) // size
+            by = (min(max(y, self.minY), self.maxY) - self.minY) // size
+
+            bestManh  = 0
+            maxRing   = max(bx, by, self.columns - 1 - bx, self.rows - 1 - by)
+
+            while (ring <= maxRing):
+                # nothing in this ring can be closer than the edge of the
+                # block of buckets inside it
+                if (best is not None):
+                    left   = x - (self.minX + ((bx - ring + 1) * size)) + 1
+                    right  = (self.minX + ((bx + ring) * size)) - x
+                    top    = y - (self.minY + ((by - ring + 1) * size)) + 1
+                    bottom = (self.minY + ((by + ring) * size)) - y
+
+                    if (min(left, right, top, bottom) > bestCheb):
+                        break
+
+                for cx, cy in self._ring(bx, by, ring):
+                    bucket  = self.buckets[(cy * self.columns) + cx]
+                    buckets = buckets + 1
+                    points  = points + len(bucket)
+
+                    for entry in bucket:
+                        dx   = abs(entry[0] - x)
+                        dy   = abs(entry[1] - y)
+                        cheb = max(dx, dy)
+                        manh = dx + dy
+
+                        if ((best is None) or (cheb < bestCheb) or
+                            ((cheb == bestCheb) and (manh < bestManh))):
+                            best     = entry
+                            bestCheb = cheb
+                            bestManh = manh
+
+                ring = ring + 1
+
+        return best, buckets, points, ring, bestCheb
+
+    def _ring(self, bx, by, ring):
+        """Lists the buckets exactly ring steps away, clipped to the index."""
+        ret = []
+
+        if (0 == ring):
+            ret.append((bx, by))
+        else:
+            left   = bx - ring
+            right  = bx + ring
+            top    = by - ring
+            bottom = by + ring
+
+            for cx in range(max(left, 0), min(right, self.columns - 1) + 1):
+                if (top >= 0):
+                    ret.append((cx, top))
+                if (bottom < self.rows):
+                    ret.append((cx, bottom))
+
+            for cy in range(max(top + 1, 0), min(bottom - 1, self.rows - 1) + 1):
+                if (left >= 0):
+                    ret.append((left, cy))
+                if (right < self.columns):
+                    ret.append((right, cy))
+
+        return ret
+
+class FieldIndex2D():
+    """
+    The same questions as PointIndex2D, answered from a distance field that's
+    kept up to date as points come and go.
+    """
+    def __init__(self, minX, minY, maxX, maxY):
+        """Creates an empty index covering a rectangle.
+
+        Distance is Chebyshev distance, the same as PointIndex2D, but ties go
+        whichever way the field happens to lead rather than to the smaller
+        Manhattan distance. Positions outside the rectangle are moved onto
+        its edge before asking.
+
+        Args:
+            minX (int): smallest x the index accepts
+            minY (int): smallest y the index accepts
+            maxX (int): largest x the index accepts, inclusive
+            maxY (int): largest y the index accepts, inclusive
+        """
+        self.minX = minX
+        self.minY = minY
+        self.maxX = maxX
+        self.maxY = maxY
+
+        # diagonal steps cost the same as straight ones, so step counts are
+        # chebyshev distances
+        self.graph = GridGraph2D(maxX - minX + 1, maxY - minY + 1, True, True)
+        self.field = self.graph.distanceField(FLAG_TARGET)
+
+        # node -> set of (x, y, item) entries there
+        self.entries = {}
+
+        self.count = 0
+
+        # a SearchStats to measure nearest into, or None not to
+        self.stats = None
+
+    def __len__(self):
+        return self.count
+
+    def _nodeOf(self, x, y):
+        if ((x < self.minX) or (x > self.maxX) or
+            (y < self.minY) or (y > self.maxY)):
+            raise ValueError(f"({x}, {y}) is outside the index!")
+
+        return self.graph.nodeAt(x - self.minX, y - self.minY)
+
+    def add(self, x, y, item=None):
+        """Adds a point. Adding the same point and item twice does nothing.
+
+        Args:
+            x (int): x position
+            y (int): y position
+            item (hashable, optional): anything to carry along with the point.
+                Defaults to None.
+        """
+        node  = self._nodeOf(x, y)
+        entry = (x, y, item)
+
+        if (node not in self.entries):
+            self.entries[node] = set()
+            self.field.addTarget(node)
+
+        if (entry not in self.entries[node]):
+            self.entries[node].add(entry)
+            self.count = self.count + 1
+
+    def remove(self, x, y, item=None):
+        """Removes a point.
+
+        Args:
+            x (int): x position
+            y (int): y position
+            item (hashable, optional): item it was added with. Defaults to
+                None.
+
+        Returns:
+            bool: whether the point was there to remove
+        """
+        node  = self._nodeOf(x, y)
+        entry = (x, y, item)
+        ret   = False
+
+        if ((node in self.entries) and (entry in self.entries[node])):
+            self.entries[node].remove(entry)
+            self.count = self.count - 1
+            ret = True
+
+            if (0 == len(self.entries[node])):
+                del self.entries[node]
+                self.field.removeTarget(node)
+
+        return ret
+
+    def __contains__(self, entry):
+        x, y, item = entry
+
+        return entry in self.entries.get(self._nodeOf(x, y), ())
+
+    def nearest(self, x, y):
+        """Finds the closest point to a position.
+
+        Measured searches only count nodes expanded - the field doesn't keep
+        track of anything else.
+
+        Args:
+            x (int): x position, moved onto the index's edge if it's outside
+            y (int): y position, moved onto the index's edge if it's outside
+
+        Returns:
+            tuple: (x, y, item) of the closest point, or None if empty.
+        """
+        ret   = None
+        stats = self.stats
+        query = None
+
+        if ((stats is not None) and stats.sample()):
+            query   = SearchQuery("nearest")
+            started = time.perf_counter()
+
+        if (self.count > 0):
+            start = self._nodeOf(min(max(x, self.minX), self.maxX),
+                                 min(max(y, self.minY), self.maxY))
+            node  = self.field.nearest(start)
+
+            # any of the points there will do, but always the same one
+            ret = min(self.entries[node], key=repr)
+
+            if (query is not None):
+                query.expanded = self.field.expanded
+                query.cost     = self.field.dist[start]
+
+        if (query is not None):
+            query.seconds = time.perf_counter() - started
+            stats.record(query)
+
+        return ret
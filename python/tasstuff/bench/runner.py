@@ -0,0 +1,239 @@
+# Times the workloads, saves what it finds, and checks it against a baseline.
+#
+# Run it from the python folder, same as everything else:
+#
+#     python -m tasstuff.bench.runner --out after.json --baseline before.json
+#
+# Each workload is run a few times after its setup and the quickest run is
+# what counts - the slower ones are mostly the machine doing something else.
+# A workload regresses if its quickest run is slower than the baseline's by
+# more than the tolerance. The exit status is 1 if anything regressed.
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import tasstuff.bench.workloads as workloads
+
+class Comparison():
+    """
+    How one workload did against the baseline.
+    """
+    def __init__(self, name, before, after, tolerance, sameResult=True):
+        """Compares two timings.
+
+        Args:
+            name (str): workload's name
+            before (float): baseline's quickest run, in seconds
+            after (float): this quickest run, in seconds
+            tolerance (float): how much slower still counts as the same, as
+                a fraction of before
+            sameResult (bool, optional): whether the workload gave back the
+                same thing both times. Defaults to True.
+        """
+        self.name       = name
+        self.before     = before
+        self.after      = after
+        self.sameResult = sameResult
+
+        # before over after, so above 1 is quicker
+        self.speedup   = (before / after) if (after > 0) else float("inf")
+        self.regressed = after > (before * (1.0 + tolerance))
+
+    def __str__(self):
+        ret = (f"{self.name:<28} {self.before:>9.4f}s {self.after:>9.4f}s "
+               f"{self.speedup:>7.2f}x")
+
+        if (self.regressed):
+            ret = ret + "  REGRESSED"
+
+        if (not self.sameResult):
+            ret = ret + "  result changed"
+
+        return ret
+
+def runWorkload(workload, repeats=5, scale=1.0):
+    """Sets up a workload and times it.
+
+    Args:
+        workload (Workload): workload to time
+        repeats (uint, optional): how many times to run it. Defaults to 5.
+        scale (float, optional): how much work to give it. Defaults to 1.0.
+
+    Returns:
+        dict: "times" for every run, "best" and "median" of those, and the
+            "result" of the last run
+    """
+    state  = workload.setup(random.Random(workload.seed), scale)
+    times  = []
+    result = None
+
+    try:
+        for i in range(repeats): # pylint: disable=unused-variable
+            # nothing left over from the last run gets collected mid run
+            gc.collect()
+            gc.disable()
+
+            try:
+                start  = time.perf_counter()
+                result = workload.run(state)
+                times.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+    finally:
+        if (workload.teardown is not None):
+            workload.teardown(state)
+
+    return {
+        "times"  : times,
+        "best"   : min(times),
+        "median" : statistics.median(times),
+        "result" : result,
+    }
+
+def runAll(names=None, repeats=5, scale=1.0, log=None):
+    """Times every workload asked for.
+
+    Args:
+        names (list, optional): workloads to run. Defaults to None, meaning
+            all of them.
+        repeats (uint, optional): how many times to run each. Defaults to 5.
+        scale (float, optional): how much work to give each. Defaults to 1.0.
+        log (file, optional): where to note progress. Defaults to None, for
+            no notes.
+
+    Returns:
+        dict: the results, ready to be saved
+    """
+    ret = {
+        "python"    : platform.python_version(),
+        "platform"  : platform.platform(),
+        "repeats"   : repeats,
+        "scale"     : scale,
+        "workloads" : {},
+    }
+
+    for workload in workloads.byName(names):
+        found = runWorkload(workload, repeats, scale)
+        ret["workloads"][workload.name] = found
+
+        if (log is not None):
+            log.write(f"{workload.name:<28} {found['best']:>9.4f}s\n")
+            log.flush()
+
+    return ret
+
+def saveResults(path, results):
+    """Writes results out as JSON.
+
+    Args:
+        path (str): where to write them
+        results (dict): results from runAll
+    """
+    with open(path, "w") as handle:
+        json.dump(results, handle, indent=4, sort_keys=True)
+        handle.write("\n")
+
+def loadResults(path):
+    """Reads results back in.
+
+    Args:
+        path (str): JSON written by saveResults
+
+    Returns:
+        dict: the results
+    """
+    with open(path) as handle:
+        return json.load(handle)
+
+def compare(results, baseline, tolerance=0.1):
+    """Checks results against a baseline, workload by workload.
+
+    Workloads only one side has are left out. Results taken at a different
+    scale aren't comparable at all.
+
+    Args:
+        results (dict): results from runAll
+        baseline (dict): older results to compare against
+        tolerance (float, optional): how much slower still counts as the
+            same, as a fraction. Defaults to 0.1.
+
+    Raises:
+        ValueError: the two were taken at different scales
+
+    Returns:
+        list: a Comparison for each workload both have, in results' order
+    """
+    if (results.get("scale") != baseline.get("scale")):
+        raise ValueError(f"Can't compare scale {results.get('scale')} against "
+                         f"scale {baseline.get('scale')}!")
+
+    ret = []
+
+    for name, found in results["workloads"].items():
+        old = baseline["workloads"].get(name)
+
+        if (old is not None):
+            ret.append(Comparison(name, old["best"], found["best"], tolerance,
+                                  old.get("result") == found.get("result")))
+
+    return ret
+
+def main(args=None):
+    """Runs the benchmarks from the command line.
+
+    Args:
+        args (list, optional): command line arguments. Defaults to None,
+            meaning sys.argv.
+
+    Returns:
+        int: exit status - 1 if anything regressed, 0 if not
+    """
+    parser = argparse.ArgumentParser(prog="tasstuff.bench.runner",
+                                     description="Times the hot paths.")
+    parser.add_argument("names", nargs="*",
+                        help="workloads to run, all of them if none")
+    parser.add_argument("--out", help="save the results here as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="how much slower still counts as the same")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="how many times to run each workload")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="how much work to give each workload")
+    parser.add_argument("--list", action="store_true",
+                        help="list the workloads and stop")
+
+    opts = parser.parse_args(args)
+    ret  = 0
+
+    if (opts.list):
+        for workload in workloads.WORKLOADS:
+            print(workload.name)
+    else:
+        results = runAll(opts.names or None, opts.repeats, opts.scale,
+                         sys.stdout)
+
+        if (opts.out is not None):
+            saveResults(opts.out, results)
+
+        if (opts.baseline is not None):
+            print("")
+            print(f"{'workload':<28} {'baseline':>10} {'now':>10} "
+                  f"{'speedup':>8}")
+
+            for found in compare(results, loadResults(opts.baseline),
+                                 opts.tolerance):
+                print(found)
+
+                if (found.regressed):
+                    ret = 1
+
+    return ret
+
+if ("__main__" == __name__):
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# The workloads the benchmark runner times.
+#
+# Each workload has a setup, which builds everything it needs and isn't
+# timed, and a run, which is. Anything random comes from a Random seeded
+# with the workload's own seed, so every run of a workload does exactly the
+# same work. Caches the hot paths keep between calls are cleared at the
+# start of every run, so a repeat isn't quicker just for coming second.
+#
+# scale shrinks or grows how much work there is - 1.0 is the size the
+# numbers in a saved baseline mean anything at. It's mostly there so the
+# unit tests can run every workload quickly.
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from PIL import ImageDraw
+
+import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.plotter as plotter
+
+from tasstuff.any.bizhawk.controller import SnesPreset_MarioPaint
+from tasstuff.any.bizhawk.inputlog import Sink
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+from tasstuff.any.search import Graph2D
+
+CANVAS_WIDTH  = mp.CANVAS_MAX_X - mp.CANVAS_MIN_X + 1
+CANVAS_HEIGHT = mp.CANVAS_MAX_Y - mp.CANVAS_MIN_Y + 1
+
+class Workload():
+    """
+    Something to time, and how to get ready for it.
+    """
+    def __init__(self, name, setup, run, teardown=None, seed=0):
+        """Creates a workload.
+
+        Args:
+            name (str): name it's recorded under
+            setup (function): (Random, scale) -> state for run. Not timed.
+            run (function): (state) -> anything worth recording alongside the
+                time, or None. This is the part that's timed.
+            teardown (function, optional): (state) -> None, to clean up after
+                the last run. Defaults to None.
+            seed (int, optional): seed for setup's Random. Defaults to 0.
+        """
+        self.name     = name
+        self.setup    = setup
+        self.run      = run
+        self.teardown = teardown
+        self.seed     = seed
+
+def _scaled(count, scale):
+    # never scaled all the way down to nothing
+    return max(1, int(count * scale))
+
+def _canvasSize(scale):
+    # both sides shrink, so the area goes with scale
+    side = min(1.0, scale) ** 0.5
+
+    return (max(2, int(CANVAS_WIDTH * side)),
+            max(2, int(CANVAS_HEIGHT * side)))
+
+# Graph2D construction
+def _graphBuildSetup(rng, scale):
+    return _canvasSize(scale)
+
+def _graphBuildRun(state):
+    width, height = state
+    graph = Graph2D(width, height, True, True)
+
+    return len(graph.contents)
+
+# findClosestFlaggedTo
+def _closestSetup(rng, scale):
+    width, height = _canvasSize(scale)
+    graph = Graph2D(width, height, True, True)
+
+    # sparse, like what's left of a mask late in a plot
+    for node in rng.sample(graph.contents, max(1, len(graph.contents) // 500)):
+        node.addFlag("___bench")
+
+    starts = rng.choices(graph.contents, k=_scaled(20, scale))
+
+    return graph, starts
+
+def _closestRun(state):
+    graph, starts = state
+    found = 0
+
+    for start in starts:
+        if (graph.findClosestFlaggedTo("___bench", start) is not None):
+            found = found + 1
+
+    return found
+
+# SnesPreset_MarioPaint.fromMnemonic
+def _mnemonicSetup(rng, scale):
+    controls  = SnesPreset_MarioPaint()
+    mnemonics = MnemonicFormat(controls)
+    count     = _scaled(100000, scale)
+
+    # mostly just the mouse moving, with a button now and then
+    bits = [0] * count
+    axes = [[0] * count for analog in mnemonics.analogs]
+
+    for frame in range(count):
+        if (rng.random() < 0.2):
+            bits[frame] = 1 << rng.randrange(len(mnemonics.buttons))
+
+        for i, analog in enumerate(mnemonics.analogs):
+            axes[i][frame] = rng.randint(int(analog.min), int(analog.max))
+
+    return controls, mnemonics.serializeMany(bits, axes)
+
+def _mnemonicRun(state):
+    controls, lines = state
+
+    for line in lines:
+        controls.fromMnemonic(line)
+
+    return len(lines)
+
+# Plotter.plotAbsolute
+def _plotter():
+    # every run starts with nothing cached
+    plotter.moveFrames.cache_clear()
+    plotter.moveDeltas.cache_clear()
+
+    ret = plotter.Plotter()
+
+    # the default pages to the console and waits on enter
+    ret.sink = Sink()
+
+    return ret
+
+def _plotAbsoluteSetup(rng, scale):
+    # corner to corner and back, give or take
+    moves = []
+
+    for i in range(_scaled(10000, scale)): # pylint: disable=unused-variable
+        moves.append((rng.randint(mp.SCREEN_MIN_X, mp.SCREEN_MIN_X + 40),
+                      rng.randint(mp.SCREEN_MIN_Y, mp.SCREEN_MIN_Y + 40)))
+        moves.append((rng.randint(mp.SCREEN_MAX_X - 40, mp.SCREEN_MAX_X),
+                      rng.randint(mp.SCREEN_MAX_Y - 40, mp.SCREEN_MAX_Y)))
+
+    return moves
+
+def _plotAbsoluteRun(state):
+    plot   = _plotter()
+    frames = 0
+
+    for x, y in state:
+        plot.plotAbsolute(x, y)
+        frames = frames + len(plot.buffer)
+        plot.outputBuffer(True)
+
+    return frames
+
+# Plotter.mask
+def _maskSetup(rng, scale):
+    width, height = _canvasSize(scale)
+
+    im   = Image.new("1", (width, height), 1)
+    draw = ImageDraw.Draw(im)
+
+    # scribbles and speckle, so there are long strokes and lone dots both
+    for i in range(_scaled(60, scale)): # pylint: disable=unused-variable
+        draw.line([(rng.randrange(width), rng.randrange(height)),
+                   (rng.randrange(width), rng.randrange(height))], fill=0)
+
+    for i in range(_scaled(400, scale)): # pylint: disable=unused-variable
+        im.putpixel((rng.randrange(width), rng.randrange(height)), 0)
+
+    folder = tempfile.mkdtemp()
+    path   = os.path.join(folder, "mask.png")
+
+    im.save(path)
+
+    return folder, path
+
+def _maskRun(state):
+    folder, path = state
+
+    plot = _plotter()
+    plot.setOffsets(mp.CANVAS_MIN_X, mp.CANVAS_MIN_Y)
+    plot.jump(mp.CANVAS_MIN_X, mp.CANVAS_MIN_Y)
+    plot.mask(path)
+
+    return plot.lastTour.frames
+
+def _maskTeardown(state):
+    shutil.rmtree(state[0])
+
+WORKLOADS = [
+    Workload("graph2d_build", _graphBuildSetup, _graphBuildRun),
+    Workload("graph2d_closest_flagged", _closestSetup, _closestRun, seed=1),
+    Workload("marioPaint_fromMnemonic", _mnemonicSetup, _mnemonicRun, seed=2),
+    Workload("plotter_plotAbsolute", _plotAbsoluteSetup, _plotAbsoluteRun,
+             seed=3),
+    Workload("plotter_mask", _maskSetup, _maskRun, _maskTeardown, seed=4),
+]
+
+def byName(names=None):
+    """Picks workloads out by name.
+
+    Args:
+        names (list, optional): names to pick, in the order to run them.
+            Defaults to None, meaning all of them.
+
+    Raises:
+        ValueError: there's no workload by one of the names
+
+    Returns:
+        list: the workloads
+    """
+    ret = list(WORKLOADS)
+
+    if (names is not None):
+        known = {w.name : w for w in WORKLOADS}
+        ret   = []
+
+        for name in names:
+            if (name not in known):
+                raise ValueError(f"No workload called {name}!")
+
+            ret.append(known[name])
+
+    return ret
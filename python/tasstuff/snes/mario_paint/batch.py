@@ -0,0 +1,193 @@
+# Plotting a whole list of masks in one go.
+#
+# Working out a good drawing order is the slow part of plotting a mask, and
+# each mask's order can be worked out on its own, so that part happens in a
+# pool of processes. The frames themselves are still made one mask after
+# another in this process, since each mask carries on from wherever the
+# last one left the pen.
+#
+# A manifest is a JSON list of jobs, each one like:
+#
+#     {"image": "layers/outline.png", "offset": [16, 24], "tool": [40, 190]}
+#
+# "image" is relative to the manifest. "offset" defaults to [0, 0]. "tool"
+# is optional, and is a screen point to click before plotting - picking a
+# color or a stamp off the palette, say.
+import concurrent.futures
+import json
+import os
+
+import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.masks as masks
+import tasstuff.snes.mario_paint.ordering as ordering
+
+class BatchJob():
+    """
+    One mask to plot as part of a batch.
+    """
+    def __init__(self, image, offsetX=0, offsetY=0, tool=None):
+        """Creates a job.
+
+        Args:
+            image (str): mask image to plot
+            offsetX (int, optional): where the mask's left edge goes on
+                screen. Defaults to 0.
+            offsetY (int, optional): where the mask's top edge goes on
+                screen. Defaults to 0.
+            tool (tuple, optional): (x, y) to click before plotting. Defaults
+                to None, meaning nothing's clicked.
+        """
+        self.image   = image
+        self.offsetX = offsetX
+        self.offsetY = offsetY
+        self.tool    = tool
+
+def loadManifest(path):
+    """Reads a batch manifest.
+
+    Args:
+        path (str): JSON manifest to read
+
+    Raises:
+        ValueError: the manifest isn't a list of jobs with images
+
+    Returns:
+        list: a BatchJob for each job, in order
+    """
+    with open(path) as handle:
+        entries = json.load(handle)
+
+    if (not isinstance(entries, list)):
+        raise ValueError("A manifest needs to be a list of jobs!")
+
+    base = os.path.dirname(os.path.abspath(path))
+    ret  = []
+
+    for entry in entries:
+        if ((not isinstance(entry, dict)) or ("image" not in entry)):
+            raise ValueError(f"Every job needs an image, got {entry!r}!")
+
+        offsetX, offsetY = entry.get("offset", (0, 0))
+        tool             = entry.get("tool")
+
+        if (tool is not None):
+            tool = (int(tool[0]), int(tool[1]))
+
+        ret.append(BatchJob(os.path.join(base, entry["image"]),
+                            int(offsetX), int(offsetY), tool))
+
+    return ret
+
+def planBatch(jobs, startX, startY, passes=1, workers=None, timeBudget=None):
+    """Works out the drawing order for every job, in parallel.
+
+    Where the pen will really be when a job starts isn't known until the
+    jobs before it are drawn, so each job is planned from its tool if it has
+    one, or from the given start if not.
+
+    Args:
+        jobs (list): BatchJobs to plan
+        startX (int): x the pen starts at
+        startY (int): y the pen starts at
+        passes (uint, optional): most passes each job gets to improve its
+            order. Defaults to 1.
+        workers (uint, optional): processes to plan in. Defaults to None,
+            which means one per core. 1 plans right here instead.
+        timeBudget (float, optional): seconds each job's improving is cut
+            off after. Defaults to None, for no limit.
+
+    Returns:
+        list: a Tour for each job, in order
+    """
+    args = [[], [], [], [], [], [], []]
+
+    for job in jobs:
+        fromX, fromY = job.tool if (job.tool is not None) else (startX, startY)
+
+        for column, value in zip(args, (job.image, job.offsetX, job.offsetY,
+                                        fromX, fromY, passes, timeBudget)):
+            column.append(value)
+
+    if (1 == workers):
+        ret = list(map(masks.planMask, *args))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            ret = list(pool.map(masks.planMask, *args))
+
+    return ret
+
+def reverseOrder(order):
+    """The same strokes drawn back to front, each one flipped.
+
+    Args:
+        order (list): strokes, in the order to draw them
+
+    Returns:
+        list: the strokes, last to first
+    """
+    return [ordering.flipStroke(s) for s in reversed(order)]
+
+def plotBatch(plot, jobs, workers=None):
+    """Plans every job in parallel, then draws them all, in order.
+
+    Between jobs the pen's lifted and given time to register, the tool (if
+    any) is clicked, and the job's order gets drawn back to front if its end
+    is closer to the pen than its start.
+
+    Args:
+        plot (Plotter): plotter to draw with. Its offsets are left alone, and
+            its order passes and time budget are used for every job.
+        jobs (list): BatchJobs to plot
+        workers (uint, optional): processes to plan in. Defaults to None,
+            which means one per core.
+
+    Returns:
+        list: a Tour for each job, in order, as it was drawn and scored from
+            where the pen really was
+    """
+    ret   = []
+    tours = planBatch(jobs, plot.x, plot.y, plot.orderPasses, workers,
+                      plot.orderTimeBudget)
+
+    for job, tour in zip(jobs, tours):
+        if (plot.profile is not None):
+            plot.profile.begin("batch " + job.image)
+
+        if (plot.down):
+            # same as mask, make sure the lift gets read
+            plot.penUp()
+            plot.wait(10)
+
+        if (job.tool is not None):
+            plot.plotAbsolute(job.tool[0], job.tool[1])
+            plot.click()
+
+        order = tour.order
+
+        if (len(order) > 0):
+            first = order[0]
+            last  = order[-1]
+
+            toStart = ordering.linkFrames(plot.x, plot.y, first[0], first[1],
+                                          False)
+            toEnd   = ordering.linkFrames(plot.x, plot.y, last[2], last[3],
+                                          False)
+
+            if (toEnd < toStart):
+                order = reverseOrder(order)
+
+        # scored again from where the pen really is
+        ret.append(ordering.Tour(order,
+                                 ordering.orderFrames(plot.x, plot.y, order),
+                                 tour.greedyFrames))
+
+        plot.drawOrder(order)
+        plot.wait(mp.PEN_LIFT_FRAMES)
+
+        if (plot.profile is not None):
+            plot.profile.end()
+
+    if (len(ret) > 0):
+        plot.lastTour = ret[-1]
+
+    return ret
@@ -10,5 +10,29 @@ CANVAS_MAX_X = 251
 CANVAS_MIN_Y =  28
 CANVAS_MAX_Y = 195
 
+# how far the mouse can meaningfully move on either axis in one frame
+MOUSE_MAX_SPEED = 10
+
+# how far the pen moves on either axis in a frame while it's down. the pen
+# only draws where it is on each frame, so any faster skips pixels
+PEN_DRAW_SPEED = 1
+
+# frames to hold the pen up around a pen-up move, and to hold it down after
+# dropping it before drawing, so the game actually reads the button change
+PEN_LIFT_FRAMES = 1
+PEN_DROP_FRAMES = 8
+
+# what goes into a .bk2 made for Mario Paint, see the README for the setup
+MOVIE_HEADER = {
+    "Platform" : "SNES",
+    "GameName" : "Mario Paint (JU) (!)",
+    "Core"     : "BSNES",
+}
+
+# BSNES with the mouse in port 1 and a joypad in port 2
+MOVIE_SYNC_SETTINGS = ('{"o":{"$type":"BizHawk.Emulation.Cores.Nintendo.SNES.'
+                       'LibsnesCore+SnesSyncSettings, BizHawk.Emulation.Cores",'
+                       '"LeftPort":3,"RightPort":1}}')
+
 SCREEN_TITLE  = "___title"
 SCREEN_CANVAS = "___canvas"
@@ -0,0 +1,84 @@
+# Seeking around a plot's frames, knowing where the pen is on each one.
+#
+# The pen's state - (x, y, down, rightdown), same as Plotter keeps - builds
+# up frame by frame from the mouse's deltas and buttons, so working it out
+# for a frame deep into a long plot means replaying every frame before it.
+# A greenzone over the plot's roll keeps it checkpointed instead, so only
+# the frames since the last checkpoint get replayed.
+#
+# Only frames are replayed. A Plotter's jump() moves the pen without making
+# any, so a plot that jumps partway through won't track past the jump.
+import tasstuff.snes.mario_paint.constants as mp
+
+from tasstuff.any.bizhawk.controller import SnesPreset_MarioPaint
+from tasstuff.any.bizhawk.greenzone import Greenzone
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+
+def penStepper(controls):
+    """Builds a step function that moves the pen one frame along.
+
+    Args:
+        controls (SnesPreset_MarioPaint): controls the frames are for
+
+    Returns:
+        function: (pen, bits, axes) -> pen, with pen as (x, y, down,
+            rightdown)
+    """
+    mnemonics = MnemonicFormat(controls)
+    leftBit   = mnemonics.buttonMask(controls.mL)
+    rightBit  = mnemonics.buttonMask(controls.mR)
+    xAxis     = mnemonics.analogs.index(controls.mX)
+    yAxis     = mnemonics.analogs.index(controls.mY)
+
+    def step(pen, bits, axes):
+        # kept on screen the same way plotAbsolute keeps its targets
+        x = min(max(pen[0] + int(axes[xAxis]), mp.SCREEN_MIN_X),
+                mp.SCREEN_MAX_X)
+        y = min(max(pen[1] + int(axes[yAxis]), mp.SCREEN_MIN_Y),
+                mp.SCREEN_MAX_Y)
+
+        return (x, y, 0 != (bits & leftBit), 0 != (bits & rightBit))
+
+    return step
+
+def penOf(plot):
+    """Gets a plotter's pen state.
+
+    Args:
+        plot (Plotter): plotter to look at
+
+    Returns:
+        tuple: (x, y, down, rightdown)
+    """
+    return (plot.x, plot.y, plot.down, plot.rightdown)
+
+def restorePen(plot, pen):
+    """Puts a plotter's pen back how it was, without making any frames.
+
+    Args:
+        plot (Plotter): plotter to change
+        pen (tuple): (x, y, down, rightdown)
+    """
+    plot.x, plot.y, plot.down, plot.rightdown = pen
+
+def plotGreenzone(roll, start=(0, 0, False, False), interval=256,
+                  budget=16 << 20):
+    """Creates a greenzone that tracks the pen through a plot's frames.
+
+    Args:
+        roll (PianoRoll): the plot's frames
+        start (tuple, optional): (x, y, down, rightdown) before the first
+            frame - penOf the plotter before it made any. Defaults to the top
+            left corner with nothing held.
+        interval (uint, optional): frames between checkpoints. Defaults to
+            256.
+        budget (uint, optional): bytes the checkpoints can take up, more or
+            less. Defaults to 16 MiB.
+
+    Returns:
+        Greenzone: with the pen as what's tracked
+    """
+    controls = SnesPreset_MarioPaint()
+
+    return Greenzone(roll, controls, interval, budget, penStepper(controls),
+                     tuple(start))
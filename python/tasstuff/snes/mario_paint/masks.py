@@ -0,0 +1,83 @@
+# Turning a mask image into what the plotter needs to draw it.
+#
+# Nothing here needs a Plotter, so the batch planner's pool can run it
+# without importing plotter.py.
+import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.ordering as ordering
+import tasstuff.snes.mario_paint.strokes as strokes
+
+# every stroke a mask needs, for a mask placed at the given offset
+def maskTargets(path, offsetX, offsetY):
+    """Reads a mask and breaks it into strokes in screen coordinates.
+
+    Strokes that would hang off the screen are broken down to dots instead,
+    with each dot clamped onto the screen on its own.
+
+    Args:
+        path (str): mask image to read
+        offsetX (int): where the mask's left edge goes on screen
+        offsetY (int): where the mask's top edge goes on screen
+
+    Returns:
+        list: (x0, y0, x1, y1) for each stroke, sorted, no repeats
+    """
+    # read the whole image in one go, black pixels set
+    width, height, bits = strokes.loadMask(path)
+
+    targets = set()
+
+    for x0, y0, x1, y1 in strokes.extractStrokes(width, height, bits):
+        sX0 = x0 + offsetX
+        sY0 = y0 + offsetY
+        sX1 = x1 + offsetX
+        sY1 = y1 + offsetY
+
+        if (onScreen(sX0, sY0) and onScreen(sX1, sY1)):
+            targets.add((sX0, sY0, sX1, sY1))
+        else:
+            # clamping the ends would bend it, so it goes dot by dot and
+            # each dot gets clamped on its own
+            for px in strokes.runPixels(width, (x0, y0, x1, y1)):
+                tX = min(max((px % width) + offsetX, mp.SCREEN_MIN_X),
+                         mp.SCREEN_MAX_X)
+                tY = min(max((px // width) + offsetY, mp.SCREEN_MIN_Y),
+                         mp.SCREEN_MAX_Y)
+                targets.add((tX, tY, tX, tY))
+
+    return sorted(targets)
+
+def onScreen(x, y):
+    """Whether a point is somewhere the plotter can actually go.
+
+    Args:
+        x (int): screen x
+        y (int): screen y
+
+    Returns:
+        bool: True if it's on screen
+    """
+    return ((mp.SCREEN_MIN_X <= x <= mp.SCREEN_MAX_X) and
+            (mp.SCREEN_MIN_Y <= y <= mp.SCREEN_MAX_Y))
+
+def planMask(image, offsetX, offsetY, startX, startY, passes,
+             timeBudget=None):
+    """Works out the drawing order for one mask. This is what runs in the
+    pool, so it only takes and gives things that pickle.
+
+    Args:
+        image (str): mask image to plot
+        offsetX (int): where the mask's left edge goes on screen
+        offsetY (int): where the mask's top edge goes on screen
+        startX (int): x the pen is expected to start at
+        startY (int): y the pen is expected to start at
+        passes (uint): most passes to make improving the order
+        timeBudget (float, optional): seconds to cut improving off after.
+            Defaults to None, for no limit.
+
+    Returns:
+        Tour: the order and how it scored
+    """
+    targets = maskTargets(image, offsetX, offsetY)
+
+    return ordering.planOrder(startX, startY, targets, passes,
+                              timeBudget=timeBudget)
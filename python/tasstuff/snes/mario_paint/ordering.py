@@ -0,0 +1,388 @@
+# Working out what order to draw things in, scored in frames of input.
+#
+# Everything here works on strokes - (x0, y0, x1, y1) tuples in screen
+# coordinates, drawn by dragging the pen from the first point to the second
+# at PEN_DRAW_SPEED, so every pixel along the way gets drawn. A single dot is
+# just a stroke that starts and ends in the same place. Any stroke can be
+# drawn backwards, which is how the optimizer gets to flip them.
+#
+# The pen only stays down between strokes when the next one starts right
+# next to where the last one ended, so nothing gets drawn but the two ends.
+# Anywhere further and it's lifted, moved at full speed and dropped again.
+import math
+import time
+import tasstuff.snes.mario_paint.constants as mp
+
+from tasstuff.any.spatial import PointIndex2D
+
+# costs, these mirror exactly what Plotter emits
+def travelFrames(x0, y0, x1, y1, speed=mp.MOUSE_MAX_SPEED):
+    """Frames plotAbsolute spends moving between two points.
+
+    Args:
+        x0 (int): x to move from
+        y0 (int): y to move from
+        x1 (int): x to move to
+        y1 (int): y to move to
+        speed (int, optional): most either axis moves in a frame. Defaults
+            to MOUSE_MAX_SPEED.
+
+    Returns:
+        int: frames of movement
+    """
+    return max(math.ceil(abs(x1 - x0) / speed),
+               math.ceil(abs(y1 - y0) / speed))
+
+def canDrag(x0, y0, x1, y1):
+    """Whether the pen can stay down on the way between two points.
+
+    Args:
+        x0 (int): x to move from
+        y0 (int): y to move from
+        x1 (int): x to move to
+        y1 (int): y to move to
+
+    Returns:
+        bool: True if it's within one frame's drawing move on both axes, so
+            the pen would draw nothing but the two points
+    """
+    return ((abs(x1 - x0) <= mp.PEN_DRAW_SPEED) and
+            (abs(y1 - y0) <= mp.PEN_DRAW_SPEED))
+
+def linkFrames(x0, y0, x1, y1, penDown=True):
+    """Frames spent getting from the end of one stroke to the start of the
+    next, with the pen down and ready to draw.
+
+    Args:
+        x0 (int): x the last stroke ended at
+        y0 (int): y the last stroke ended at
+        x1 (int): x the next stroke starts at
+        y1 (int): y the next stroke starts at
+        penDown (bool, optional): whether the pen is down to begin with.
+            Defaults to True.
+
+    Returns:
+        int: frames of input
+    """
+    if (penDown and canDrag(x0, y0, x1, y1)):
+        ret = travelFrames(x0, y0, x1, y1, mp.PEN_DRAW_SPEED)
+    else:
+        # lift (or already lifted), move, drop
+        ret = (travelFrames(x0, y0, x1, y1) + mp.PEN_LIFT_FRAMES +
+               mp.PEN_DROP_FRAMES)
+
+    return ret
+
+def strokeFrames(stroke):
+    """Frames spent drawing a stroke once the pen is down at its start.
+
+    Args:
+        stroke (tuple): (x0, y0, x1, y1)
+
+    Returns:
+        int: frames of input
+    """
+    return travelFrames(stroke[0], stroke[1], stroke[2], stroke[3],
+                        mp.PEN_DRAW_SPEED)
+
+def orderFrames(startX, startY, order):
+    """Frames spent drawing strokes in the given order.
+
+    The pen is assumed to be up at the start, and nothing is counted for
+    lifting it at the end.
+
+    Args:
+        startX (int): x the pen starts at
+        startY (int): y the pen starts at
+        order (list): strokes, in the order to draw them
+
+    Returns:
+        int: frames of input
+    """
+    ret  = 0
+    prev = None
+
+    for stroke in order:
+        ret  = ret + _link(startX, startY, prev, stroke) + strokeFrames(stroke)
+        prev = stroke
+
+    return ret
+
+def flipStroke(stroke):
+    """The same stroke, drawn the other way.
+
+    Args:
+        stroke (tuple): (x0, y0, x1, y1)
+
+    Returns:
+        tuple: (x1, y1, x0, y0)
+    """
+    return (stroke[2], stroke[3], stroke[0], stroke[1])
+
+def _link(startX, startY, prev, stroke):
+    # linkFrames into stroke, where a prev of None means coming from the
+    # start and a stroke of None means there's nothing after prev
+    ret = 0
+
+    if (stroke is None):
+        ret = 0
+    elif (prev is None):
+        ret = linkFrames(startX, startY, stroke[0], stroke[1], False)
+    else:
+        ret = linkFrames(prev[2], prev[3], stroke[0], stroke[1])
+
+    return ret
+
+class Tour():
+    """
+    An order to draw strokes in, along with how it scored.
+    """
+    def __init__(self, order, frames, greedyFrames):
+        """Creates a tour.
+
+        Args:
+            order (list): strokes, in the order to draw them
+            frames (int): frames it takes to draw them in that order
+            greedyFrames (int): frames the greedy order it started from took
+        """
+        self.order        = order
+        self.frames       = frames
+        self.greedyFrames = greedyFrames
+
+    def saved(self):
+        """Frames saved compared to the greedy order.
+
+        Returns:
+            int: how many fewer frames this takes than greedy did
+        """
+        return self.greedyFrames - self.frames
+
+def greedyOrder(startX, startY, strokes, indexClass=PointIndex2D, stats=None):
+    """Orders strokes by always heading for the closest unfinished one.
+
+    Either end of a stroke counts, and strokes get flipped so they're drawn
+    starting from whichever end was closer.
+
+    Args:
+        startX (int): x the pen starts at
+        startY (int): y the pen starts at
+        strokes (list): strokes to order
+        indexClass (class, optional): what finds the closest stroke end -
+            PointIndex2D, or anything made the same way with the same add,
+            remove and nearest. Defaults to PointIndex2D.
+        stats (SearchStats, optional): where to measure the index's searches.
+            Defaults to None, to not measure them.
+
+    Returns:
+        list: the strokes, in order
+    """
+    ret = []
+
+    if (len(strokes) > 0):
+        xs = [s[0] for s in strokes] + [s[2] for s in strokes]
+        ys = [s[1] for s in strokes] + [s[3] for s in strokes]
+
+        index = indexClass(min(xs), min(ys), max(xs), max(ys))
+        index.stats = stats
+
+        for i, stroke in enumerate(strokes):
+            index.add(stroke[0], stroke[1], (i, 0))
+            index.add(stroke[2], stroke[3], (i, 1))
+
+        lastX = startX
+        lastY = startY
+        nxt   = index.nearest(lastX, lastY)
+
+        while (nxt is not None):
+            i, end = nxt[2]
+            stroke = strokes[i]
+
+            index.remove(stroke[0], stroke[1], (i, 0))
+            index.remove(stroke[2], stroke[3], (i, 1))
+
+            if (1 == end):
+                stroke = flipStroke(stroke)
+
+            ret.append(stroke)
+
+            lastX = stroke[2]
+            lastY = stroke[3]
+            nxt   = index.nearest(lastX, lastY)
+
+    return ret
+
+def improveOrder(startX, startY, order, passes=1, window=32, timeBudget=None):
+    """Improves an order with 2-opt and Or-opt passes.
+
+    2-opt reverses a run of strokes (flipping each one); Or-opt picks up a run
+    of one to three strokes and drops it, either way around, somewhere else.
+    Both only look within window positions of where they start, and a move is
+    only made if it saves frames. Passes repeat until one finds nothing or
+    there have been enough of them, so the same order always comes out the
+    same way. Nearly everything's found on the first pass.
+
+    Args:
+        startX (int): x the pen starts at
+        startY (int): y the pen starts at
+        order (list): strokes, in the order to draw them
+        passes (uint, optional): most passes to make. Defaults to 1.
+        window (uint, optional): how far apart, in positions, two ends of a
+            move can be. Defaults to 32.
+        timeBudget (float, optional): seconds to stop after, even partway
+            through a pass, which makes the result depend on how fast the
+            machine is. Defaults to None, for no limit.
+
+    Returns:
+        list: the improved order - a new list, the one given is untouched
+    """
+    ret      = list(order)
+    deadline = float("inf")
+    improved = True
+
+    if (timeBudget is not None):
+        deadline = time.perf_counter() + timeBudget
+
+    while (improved and (passes > 0) and (time.perf_counter() < deadline)):
+        improved = False
+        passes   = passes - 1
+
+        if (_twoOptPass(startX, startY, ret, window, deadline)):
+            improved = True
+
+        if (_orOptPass(startX, startY, ret, window, deadline)):
+            improved = True
+
+    return ret
+
+def _twoOptPass(startX, startY, order, window, deadline):
+    # reverse order[i..j] in place wherever that saves frames
+    ret = False
+    n   = len(order)
+
+    for i in range(n):
+        if (time.perf_counter() >= deadline):
+            break
+
+        prev = order[i - 1] if (i > 0) else None
+
+        for j in range(i + 1, min(n, i + window)):
+            after = order[j + 1] if (j + 1 < n) else None
+
+            first = order[i]
+            last  = order[j]
+
+            before = (_link(startX, startY, prev, first) +
+                      _link(startX, startY, last, after))
+            then   = (_link(startX, startY, prev, flipStroke(last)) +
+                      _link(startX, startY, flipStroke(first), after))
+
+            if (then < before):
+                order[i:j + 1] = [flipStroke(s) for s in reversed(order[i:j + 1])]
+                ret = True
+
+    return ret
+
+def _orOptPass(startX, startY, order, window, deadline):
+    # move short runs of strokes elsewhere in place wherever that saves frames
+    ret = False
+    i   = 0
+
+    while (i < len(order)):
+        if (time.perf_counter() >= deadline):
+            break
+
+        for length in range(1, 4):
+            if (_tryMoveRun(startX, startY, order, i, length, window)):
+                ret = True
+                break
+
+        i = i + 1
+
+    return ret
+
+def _tryMoveRun(startX, startY, order, i, length, window):
+    # try to move order[i:i + length] somewhere better, returns if it did
+    ret = False
+    n   = len(order)
+
+    if (i + length <= n):
+        run   = order[i:i + length]
+        prev  = order[i - 1] if (i > 0) else None
+        after = order[i + length] if (i + length < n) else None
+
+        # what taking it out saves
+        removed = (_link(startX, startY, prev, run[0]) +
+                   _link(startX, startY, run[-1], after) -
+                   _link(startX, startY, prev, after))
+
+        flipped = [flipStroke(s) for s in reversed(run)]
+
+        best     = 0
+        bestAt   = None
+        bestRun  = None
+
+        # k is the position the run goes in front of, in the original list
+        for k in range(max(0, i - window), min(n, i + length + window) + 1):
+            if (i <= k <= i + length):
+                continue
+
+            left  = order[k - 1] if (k > 0) else None
+            right = order[k] if (k < n) else None
+
+            for candidate in (run, flipped):
+                added = (_link(startX, startY, left, candidate[0]) +
+                         _link(startX, startY, candidate[-1], right) -
+                         _link(startX, startY, left, right))
+
+                if (added - removed < best):
+                    best    = added - removed
+                    bestAt  = k
+                    bestRun = candidate
+
+        if (bestAt is not None):
+            if (bestAt > i):
+                order[bestAt:bestAt] = bestRun
+                del order[i:i + length]
+            else:
+                del order[i:i + length]
+                order[bestAt:bestAt] = bestRun
+
+            ret = True
+
+    return ret
+
+def planOrder(startX, startY, strokes, passes=1, indexClass=PointIndex2D,
+              stats=None, timeBudget=None):
+    """Works out a good order to draw strokes in.
+
+    Starts from the greedy order and makes up to passes improvement passes
+    over it.
+
+    Args:
+        startX (int): x the pen starts at
+        startY (int): y the pen starts at
+        strokes (list): strokes to order
+        passes (uint, optional): most improvement passes to make, 0 for
+            just the greedy order. Defaults to 1.
+        indexClass (class, optional): what greedyOrder uses to find the
+            closest stroke end. Defaults to PointIndex2D.
+        stats (SearchStats, optional): where to measure greedyOrder's
+            searches. Defaults to None, to not measure them.
+        timeBudget (float, optional): seconds to cut improving off after, see
+            improveOrder. Defaults to None, for no limit.
+
+    Returns:
+        Tour: the order, with its frame count and greedy's frame count
+    """
+    greedy       = greedyOrder(startX, startY, strokes, indexClass, stats)
+    greedyFrames = orderFrames(startX, startY, greedy)
+
+    order  = greedy
+    frames = greedyFrames
+
+    if (passes > 0):
+        order  = improveOrder(startX, startY, greedy, passes,
+                              timeBudget=timeBudget)
+        frames = orderFrames(startX, startY, order)
+
+    return Tour(order, frames, greedyFrames)
@@ -1,11 +1,99 @@
+import functools
 import math
+import tasstuff.snes.mario_paint.batch as batch
 import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.masks as masks
+import tasstuff.snes.mario_paint.ordering as ordering
+import tasstuff.snes.mario_paint.profiling as profiling
 
-from PIL import Image
+from tasstuff.any.bizhawk.controller import SnesPreset_MarioPaint
+from tasstuff.any.bizhawk.inputlog import FileSink
+from tasstuff.any.bizhawk.inputlog import PagerSink
+from tasstuff.any.bizhawk.inputlog import Sink
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+from tasstuff.any.bizhawk.movie import Bk2Writer
+from tasstuff.any.spatial import PointIndex2D
 from tasstuff.any.search import Graph
-from tasstuff.any.search import Graph2D
 from tasstuff.any.search import Node2D
 from tasstuff.any.search import Edge
+from tasstuff.any.search import SearchStats
+
+# A* heuristic for graphs where moving costs frames of mouse input
+def mouseFramesHeuristic(node, goal):
+    """Fewest frames the mouse could possibly take to get from node to goal.
+
+    Both axes move at once, each at up to MOUSE_MAX_SPEED units a frame, so
+    the slower axis sets the pace. This never guesses high as long as edge
+    costs are in frames.
+
+    Args:
+        node (Node2D): node to estimate from
+        goal (Node2D): node to estimate to
+
+    Returns:
+        int: estimated frames remaining
+    """
+    distance = max(abs(node.x - goal.x), abs(node.y - goal.y))
+
+    return math.ceil(distance / mp.MOUSE_MAX_SPEED)
+
+# the whole of a move, worked out in one go instead of frame by frame
+@functools.lru_cache(maxsize=4096)
+def moveDeltas(dx, dy, speed=mp.MOUSE_MAX_SPEED):
+    """Per frame mouse deltas for a move, same as plotAbsolute has always
+    made them.
+
+    Each axis goes at full speed until it's less than a frame away, then
+    covers what's left in one last frame, then sits at 0 while the other
+    axis catches up.
+
+    Args:
+        dx (int): distance to move on x
+        dy (int): distance to move on y
+        speed (int, optional): most either axis can move in a frame.
+            Defaults to MOUSE_MAX_SPEED.
+
+    Returns:
+        tuple: (x delta, y delta) for each frame
+    """
+    xs = _axisDeltas(dx, speed)
+    ys = _axisDeltas(dy, speed)
+
+    frames = max(len(xs), len(ys))
+
+    xs = xs + ([0] * (frames - len(xs)))
+    ys = ys + ([0] * (frames - len(ys)))
+
+    return tuple(zip(xs, ys))
+
+def _axisDeltas(distance, speed):
+    full, rest = divmod(abs(distance), speed)
+    sign       = -1 if (distance < 0) else 1
+
+    ret = [sign * speed] * int(full)
+
+    if (0 != rest):
+        ret.append(sign * rest)
+
+    return ret
+
+@functools.lru_cache(maxsize=4096)
+def moveFrames(template, dx, dy, speed=mp.MOUSE_MAX_SPEED):
+    """Mnemonics for a whole move, from a template with the buttons already
+    filled in.
+
+    Args:
+        template (str): mnemonic template taking the x and y deltas
+        dx (int): distance to move on x
+        dy (int): distance to move on y
+        speed (int, optional): most either axis can move in a frame.
+            Defaults to MOUSE_MAX_SPEED.
+
+    Returns:
+        tuple: a mnemonic for each frame
+    """
+    return tuple(template.format(int(x), int(y))
+                 for x, y in moveDeltas(dx, dy, speed))
 
 # define edges for Mario Paint
 class MPaintEdge(Edge):
@@ -59,8 +147,53 @@ class Plotter:
         
         # how deep our terminal's scrollback is, for max output length.
         # my windows CMD seems to go to about 8000. YMMV.
+        # also how many frames the buffer holds before handing them off.
         self.scrollback = 5000
 
+        # where buffered frames end up
+        self.sink = PagerSink(self.scrollback)
+
+        # most passes mask makes improving on the greedy drawing order, and
+        # seconds to cut them off after. None means no limit, which keeps the
+        # movie the same however fast the machine is
+        self.orderPasses     = 1
+        self.orderTimeBudget = None
+
+        # what mask's greedy order finds the closest target with - a
+        # PointIndex2D, or a FieldIndex2D to search a kept distance field.
+        # the canvas is wide open, so the field's never faster than just
+        # looking at nearby points - it's here to measure against
+        self.targetIndex = PointIndex2D
+
+        # the order mask drew in last, and how it scored
+        self.lastTour = None
+
+        # a SearchStats that mask measures its closest target searches into,
+        # piling up over every mask until it's reset, or None not to measure
+        self.searchStats = None
+
+        # a FrameProfile to count frames into by what made them, or None not
+        # to count. _operation, when set, is what everything's counted as
+        # instead - all of a click is the click, say
+        self.profile    = None
+        self._operation = None
+
+        # frames get written from a template for each way the mouse buttons
+        # can be, with just the deltas left to fill in
+        controls  = SnesPreset_MarioPaint()
+        mnemonics = MnemonicFormat(controls)
+        leftBit   = mnemonics.buttonMask(controls.mL)
+        rightBit  = mnemonics.buttonMask(controls.mR)
+
+        self.templates = {}
+
+        for down in (False, True):
+            for rightdown in (False, True):
+                bits = ((leftBit if down else 0) |
+                        (rightBit if rightdown else 0))
+
+                self.templates[(down, rightdown)] = mnemonics.analogTemplate(bits)
+
     # helper, set offsets with one function
     def setOffsets(self, x, y):
         self.offsetX = int(x)
@@ -83,16 +216,16 @@ class Plotter:
     def getMaxDelta(self, current, target):
         # It's about what you'd expect
         ret      = 0
-        distance = math.sqrt(pow((current - target), 2))
+        distance = abs(current - target)
         
         if (0 == distance):
             # we're already there!
             ret = 0
         else:
             # oh, well, now we can do more interesting things
-            if (distance >= 10):
+            if (distance >= mp.MOUSE_MAX_SPEED):
                 # 10 is the maximum meaningful speed anyway
-                ret = 10
+                ret = mp.MOUSE_MAX_SPEED
             else:
                 # by rule, distance and speed should match here
                 ret = distance
@@ -103,6 +236,10 @@ class Plotter:
                 
         return ret
 
+    # helper, whether a point is somewhere the plotter can actually go
+    def onScreen(self, x, y):
+        return masks.onScreen(x, y)
+
     # change internal coordinates to the ones given
     def jump(self, newX, newY):
         # clamp those, don't trust anyone!
@@ -138,97 +275,83 @@ class Plotter:
         # now we just hand that to the other function
         self.plotAbsolute(targetX, targetY)
     
-    # move to the specified screen coordinates as quickly as possible
-    def plotAbsolute(self, tarX, tarY):
+    # move to the specified screen coordinates as quickly as possible, or
+    # no faster than speed on either axis
+    def plotAbsolute(self, tarX, tarY, speed=mp.MOUSE_MAX_SPEED):
         # clamp our targets
         targetX = self.clamp(tarX, mp.SCREEN_MIN_X, mp.SCREEN_MAX_X)
         targetY = self.clamp(tarY, mp.SCREEN_MIN_Y, mp.SCREEN_MAX_Y)
         
-        # Great! Now we just need to buffer instructions until we
-        # reach our targets!
-        keepMoving = True
-        
-        while(keepMoving):
-            # first, invalidate keep moving
-            keepMoving = False
-            
-            # now, instruction X and Y need scoped, sort of
-            instX = 0
-            instY = 0
-            
-            # X there yet?
-            if (self.x != targetX):
-                keepMoving = True
-                instX = self.getMaxDelta(self.x, targetX)
-            
-            # Y there yet?
-            if (self.y != targetY):
-                keepMoving = True
-                instY = self.getMaxDelta(self.y, targetY)
-            
-            # we only need to output if we need to keep moving.
-            if (keepMoving):
-                self.bufferInstruction(instX, instY)
-                self.x = self.x + instX
-                self.y = self.y + instY
-                
+        # Great! The whole move's worked out (and likely already cached), so
+        # it all goes in the buffer at once.
+        template = self.templates[(self.down, self.rightdown)]
+        frames   = moveFrames(template, targetX - self.x, targetY - self.y,
+                              speed)
+
+        self.buffer.extend(frames)
+
+        if (self.profile is not None):
+            self.profile.add(self._operation or (profiling.TAG_STROKE
+                                                 if self.down else
+                                                 profiling.TAG_TRAVEL),
+                             len(frames))
+
+        self.x = targetX
+        self.y = targetY
+
         self.outputBuffer(False)
 
     # wait some number of frames.
     def wait(self, frames):
+        if (self.profile is not None):
+            self.profile.add(self._operation or (profiling.TAG_WAIT_DOWN
+                                                 if self.down else
+                                                 profiling.TAG_WAIT_UP),
+                             frames)
+
         for i in range(frames):                # pylint: disable=unused-variable
-            self.bufferInstruction(0, 0)
+            self._bufferFrame(0, 0)
     
     # click the lmb for 7 frames, then release
     def click(self):
+        previous        = self._operation
+        self._operation = profiling.TAG_CLICK
+
         self.penUp()
         self.wait(1)
         self.penDown()
         self.wait(7)
         self.penUp()
         self.wait(1)
+
+        self._operation = previous
     
     # click the rmb for 7 frames, then release
     def rightclick(self):
+        previous        = self._operation
+        self._operation = profiling.TAG_RIGHTCLICK
+
         self.rightUp()
         self.wait(1)
         self.rightDown()
         self.wait(7)
         self.rightUp()
         self.wait(1)
+
+        self._operation = previous
     
     def bufferInstruction(self, x, y):
-        # for now, instructions are straight output
-        # later, a buffer might go here to prevent
-        # command prompt flooding
-        out = ""
-        
-        # console buttons
-        out = out + "|..|"
-        
-        # X delta
-        out = out + str(int(x)).rjust(5, " ") + ","
-        
-        # Y delta
-        out = out + str(int(y)).rjust(5, " ") + ","
-        
-        # left mouse
-        if (self.down):
-            out = out + "l"
-        else:
-            out = out + "."
-        
-        # right mouse
-        if (self.rightdown):
-            out = out + "r"
-        else:
-            out = out + "."
-            
-        # controller in port 2
-        out = out + "|............|"
-        
+        if (self.profile is not None):
+            self.profile.add(self._operation or profiling.TAG_INSTRUCTION, 1)
+
+        self._bufferFrame(x, y)
+
+    # a single frame, uncounted
+    def _bufferFrame(self, x, y):
+        template = self.templates[(self.down, self.rightdown)]
+
         # add to buffer
-        self.buffer.append(out)
+        self.buffer.append(template.format(int(x), int(y)))
         
         # do the buffer output stuff
         self.outputBuffer(False)
@@ -242,112 +365,80 @@ class Plotter:
         elif (force):
             doOutput = True
         
-        if (doOutput):
-            # reverse it
-            self.buffer.reverse()
-            
-            print("")
-            
-            # pop the items off and print them
-            # before discarding
-            while(len(self.buffer) > 0):
-                print(self.buffer.pop())
-            
-            # burn some time
-            print("")
-            #pylint: disable=unused-variable
-            ignored = input("< Input enter to continue script. >")
-    
+        if (doOutput and (len(self.buffer) > 0)):
+            # hand the lot off in one go
+            self.sink.write(self.buffer)
+            self.buffer = []
+
+    # send output somewhere else from here on, finishing off the old sink
+    def setSink(self, sink):
+        self.outputBuffer(True)
+        self.sink.close()
+        self.sink = sink
+
+    # drag the pen from one point to another, getting the pen down at the
+    # first point in whatever way is cheapest from where it is now. the drag
+    # goes at PEN_DRAW_SPEED so it draws every pixel on the way
+    def drawStroke(self, x0, y0, x1, y1):
+        if (self.down):
+            # determine adjacency
+            # defined here as "able to be drawn without lifting pen"
+            if (ordering.canDrag(self.x, self.y, x0, y0)):
+                # if it's adjacent, we just move to it
+                self.plotAbsolute(x0, y0, mp.PEN_DRAW_SPEED)
+            else:
+                # if it's not, what a pain.
+                self.penUp()
+                self.wait(mp.PEN_LIFT_FRAMES)
+                self.plotAbsolute(x0, y0)
+                self.penDown()
+                self.wait(mp.PEN_DROP_FRAMES)
+        else:
+            # not self.down
+            # we'll assume the wait has already happened here
+            self.plotAbsolute(x0, y0)
+            self.wait(mp.PEN_LIFT_FRAMES)
+            self.penDown()
+            self.wait(mp.PEN_DROP_FRAMES)
+
+        # and now the stroke itself
+        self.plotAbsolute(x1, y1, mp.PEN_DRAW_SPEED)
+
     # draws a 1 bit mask's black pixels to the screen
     # assumes quite a lot I suppose - pen is already
     # selected, pen is a single pixel at (9, 9)
     # stamp, etc.
     def mask(self, path):
-        # open image using PILLOW
-        im = Image.open(path)
-        
-        # make sure it's RGB
-        im = im.convert("RGB")
-        
-        # define black as the value of its RGB triple for comparison later
-        black = (0, 0, 0)
-        
+        if (self.profile is not None):
+            self.profile.begin("mask " + path)
+
         # prep pen
         if (self.down):
             # need to lift and wait so we know input will be read
             self.penUp()
             self.wait(10)
 
-        # prep search grid
-        width  = im.size[0]
-        height = im.size[1]
-        
-        sGrid = Graph2D(width, height)
-        
-        # have to set targets in the grid
-        for x in range(width):
-            for y in range(height):
-                px = im.getpixel((x, y))
-                if (black == px):
-                    sGrid.contents[x][y].target = True
-
-        # we need to track where we just were
-        lastX = self.x
-        lastY = self.y
-        
-        nxtExists = True
-        
-        while (nxtExists):
-            # find our next target
-            nxtExists, x, y = sGrid.findClosestTargetTo(lastX, lastY)
-        
-            # and so we go ahead and do this, I suppose.
-            if (nxtExists):
-                # draw on the plotter
-                if (self.down):
-                    # determine adjacency
-                    # defined here as "able to be drawn without lifting pen"
-                    # now including if moving the pen would leave undrawn ones
-                    # between also - remarkably - undrawn
-                    adjacent = False
-                    xDist    = int(abs(x - lastX))
-                    yDist    = int(abs(y - lastY))
-                            
-                    # within one jump rules
-                    if ((xDist <= 10) and (yDist == 0)):
-                        # horizontal
-                        adjacent = True
-                    elif ((xDist == 0) and (yDist <= 10)):
-                        # vertical
-                        adjacent = True
-                    elif ((xDist <= 10) and (yDist <= 10)):
-                        # diagonal
-                        adjacent = True
-                    else:
-                        # not adjacent, is it?
-                        adjacent = False
-                            
-                    # anyway, if it's adjacent, we just move to it
-                    if (adjacent):
-                        self.plotAbsolute(x + self.offsetX, y + self.offsetY)
-                    else:
-                        # if it's not, what a pain.
-                        self.penUp()
-                        self.wait(1)
-                        self.plotAbsolute(x + self.offsetX, y + self.offsetY)
-                        self.penDown()
-                        self.wait(8)
-                else:
-                    # not self.down
-                    # we'll assume the wait has already happened here
-                    self.plotAbsolute(x + self.offsetX, y + self.offsetY)
-                    self.wait(1)
-                    self.penDown()
-                    self.wait(8)
-                            
-                # and now we just set the last drawn coordinates
-                lastX = x
-                lastY = y
+        # prep the targets, kept in screen coordinates since that's where
+        # they'll actually land once the plotter clamps them
+        targets = masks.maskTargets(path, self.offsetX, self.offsetY)
+
+        # work out what order to draw them in
+        self.lastTour = ordering.planOrder(self.x, self.y, targets,
+                                           self.orderPasses,
+                                           self.targetIndex,
+                                           self.searchStats,
+                                           self.orderTimeBudget)
+
+        # and draw them
+        self.drawOrder(self.lastTour.order)
+
+        if (self.profile is not None):
+            self.profile.end()
+
+    # draws strokes in the order given, then lifts the pen
+    def drawOrder(self, order):
+        for stroke in order:
+            self.drawStroke(stroke[0], stroke[1], stroke[2], stroke[3])
         
         # just some slight cleanup
         self.penUp()
@@ -387,42 +478,94 @@ class PlotterREPL:
             if("" == userInput):
                 userInput = "ERROR"
             uin = userInput.split()
+
+            # everything the command does gets counted on its own
+            profile = self.plotter.profile
+
+            if (profile is not None):
+                profile.begin(userInput)
             
             # handle user inputs
-            if ("click" == uin[0]):
+            if ("batch" == uin[0]):
+                tours = batch.plotBatch(self.plotter,
+                                        batch.loadManifest(uin[1]))
+                print(f"batch: {len(tours)} masks, "
+                      f"{sum(t.frames for t in tours)} frames")
+            elif ("click" == uin[0]):
                 self.plotter.click()
             elif ("down" == uin[0]):
                 self.plotter.penDown()
             elif ("exit" == uin[0]):
                 keepGoing = False
             elif ("help" == uin[0]):
+                print("batch file - plot every mask in a JSON manifest")
                 print("click      - click mouse")
                 print("down       - put pen down")
                 print("exit       - exit this program")
                 print("help       - print basic help text")
                 print("mask file - plot black dots in mask")
                 print("jump   x y - set internal location to x, y")
+                print("log        - print output to the console again")
+                print("log   file - write output to an input log file, or")
+                print("             to a movie if file ends in .bk2")
                 print("move   x y - move pen by x, y")
                 print("moveto x y - move pen to x, y")
                 print("offset x y - adjust offset for plotting from image")
+                print("profile    - print where the frames have gone")
+                print("profile  x - x is on to count frames by what made")
+                print("             them, or off to stop counting")
                 print("rightdown  - push right button down")
                 print("rightup    - release right button")
+                print("stats  [n] - measure mask's searches, every nth one")
+                print("stats  off - stop measuring searches")
                 print("status     - give status of pen")
                 print("up         - put pen up")
             elif ("jump" == uin[0]):
                 self.plotter.jump(int(uin[1]), int(uin[2]))
+            elif ("log" == uin[0]):
+                if ((len(uin) > 1) and uin[1].endswith(".bk2")):
+                    self.plotter.setSink(
+                        Bk2Writer(uin[1], mp.MOVIE_HEADER,
+                                  mp.MOVIE_SYNC_SETTINGS,
+                                  SnesPreset_MarioPaint.logKey))
+                elif (len(uin) > 1):
+                    self.plotter.setSink(
+                        FileSink(uin[1], SnesPreset_MarioPaint.logKey))
+                else:
+                    self.plotter.setSink(PagerSink(self.plotter.scrollback))
             elif ("mask" == uin[0]):
                 self.plotter.mask(uin[1])
+                tour = self.plotter.lastTour
+                print(f"order: {tour.frames} frames, "
+                      f"{tour.saved()} saved over greedy")
+
+                if (self.plotter.searchStats is not None):
+                    print("search: " + self.plotter.searchStats.summary())
             elif ("move" == uin[0]):
                 self.plotter.plotRelative(int(uin[1]), int(uin[2]))
             elif ("moveto" == uin[0]):
                 self.plotter.plotAbsolute(int(uin[1]), int(uin[2]))
             elif ("offset" == uin[0]):
                 self.plotter.setOffsets(int(uin[1]), int(uin[2]))
+            elif ("profile" == uin[0]):
+                if ((len(uin) > 1) and ("on" == uin[1])):
+                    self.plotter.profile = profiling.FrameProfile()
+                elif ((len(uin) > 1) and ("off" == uin[1])):
+                    self.plotter.profile = None
+                elif (self.plotter.profile is not None):
+                    print(self.plotter.profile.report())
+                else:
+                    print("Not profiling, try profile on.")
             elif ("rightdown" == uin[0]):
                 self.plotter.rightDown()
             elif ("rightup" == uin[0]):
                 self.plotter.rightUp()
+            elif ("stats" == uin[0]):
+                if ((len(uin) > 1) and ("off" == uin[1])):
+                    self.plotter.searchStats = None
+                else:
+                    every = int(uin[1]) if (len(uin) > 1) else 1
+                    self.plotter.searchStats = SearchStats(every)
             elif ("status" == uin[0]):
                 self.status()
             elif ("up" == uin[0]):
@@ -433,10 +576,19 @@ class PlotterREPL:
             # dump the buffer
             if (len(self.plotter.buffer) > 0):
                 self.plotter.outputBuffer(True)
+
+            if (profile is not None):
+                label, counts = profile.end()
+
+                if (len(counts) > 0):
+                    print(profile.report(counts, label))
             
             # get ready to cycle
             print("")
 
+        # finish off whatever output is open
+        self.plotter.setSink(Sink())
+
 # if the name is main, run the repl
 if ("__main__" == __name__):
     r = PlotterREPL()
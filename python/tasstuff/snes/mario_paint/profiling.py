@@ -0,0 +1,98 @@
+# Where a plot's frames go.
+#
+# A Plotter with a FrameProfile counts every frame it makes under what made
+# it - moving with the pen up, dragging it down, waiting on the pen either
+# way, or clicking. Counting's done once per move or wait rather than once
+# per frame, so it costs next to nothing.
+#
+# Sections gather the counts for just part of a plot, one mask or one REPL
+# command say. They can nest, and every open section gets the frames.
+
+# what a frame can be counted as
+TAG_TRAVEL      = "travel"       # moving with the pen up
+TAG_STROKE      = "stroke"       # moving with the pen down
+TAG_WAIT_UP     = "wait.up"      # waiting with the pen up
+TAG_WAIT_DOWN   = "wait.down"    # waiting with the pen down
+TAG_CLICK       = "click"        # all of a click, waits and all
+TAG_RIGHTCLICK  = "rightclick"   # all of a right click, waits and all
+TAG_INSTRUCTION = "instruction"  # single frames from bufferInstruction
+
+class FrameProfile():
+    """
+    Frame counts by what made them, for a whole plot and for sections of it.
+    """
+    def __init__(self):
+        # tag -> frames, for everything
+        self.totals = {}
+
+        # (label, counts) for every section that's been ended, in order
+        self.sections = []
+
+        # (label, counts) for every section still open, innermost last
+        self._open = []
+
+    def add(self, tag, frames):
+        """Counts frames.
+
+        Args:
+            tag (str): what made them
+            frames (uint): how many
+        """
+        self.totals[tag] = self.totals.get(tag, 0) + frames
+
+        for label, counts in self._open:
+            counts[tag] = counts.get(tag, 0) + frames
+
+    def begin(self, label):
+        """Starts a section.
+
+        Args:
+            label (str): what to call it in reports
+        """
+        self._open.append((label, {}))
+
+    def end(self):
+        """Finishes the innermost section.
+
+        Raises:
+            ValueError: there's no section open
+
+        Returns:
+            tuple: (label, dict of tag -> frames) for the section
+        """
+        if (0 == len(self._open)):
+            raise ValueError("No section to end!")
+
+        ret = self._open.pop()
+        self.sections.append(ret)
+
+        return ret
+
+    def reset(self):
+        """Forgets everything counted so far, open sections included."""
+        self.totals   = {}
+        self.sections = []
+        self._open    = []
+
+    def report(self, counts=None, label="total"):
+        """Lays counts out as a table, biggest first.
+
+        Args:
+            counts (dict, optional): tag -> frames. Defaults to None, meaning
+                the totals.
+            label (str, optional): what to call them. Defaults to "total".
+
+        Returns:
+            str: a line per tag with its frames and share, then the sum
+        """
+        if (counts is None):
+            counts = self.totals
+
+        total = sum(counts.values())
+        lines = [f"{label}: {total} frames"]
+
+        for tag, frames in sorted(counts.items(), key=lambda i: (-i[1], i[0])):
+            share = (100.0 * frames / total) if (total > 0) else 0.0
+            lines.append(f"    {tag:<12} {frames:>8} {share:>6.1f}%")
+
+        return "\n".join(lines)
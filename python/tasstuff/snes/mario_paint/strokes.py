@@ -0,0 +1,161 @@
+# Breaking 1 bit masks down into strokes the plotter can drag the pen along.
+#
+# plotAbsolute moves both axes at up to the same speed every frame, so a
+# move that's straight across, straight down, or at exactly 45 degrees stays
+# on that line the whole way. Runs of black pixels in those four directions
+# can each be drawn with the pen held down, a pixel a frame, instead of dot
+# by dot.
+#
+# Masks are kept as (width, height, bits), where bits is a bytearray with
+# one byte per pixel at y * width + x, nonzero for black.
+import heapq
+
+from PIL import Image
+from PIL import ImageChops
+
+# (x step, y step) for each direction a run can go in
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
+
+def loadMask(path):
+    """Reads an image into a mask in one go.
+
+    Black means exactly (0, 0, 0) once converted to RGB, same as it always
+    has.
+
+    Args:
+        path (str): image to read
+
+    Returns:
+        tuple: (width, height, bits)
+    """
+    im = Image.open(path).convert("RGB")
+
+    # the brightest channel is only 0 for pure black
+    r, g, b = im.split()
+    brightest = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    black     = brightest.point(lambda v: 1 if (0 == v) else 0)
+
+    return im.size[0], im.size[1], bytearray(black.tobytes())
+
+def findRuns(width, height, bits):
+    """Finds every maximal run of black pixels in each of the directions.
+
+    A lone pixel is a run of one, and shows up once per direction.
+
+    Args:
+        width (uint): width of the mask
+        height (uint): height of the mask
+        bits (bytearray): the mask
+
+    Returns:
+        list: (x0, y0, x1, y1) for each run
+    """
+    ret = []
+
+    for dx, dy in DIRECTIONS:
+        for y in range(height):
+            row = y * width
+
+            for x in range(width):
+                if (not bits[row + x]):
+                    continue
+
+                # only start where the run can't go back any further
+                px = x - dx
+                py = y - dy
+
+                if ((0 <= px < width) and (0 <= py < height) and
+                    bits[(py * width) + px]):
+                    continue
+
+                ex = x
+                ey = y
+
+                while (True):
+                    nx = ex + dx
+                    ny = ey + dy
+
+                    if ((0 <= nx < width) and (0 <= ny < height) and
+                        bits[(ny * width) + nx]):
+                        ex = nx
+                        ey = ny
+                    else:
+                        break
+
+                ret.append((x, y, ex, ey))
+
+    return ret
+
+def runPixels(width, run):
+    """Lists the pixels along a run, start to end.
+
+    Args:
+        width (uint): width of the mask
+        run (tuple): (x0, y0, x1, y1), straight or at 45 degrees
+
+    Returns:
+        list: the index of each pixel
+    """
+    x0, y0, x1, y1 = run
+
+    dx = (x1 > x0) - (x1 < x0)
+    dy = (y1 > y0) - (y1 < y0)
+
+    length = max(abs(x1 - x0), abs(y1 - y0)) + 1
+    start  = (y0 * width) + x0
+    step   = (dy * width) + dx
+
+    return [start + (i * step) for i in range(length)]
+
+def extractStrokes(width, height, bits):
+    """Covers every black pixel in a mask with as few strokes as it can.
+
+    This is a greedy cover: whichever run would draw the most pixels that
+    nothing has drawn yet goes first, trimmed down to just the span those new
+    pixels are in. Strokes can overlap where that saves starting another one.
+
+    Args:
+        width (uint): width of the mask
+        height (uint): height of the mask
+        bits (bytearray): the mask
+
+    Returns:
+        list: (x0, y0, x1, y1) for each stroke, in mask coordinates
+    """
+    ret     = []
+    covered = bytearray(len(bits))
+
+    # (-new pixels, tiebreak, run), counts only ever go down so a run whose
+    # count is still right when it comes off the heap really is the best
+    toCover = []
+
+    for i, run in enumerate(findRuns(width, height, bits)):
+        length = max(abs(run[2] - run[0]), abs(run[3] - run[1])) + 1
+        toCover.append((-length, i, run))
+
+    heapq.heapify(toCover)
+
+    while (len(toCover) > 0):
+        count, i, run = heapq.heappop(toCover)
+        pixels = runPixels(width, run)
+        fresh  = [n for n, px in enumerate(pixels) if (not covered[px])]
+
+        if (0 == len(fresh)):
+            # nothing left for this one to do
+            continue
+
+        if (len(fresh) < -count):
+            # it got worse since it was pushed, back in line
+            heapq.heappush(toCover, (-len(fresh), i, run))
+            continue
+
+        for n in fresh:
+            covered[pixels[n]] = 1
+
+        # trim the ends that would only draw over what's already drawn
+        first = pixels[fresh[0]]
+        last  = pixels[fresh[-1]]
+
+        ret.append((first % width, first // width, last % width, last // width))
+
+    return ret
@@ -88,6 +88,20 @@ class Test_Button(unittest.TestCase):
         self.assertEqual(tst.onStr, "ONSTRING")
         self.assertEqual(tst.offStr, ".")
     
+    def test_slots(self):
+        tst = controller.Button("NAME", "x")
+
+        self.assertFalse(hasattr(tst, "__dict__"))
+        self.assertFalse(hasattr(controller.AnalogInput("a", 0, 1), "__dict__"))
+
+        # groups keep theirs
+        self.assertTrue(hasattr(controller.SnesMouse(), "__dict__"))
+
+        # mnemonic strings are shared between buttons
+        name = "".join(["ON", "STRING"])
+        self.assertIs(controller.Button("a", name).onStr,
+                      controller.Button("b", "ONSTRING").onStr)
+
     def test_constructor_args(self):
          tst = controller.Button("NAME", "ONSTRING", "OFFSTRING")
          
@@ -350,4 +364,18 @@ class Test_SnesMarioPaintControllerGroup(unittest.TestCase):
 
         m3 = "|..|    0,    0,..|............|"
         tst.fromMnemonic(m3)
-        self.assertEqual(str(tst), m3)
\ No newline at end of file
+        self.assertEqual(str(tst), m3)
+
+    def test_mnemonicLayout(self):
+        tst    = controller.SnesPreset_MarioPaint()
+        layout = tst.mnemonicLayout()
+
+        self.assertEqual(layout[0], "|")
+        self.assertIs(layout[1], tst.resetBttn)
+        self.assertEqual(layout[4], (tst.mX, 5))
+        self.assertIs(layout[9], tst.mR)
+        self.assertIs(layout[-2], tst.r)
+        self.assertEqual(layout[-1], "|")
+
+        with self.assertRaises(NotImplementedError):
+            controller.Joystick("test", -1, 1, -1, 1).mnemonicLayout()
@@ -0,0 +1,155 @@
+# unit tests for greenzone.py
+import random
+import unittest
+
+import tasstuff.any.bizhawk.greenzone as greenzone
+import tasstuff.any.bizhawk.history as history
+
+from tasstuff.any.bizhawk.controller import SnesPreset_MarioPaint
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+
+def total(tracked, bits, axes):
+    # a running total of the first analog input
+    return tracked + axes[0]
+
+class Test_Greenzone(unittest.TestCase):
+    def setUp(self):
+        self.controls = SnesPreset_MarioPaint()
+        self.format   = MnemonicFormat(self.controls)
+
+        rng = random.Random(5)
+
+        self.states = [(rng.randrange(1 << len(self.format.buttons)),
+                        tuple(rng.randint(-10, 10)
+                              for a in self.format.analogs))
+                       for i in range(500)]
+
+        self.roll = history.PianoRoll()
+
+        for bits, axes in self.states:
+            self.roll.addFrame(self.format.serialize(bits, axes))
+
+    def expected(self, frame):
+        return sum(axes[0] for bits, axes in self.states[:frame + 1])
+
+    def test_seek(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 16, step=total,
+                                  start=0)
+
+        for frame in [0, 15, 16, 499, 250, 3, 31, 100, 101, 102]:
+            found = tst.seek(frame)
+
+            self.assertEqual(found.frame, frame)
+            self.assertEqual((found.bits, found.axes), self.states[frame])
+            self.assertEqual(found.tracked, self.expected(frame))
+
+        # every checkpoint passed on the way is kept, on the grid
+        self.assertEqual(sorted(tst.checkpoints), list(range(15, 499, 16)))
+
+    def test_seek_replaysLittle(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 16, step=total,
+                                  start=0)
+        tst.seek(499)
+
+        for frame in random.Random(6).sample(range(500), 100):
+            before = tst.replayed
+
+            self.assertEqual(tst.seek(frame).tracked, self.expected(frame))
+            self.assertLess(tst.replayed - before, 16)
+
+    def test_seek_forward(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 64, step=total,
+                                  start=0)
+
+        # scrubbing forward a frame at a time carries on from the last one
+        for frame in range(200):
+            self.assertEqual(tst.seek(frame).tracked, self.expected(frame))
+
+        self.assertEqual(tst.replayed, 200)
+
+    def test_seek_packed(self):
+        roll = history.PackedPianoRoll(SnesPreset_MarioPaint())
+        roll.addFrames(self.roll.inputs())
+
+        tst = greenzone.Greenzone(roll, self.controls, 32, step=total,
+                                  start=0)
+
+        for frame in [499, 0, 77]:
+            self.assertEqual(tst.seek(frame).tracked, self.expected(frame))
+
+    def test_seek_outOfRange(self):
+        tst = greenzone.Greenzone(self.roll, self.controls)
+
+        with self.assertRaises(IndexError):
+            tst.seek(500)
+
+        with self.assertRaises(IndexError):
+            tst.seek(-1)
+
+    def test_constructor_badInterval(self):
+        with self.assertRaises(ValueError):
+            greenzone.Greenzone(self.roll, self.controls, 0)
+
+    def test_budget(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 8, budget=3000,
+                                  step=total, start=0)
+        tst.seek(499)
+
+        self.assertLessEqual(tst.used, 3000)
+        self.assertLess(len(tst), 499 // 8)
+
+        # the newest are what's left
+        self.assertIn(495, tst.checkpoints)
+        self.assertNotIn(7, tst.checkpoints)
+
+        # anything can still be got to, from further back
+        for frame in [3, 100, 499]:
+            self.assertEqual(tst.seek(frame).tracked, self.expected(frame))
+
+        self.assertLessEqual(tst.used, 3000)
+
+    def test_budget_leastRecentlyUsed(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 100, step=total,
+                                  start=0)
+        tst.seek(499)
+
+        # room for four of the five
+        tst.budget = tst.used * 9 // 10
+
+        # 99 gets used, so it's 199 that goes when 499 comes back
+        tst.seek(150)
+        tst.invalidate(499)
+        tst.seek(499)
+
+        self.assertEqual(sorted(tst.checkpoints), [99, 299, 399, 499])
+
+    def test_invalidate(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 16, step=total,
+                                  start=0)
+        tst.seek(499)
+
+        # change a frame, and everything after it is out of date
+        bits, axes = self.states[200]
+        self.states[200] = (bits, (axes[0] + 7,) + axes[1:])
+        self.roll.frames[200].input = self.format.serialize(*self.states[200])
+
+        tst.invalidate(200)
+
+        self.assertEqual(max(tst.checkpoints), 191)
+        self.assertEqual(tst.seek(499).tracked, self.expected(499))
+        self.assertEqual(tst.seek(200).tracked, self.expected(200))
+
+    def test_clear(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 16)
+        tst.seek(499)
+        tst.clear()
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(tst.used, 0)
+
+    def test_load(self):
+        tst = greenzone.Greenzone(self.roll, self.controls, 16, step=total,
+                                  start=0)
+
+        self.assertEqual(tst.load(321), self.expected(321))
+        self.assertEqual(repr(self.controls), self.roll.input(321))
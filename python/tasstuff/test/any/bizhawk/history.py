@@ -1,5 +1,7 @@
+import random
 import unittest
 
+import tasstuff.any.bizhawk.controller as controller
 import tasstuff.any.bizhawk.history as history
 
 class Test_PianoRollEntry(unittest.TestCase):
@@ -29,4 +31,385 @@ class Test_PianoRoll(unittest.TestCase):
 
         self.assertEqual(len(tst.frames), 1)
         self.assertEqual(tst.currentFrame, 1)
-        self.assertEqual(tst.frames[0].input, "|test|input|here|")
\ No newline at end of file
+        self.assertEqual(tst.frames[0].input, "|test|input|here|")
+
+    def test_input(self):
+        tst = history.PianoRoll()
+
+        tst.addFrame("|a|")
+        tst.addFrame("|b|")
+
+        self.assertEqual(len(tst), 2)
+        self.assertEqual(tst.input(1), "|b|")
+
+    def test_inputs(self):
+        tst = history.PianoRoll()
+
+        tst.addFrame("|a|")
+        tst.addFrame("|b|")
+
+        self.assertEqual(list(tst.inputs()), ["|a|", "|b|"])
+
+class Test_PackedPianoRoll(unittest.TestCase):
+    # a mouse click in the middle of a mario paint movie
+    FRAMES = [
+        "|..|    0,    0,..|............|",
+        "|..|   10,   -3,l.|............|",
+        "|..|   -7,   10,l.|.........A..|",
+        "|rP|    0,    0,.r|UDLRsSYBXAlr|",
+    ]
+
+    def build_roll(self):
+        ret = history.PackedPianoRoll(controller.SnesPreset_MarioPaint())
+
+        for frame in self.FRAMES:
+            ret.addFrame(frame)
+
+        return ret
+
+    def test_constructor(self):
+        tst = history.PackedPianoRoll(controller.SnesPreset_MarioPaint())
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(len(tst.buttons), 2 + 2 + 12)
+        self.assertEqual(len(tst.analogs), 2)
+
+        # sixteen buttons and a mouse that only goes to 10
+        self.assertEqual(tst.buttonBits.typecode, "H")
+        self.assertEqual([a.typecode for a in tst.axes], ["b", "b"])
+
+    def test_addFrame(self):
+        tst = self.build_roll()
+
+        self.assertEqual(len(tst), 4)
+        self.assertEqual(tst.state(0), (0, (0, 0)))
+        self.assertEqual(tst.state(1), (1 << 2, (10, -3)))
+        self.assertEqual(tst.state(3), ((1 << 16) - 1 - (1 << 2), (0, 0)))
+
+    def test_addFrame_out_of_range(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = history.PackedPianoRoll(pad)
+        far = "|..|  200, -300,..|............|"
+
+        # clamped to what the mouse can do, same as fromMnemonic
+        tst.addFrame(far)
+        tst.addFrames([far])
+        tst.addState(0, (200, -300))
+
+        pad.fromMnemonic(far)
+
+        for frame in range(3):
+            self.assertEqual(tst.state(frame), (0, (10, -10)))
+            self.assertEqual(tst.input(frame), repr(pad))
+
+    def test_input(self):
+        tst = self.build_roll()
+
+        for i, frame in enumerate(self.FRAMES):
+            self.assertEqual(tst.input(i), frame)
+
+        self.assertEqual(list(tst.inputs()), self.FRAMES)
+
+    def test_addController(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = history.PackedPianoRoll(pad)
+
+        pad.mX.press(4)
+        pad.mL.press()
+        tst.addController()
+
+        self.assertEqual(tst.input(0), "|..|    4,    0,l.|............|")
+
+    def test_countHeld(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = history.PackedPianoRoll(pad)
+
+        for frame in self.FRAMES:
+            tst.addFrame(frame)
+
+        self.assertEqual(tst.countHeld(pad.mL), 2)
+        self.assertEqual(tst.countHeld(pad.a), 2)
+        self.assertEqual(tst.countHeld(pad.mR), 1)
+
+        with self.assertRaises(ValueError):
+            tst.countHeld(controller.Button("stray", "s"))
+
+    def test_toRoll(self):
+        chk = self.build_roll().toRoll()
+
+        self.assertEqual([e.input for e in chk.frames], self.FRAMES)
+        self.assertEqual([e.frame for e in chk.frames], [0, 1, 2, 3])
+
+class Test_RunLengthPianoRoll(unittest.TestCase):
+    def test_constructor_default(self):
+        tst = history.RunLengthPianoRoll()
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(list(tst.inputs()), [])
+
+    def test_addFrame(self):
+        tst = history.RunLengthPianoRoll()
+
+        for inpt in ["|a|", "|a|", "|a|", "|b|", "|a|", "|a|"]:
+            tst.addFrame(inpt)
+
+        self.assertEqual(len(tst), 6)
+        self.assertEqual(list(tst.runs()), [("|a|", 3), ("|b|", 1),
+                                            ("|a|", 2)])
+
+    def test_addRun(self):
+        tst = history.RunLengthPianoRoll()
+
+        tst.addRun("|a|", 1000)
+        tst.addRun("|a|", 5)
+        tst.addRun("|b|", 0)
+        tst.addRun("|b|", 2)
+
+        self.assertEqual(len(tst), 1007)
+        self.assertEqual(len(tst.states), 2)
+
+    def test_addFrames(self):
+        frames = ["|a|", "|b|", "|b|", "|c|", "|c|", "|c|"]
+        tst    = history.RunLengthPianoRoll()
+
+        tst.addFrames(frames)
+        tst.addFrames(iter(["|c|", "|a|"]))
+
+        self.assertEqual(list(tst.inputs()), frames + ["|c|", "|a|"])
+        self.assertEqual(len(tst.states), 4)
+
+    def test_input(self):
+        frames = ["|a|"] * 5 + ["|b|"] + ["|c|"] * 3
+        tst    = history.RunLengthPianoRoll()
+        tst.addFrames(frames)
+
+        for frame, inpt in enumerate(frames):
+            self.assertEqual(tst.input(frame), inpt)
+
+        chk = tst.entry(5)
+        self.assertEqual((chk.input, chk.frame), ("|b|", 5))
+
+        with self.assertRaises(IndexError):
+            tst.input(9)
+
+        with self.assertRaises(IndexError):
+            tst.input(-1)
+
+    def test_toRoll(self):
+        tst = history.RunLengthPianoRoll()
+        tst.addRun("|a|", 3)
+        tst.addRun("|b|", 1)
+
+        chk = tst.toRoll()
+        self.assertEqual([e.input for e in chk.frames], ["|a|"] * 3 + ["|b|"])
+        self.assertEqual([e.frame for e in chk.frames], [0, 1, 2, 3])
+
+class Test_diffRolls(unittest.TestCase):
+    def build_roll(self, frames, kind=history.PianoRoll):
+        ret = kind()
+
+        for inpt in frames:
+            ret.addFrame(inpt)
+
+        return ret
+
+    def test_same(self):
+        frames = ["|a|", "|a|", "|b|"]
+        chk    = history.diffRolls(self.build_roll(frames),
+                                   self.build_roll(frames,
+                                                   history.RunLengthPianoRoll))
+
+        self.assertFalse(chk)
+        self.assertIs(chk.firstDesync, None)
+        self.assertEqual(chk.ranges, [])
+        self.assertEqual((chk.leftLength, chk.rightLength), (3, 3))
+
+    def test_ranges(self):
+        left  = ["|a|"] * 4 + ["|b|"] * 4 + ["|c|"] * 4
+        right = ["|a|"] * 3 + ["|x|"] * 2 + ["|b|"] * 3 + ["|c|", "|y|"] * 2
+
+        for kind in [history.PianoRoll, history.RunLengthPianoRoll]:
+            chk = history.diffRolls(self.build_roll(left, kind),
+                                    self.build_roll(right, kind))
+
+            self.assertTrue(chk)
+            self.assertEqual(chk.firstDesync, 3)
+            self.assertEqual(chk.ranges, [(3, 5), (9, 10), (11, 12)])
+            self.assertEqual(chk.changedFrames(), 4)
+
+    def test_lengths(self):
+        left  = ["|a|"] * 5
+        right = ["|a|"] * 3 + ["|b|"] * 4
+
+        chk = history.diffRolls(self.build_roll(left),
+                                self.build_roll(right,
+                                                history.RunLengthPianoRoll))
+
+        self.assertEqual(chk.ranges, [(3, 7)])
+        self.assertEqual((chk.leftLength, chk.rightLength), (5, 7))
+
+        chk = history.diffRolls(self.build_roll([]), self.build_roll(left))
+        self.assertEqual(chk.firstDesync, 0)
+        self.assertEqual(chk.ranges, [(0, 5)])
+
+class Test_RopePianoRoll(unittest.TestCase):
+    def build_roll(self, count, chunkSize=4):
+        ret = history.RopePianoRoll()
+
+        # small chunks, so edits land inside them
+        ret.CHUNK_SIZE = chunkSize
+        ret.addFrames(f"|{i}|" for i in range(count))
+
+        return ret
+
+    def depth(self, roll):
+        # deepest path through the rope, without recursion
+        ret   = 0
+        stack = [(roll._root, 1)] if roll._root else []
+
+        while (len(stack) > 0):
+            node, depth = stack.pop()
+            ret         = max(ret, depth)
+
+            for child in (node.left, node.right):
+                if (child is not None):
+                    stack.append((child, depth + 1))
+
+        return ret
+
+    def test_constructor_default(self):
+        tst = history.RopePianoRoll()
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(tst.currentFrame, 0)
+        self.assertEqual(list(tst.inputs()), [])
+
+    def test_addFrame(self):
+        tst = history.RopePianoRoll(["|a|"])
+        tst.CHUNK_SIZE = 2
+
+        for inpt in ["|b|", "|c|", "|d|"]:
+            tst.addFrame(inpt)
+
+        self.assertEqual(len(tst), 4)
+        self.assertEqual(list(tst.inputs()), ["|a|", "|b|", "|c|", "|d|"])
+        self.assertEqual([tst.input(i) for i in range(4)],
+                         ["|a|", "|b|", "|c|", "|d|"])
+
+        with self.assertRaises(IndexError):
+            tst.input(4)
+
+    def test_insert(self):
+        tst = self.build_roll(10)
+
+        tst.insert(5, ["|x|", "|y|"])
+        tst.insert(0, ["|s|"])
+        tst.insert(len(tst), ["|e|"])
+
+        chk = list(tst.inputs())
+        self.assertEqual(chk[:1], ["|s|"])
+        self.assertEqual(chk[5:9], ["|4|", "|x|", "|y|", "|5|"])
+        self.assertEqual(chk[-1], "|e|")
+        self.assertEqual(len(tst), 14)
+
+        # numbers come from position, so everything after moved along
+        self.assertEqual(tst.entry(8).input, "|5|")
+        self.assertEqual(tst.entry(8).frame, 8)
+
+    def test_delete(self):
+        tst = self.build_roll(10)
+
+        tst.delete(3, 7)
+        self.assertEqual(list(tst.inputs()),
+                         ["|0|", "|1|", "|2|", "|7|", "|8|", "|9|"])
+
+        with self.assertRaises(IndexError):
+            tst.delete(4, 7)
+
+        with self.assertRaises(IndexError):
+            tst.delete(3, 2)
+
+    def test_copy(self):
+        tst = self.build_roll(10)
+        chk = tst.copy(2, 6)
+
+        self.assertEqual(list(chk.inputs()), ["|2|", "|3|", "|4|", "|5|"])
+
+        # editing either leaves the other alone
+        tst.delete(0, 10)
+        chk.insert(1, ["|x|"])
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(list(chk.inputs()),
+                         ["|2|", "|x|", "|3|", "|4|", "|5|"])
+
+        self.assertEqual(len(self.build_roll(3).copy()), 3)
+
+    def test_splice(self):
+        tst   = self.build_roll(10)
+        other = self.build_roll(3)
+
+        tst.splice(2, 8, other)
+        self.assertEqual(list(tst.inputs()),
+                         ["|0|", "|1|", "|0|", "|1|", "|2|", "|8|", "|9|"])
+
+        # a roll can even be spliced into itself
+        tst.splice(0, 0, tst)
+        self.assertEqual(len(tst), 14)
+        self.assertEqual(list(tst.inputs())[:7], list(tst.inputs())[7:])
+
+    def test_repeated_paste(self):
+        tst  = self.build_roll(5000, 512)
+        clip = tst.copy(0, 1000)
+
+        # the same nodes get pasted in over and over, which mustn't stack
+        # them into a list
+        for ignored in range(2000):
+            tst.insert(len(tst) // 2, clip)
+
+        self.assertEqual(len(tst), 2005000)
+        self.assertLess(self.depth(tst), 30)
+        self.assertEqual(tst.input(len(tst) - 1), "|4999|")
+
+    def test_self_doubling(self):
+        tst = self.build_roll(5000, 512)
+
+        for ignored in range(12):
+            tst.insert(len(tst), tst)
+
+        self.assertEqual(len(tst), 5000 * 4096)
+        self.assertLess(self.depth(tst), 30)
+        self.assertEqual(tst.input(5000 * 4095 + 1), "|1|")
+
+    def test_against_list(self):
+        rng = random.Random(2600)
+        tst = self.build_roll(50, 3)
+        chk = [f"|{i}|" for i in range(50)]
+
+        for step in range(300):
+            op    = rng.randrange(4)
+            start = rng.randint(0, len(chk))
+            stop  = rng.randint(start, len(chk))
+            new   = [f"|n{step}.{i}|" for i in range(rng.randint(0, 7))]
+
+            if (0 == op):
+                tst.insert(start, new)
+                chk[start:start] = new
+            elif (1 == op):
+                tst.delete(start, stop)
+                del chk[start:stop]
+            elif (2 == op):
+                tst.splice(start, stop, new)
+                chk[start:stop] = new
+            else:
+                tst.addFrames(new)
+                chk.extend(new)
+
+            self.assertEqual(len(tst), len(chk))
+
+            if (len(chk) > 0):
+                frame = rng.randrange(len(chk))
+                self.assertEqual(tst.input(frame), chk[frame])
+
+        self.assertEqual(list(tst.inputs()), chk)
+        self.assertEqual([e.input for e in tst.toRoll().frames], chk)
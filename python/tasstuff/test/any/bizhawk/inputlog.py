@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+import unittest
+
+import tasstuff.any.bizhawk.inputlog as inputlog
+
+class Test_Sink(unittest.TestCase):
+
+    def test_lazy(self):
+        # does nothing, just run it
+        with inputlog.Sink() as tst:
+            tst.write(["|..|"])
+            tst.flush()
+
+class Test_MemorySink(unittest.TestCase):
+
+    def test_write(self):
+        tst = inputlog.MemorySink()
+
+        tst.write(["a", "b"])
+        tst.write(["c"])
+        tst.close()
+
+        self.assertEqual(tst.frames, ["a", "b", "c"])
+
+class Test_StreamSink(unittest.TestCase):
+
+    def test_write(self):
+        stream = io.StringIO()
+        tst    = inputlog.StreamSink(stream, chunkSize=3)
+
+        # held back until there's a chunk's worth
+        tst.write(["a", "b"])
+        self.assertEqual(stream.getvalue(), "")
+
+        tst.write(["c", "d"])
+        self.assertEqual(stream.getvalue(), "a\nb\nc\nd\n")
+
+        tst.write(["e"])
+        tst.close()
+        self.assertEqual(stream.getvalue(), "a\nb\nc\nd\ne\n")
+        self.assertEqual(tst.written, 5)
+
+        # it isn't ours to close
+        self.assertFalse(stream.closed)
+
+    def test_newline(self):
+        stream = io.StringIO()
+
+        with inputlog.StreamSink(stream, newline="\r\n") as tst:
+            tst.write(["a", "b"])
+
+        self.assertEqual(stream.getvalue(), "a\r\nb\r\n")
+
+class Test_FileSink(unittest.TestCase):
+
+    def read_log(self, frames, **kwargs):
+        handle, path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+
+        try:
+            with inputlog.FileSink(path, **kwargs) as tst:
+                tst.write(frames)
+
+            with open(path, newline="") as log:
+                ret = log.read()
+        finally:
+            os.remove(path)
+
+        return ret
+
+    def test_write(self):
+        chk = self.read_log(["|a|", "|b|"])
+
+        self.assertEqual(chk, "[Input]\n|a|\n|b|\n[/Input]\n")
+
+    def test_logKey(self):
+        chk = self.read_log(["|a|"], logKey="#A|", chunkSize=1)
+
+        self.assertEqual(chk, "[Input]\nLogKey:#A|\n|a|\n[/Input]\n")
+
+    def test_close_twice(self):
+        handle, path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+
+        try:
+            tst = inputlog.FileSink(path)
+            tst.close()
+            tst.close()
+
+            with open(path) as log:
+                self.assertEqual(log.read(), "[Input]\n[/Input]\n")
+        finally:
+            os.remove(path)
+
+class Test_PagerSink(unittest.TestCase):
+
+    def test_write(self):
+        stream  = io.StringIO()
+        prompts = []
+        tst     = inputlog.PagerSink(2, stream, prompts.append)
+
+        tst.write(["a", "b", "c"])
+
+        self.assertEqual(stream.getvalue(), "\na\nb\n\n\nc\n\n")
+        self.assertEqual(len(prompts), 2)
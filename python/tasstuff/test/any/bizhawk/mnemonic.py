@@ -0,0 +1,181 @@
+# unit tests for mnemonic.py
+import random
+import unittest
+
+import tasstuff.any.bizhawk.controller as controller
+import tasstuff.any.bizhawk.mnemonic as mnemonic
+
+class Test_MnemonicFormat(unittest.TestCase):
+    FRAMES = [
+        "|..|    0,    0,..|............|",
+        "|rP|   -4,    8,lr|UDLRsSYBXAlr|",
+        "|.P|    0,    0,l.|UD.Rs.YB.Al.|",
+        "|..|   10,  -10,.r|.........A..|",
+    ]
+
+    def test_constructor(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        self.assertEqual(tst.width, len(self.FRAMES[0]))
+        self.assertEqual(tst.buttonColumns[:4], [1, 2, 16, 17])
+        self.assertEqual(tst.analogSlices[1], slice(10, 15))
+        self.assertIs(tst.buttons[2], pad.mL)
+        self.assertEqual(tst.analogs, [pad.mX, pad.mY])
+
+    def test_constructor_wide_button(self):
+        pad = controller.SnesConsole()
+        pad.power.onStr = "PWR"
+
+        with self.assertRaises(ValueError):
+            mnemonic.MnemonicFormat(pad)
+
+    def test_parse(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        self.assertEqual(tst.parse(self.FRAMES[0]), (0, (0, 0)))
+        self.assertEqual(tst.parse(self.FRAMES[1]), ((1 << 16) - 1, (-4, 8)))
+        self.assertEqual(tst.parse(self.FRAMES[3]), ((1 << 3) | (1 << 13),
+                                                     (10, -10)))
+
+        with self.assertRaises(ValueError):
+            tst.parse(self.FRAMES[0][:-1])
+
+    def test_parse_odd_characters(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        # anything but a dot is pressed, same as fromMnemonic
+        self.assertEqual(tst.parse("|0x|    0,    0,..|............|"),
+                         (3, (0, 0)))
+
+        # even the ones int() would skip over
+        odd = ["| .|    0,    0,..|............|",
+               "|._|    0,    0,..|............|"]
+
+        self.assertEqual(tst.parse(odd[0]), (1, (0, 0)))
+        self.assertEqual(tst.parse(odd[1]), (2, (0, 0)))
+        self.assertEqual(list(tst.parseMany(odd)[0]), [1, 2])
+        self.assertEqual(list(tst.parseMany(odd + self.FRAMES[:1])[0]),
+                         [1, 2, 0])
+
+    def test_parse_odd_matches_fromMnemonic(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        for frame in ["| .|    0,    0,..|............|",
+                      "|._|    0,    0,..|............|"]:
+            pad.fromMnemonic(frame)
+
+            self.assertEqual(tst.parse(frame), tst.pack())
+
+    def test_parse_matches_fromMnemonic(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        for frame in self.FRAMES:
+            pad.fromMnemonic(frame)
+
+            self.assertEqual(tst.parse(frame), tst.pack())
+
+    def test_parse_out_of_range(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+        far = "|..|  200, -300,..|............|"
+
+        # clamped to the mouse's range, same as fromMnemonic
+        self.assertEqual(tst.parse(far), (0, (10, -10)))
+
+        bits, axes = tst.parseMany([far, self.FRAMES[1]])
+        self.assertEqual([list(a) for a in axes], [[10, -4], [-10, 8]])
+
+        pad.fromMnemonic(far)
+        self.assertEqual(tst.parse(far), tst.pack())
+
+        tst.apply(0, (200, -300))
+        self.assertEqual((pad.mX.current, pad.mY.current), (10, -10))
+
+    def test_parseMany(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        bits, axes = tst.parseMany(self.FRAMES + ["|0.|    0,    0,..|............|"])
+
+        self.assertEqual(list(bits), [tst.parse(f)[0] for f in self.FRAMES] + [1])
+        self.assertEqual(list(axes[0]), [0, -4, 0, 10, 0])
+        self.assertEqual(list(axes[1]), [0, 8, 0, -10, 0])
+
+        with self.assertRaises(ValueError):
+            tst.parseMany(self.FRAMES + ["|"])
+
+    def test_load(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        for frame in self.FRAMES:
+            tst.load(frame)
+
+            self.assertEqual(str(pad), frame)
+
+    def test_buttonMask(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        self.assertEqual(tst.buttonMask(pad.power), 1 << 1)
+        self.assertEqual(tst.buttonMask(pad.r), 1 << 15)
+
+        with self.assertRaises(ValueError):
+            tst.buttonMask(controller.Button("stray", "s"))
+
+    def test_template(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        self.assertEqual(tst.template, "|{}|{:>5},{:>5},{}|{}{}|")
+
+    def test_analogTemplate(self):
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        chk = tst.analogTemplate(tst.buttonMask(pad.mL) | tst.buttonMask(pad.a))
+
+        self.assertEqual(chk, "|..|{:>5},{:>5},l.|.........A..|")
+        self.assertEqual(chk.format(-3, 4), "|..|   -3,    4,l.|.........A..|")
+
+    def test_serialize(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        for frame in self.FRAMES:
+            self.assertEqual(tst.serialize(*tst.parse(frame)), frame)
+
+    def test_serialize_matches_repr(self):
+        rng = random.Random(1701)
+        pad = controller.SnesPreset_MarioPaint()
+        tst = mnemonic.MnemonicFormat(pad)
+
+        for i in range(500): # pylint: disable=unused-variable
+            pad.release()
+
+            for button in tst.buttons:
+                if (rng.random() < 0.5):
+                    button.press()
+
+            # fractions get cut off the same way
+            pad.mX.press(rng.uniform(-10, 10))
+            pad.mY.press(rng.randint(-10, 10))
+
+            self.assertEqual(tst.serialize(*tst.pack()), str(pad))
+
+    def test_serialize_braces(self):
+        # literals with braces in them don't get mistaken for fields
+        pad = controller.SnesConsole()
+        pad.mnemonicLayout = lambda: ["{", pad.resetBttn, "}"]
+
+        tst = mnemonic.MnemonicFormat(pad)
+
+        self.assertEqual(tst.serialize(1, ()), "{r}")
+
+    def test_serializeMany(self):
+        tst = mnemonic.MnemonicFormat(controller.SnesPreset_MarioPaint())
+
+        bits, axes = tst.parseMany(self.FRAMES)
+
+        self.assertEqual(tst.serializeMany(bits, axes), self.FRAMES)
+        self.assertEqual(tst.serializeMany([], [[], []]), [])
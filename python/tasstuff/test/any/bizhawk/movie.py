@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+import tasstuff.any.bizhawk.history as history
+import tasstuff.any.bizhawk.movie as movie
+
+class Test_Bk2Writer(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".bk2")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def read_member(self, name):
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.read(name).decode("utf-8")
+
+    def test_write(self):
+        with movie.Bk2Writer(self.path, {"Platform" : "SNES"}, '{"o":{}}',
+                             "#A|", chunkSize=2) as tst:
+            tst.write(["|a|", "|b|", "|c|"])
+            tst.write(["|d|"])
+
+        self.assertEqual(self.read_member(movie.HEADER_NAME),
+                         "MovieVersion BizHawk v2.0.0\nPlatform SNES\n")
+        self.assertEqual(self.read_member(movie.SYNC_SETTINGS_NAME),
+                         '{"o":{}}')
+        self.assertEqual(self.read_member(movie.INPUT_LOG_NAME),
+                         "[Input]\nLogKey:#A|\n|a|\n|b|\n|c|\n|d|\n[/Input]\n")
+
+    def test_header_override(self):
+        with movie.Bk2Writer(self.path, {"MovieVersion" : "test"}):
+            pass
+
+        self.assertEqual(self.read_member(movie.HEADER_NAME),
+                         "MovieVersion test\n")
+        self.assertEqual(self.read_member(movie.INPUT_LOG_NAME),
+                         "[Input]\n[/Input]\n")
+
+    def test_writeBk2(self):
+        roll = history.PianoRoll()
+
+        for i in range(5):
+            roll.addFrame(f"|{i}|")
+
+        movie.writeBk2(self.path, roll)
+
+        self.assertEqual(self.read_member(movie.INPUT_LOG_NAME),
+                         "[Input]\n|0|\n|1|\n|2|\n|3|\n|4|\n[/Input]\n")
+
+class Test_InputLogReader(unittest.TestCase):
+
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+
+    def build_log(self, frames, logKey=None, newline="\n"):
+        handle, path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+        self.paths.append(path)
+
+        with open(path, "w", newline="") as log:
+            log.write("[Input]" + newline)
+            if (logKey is not None):
+                log.write("LogKey:" + logKey + newline)
+            for frame in frames:
+                log.write(frame + newline)
+            log.write("[/Input]" + newline)
+
+        return path
+
+    def build_bk2(self, frames, logKey=None):
+        handle, path = tempfile.mkstemp(suffix=".bk2")
+        os.close(handle)
+        self.paths.append(path)
+
+        with movie.Bk2Writer(path, logKey=logKey) as writer:
+            writer.write(frames)
+
+        return path
+
+    def test_lines(self):
+        frames = [f"|{i}|" for i in range(10)]
+
+        for path in [self.build_log(frames), self.build_bk2(frames),
+                     self.build_log(frames, newline="\r\n")]:
+            tst = movie.InputLogReader(path)
+
+            self.assertEqual(list(tst.lines()), frames)
+
+    def test_entries(self):
+        path = self.build_bk2(["|a|", "|b|"])
+        tst  = list(movie.InputLogReader(path))
+
+        self.assertEqual(tst[1].input, "|b|")
+        self.assertEqual(tst[1].frame, 1)
+
+    def test_logKey(self):
+        self.assertEqual(
+            movie.InputLogReader(self.build_bk2(["|a|"], "#A|")).logKey(),
+            "#A|")
+        self.assertIs(
+            movie.InputLogReader(self.build_log(["|a|"])).logKey(), None)
+
+    def test_frame(self):
+        frames = [f"|{i}|" for i in range(1000)]
+
+        for path in [self.build_log(frames, "#A|"), self.build_bk2(frames),
+                     self.build_log(frames, newline="\r\n")]:
+            with movie.InputLogReader(path) as tst:
+                self.assertEqual(len(tst), 1000)
+                self.assertEqual(tst.frame(0), "|0|")
+                self.assertEqual(tst.frame(737), "|737|")
+                self.assertEqual(tst.frame(999), "|999|")
+                self.assertEqual(tst.entry(12).frame, 12)
+
+                with self.assertRaises(IndexError):
+                    tst.frame(1000)
+
+    def test_empty(self):
+        handle, path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+        self.paths.append(path)
+
+        with movie.InputLogReader(path) as tst:
+            self.assertEqual(len(tst), 0)
+            self.assertEqual(list(tst.lines()), [])
+
+    def test_readRoll(self):
+        roll = movie.readRoll(self.build_bk2(["|a|", "|b|", "|c|"]))
+
+        self.assertEqual(len(roll.frames), 3)
+        self.assertEqual(roll.currentFrame, 3)
+        self.assertEqual(roll.frames[2].input, "|c|")
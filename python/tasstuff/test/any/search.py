@@ -1,8 +1,51 @@
 # unit tests for search.py
+import heapq
+import random
 import unittest
 
 import tasstuff.any.search as search
 
+class test_heuristics(unittest.TestCase):
+
+    def build_nodes(self, ax, ay, bx, by):
+        a = search.Node2D()
+        b = search.Node2D()
+
+        a.x = ax
+        a.y = ay
+        b.x = bx
+        b.y = by
+
+        return a, b
+
+    def test_manhattanDistance(self):
+        a, b = self.build_nodes(1, 2, 4, -2)
+        self.assertEqual(search.manhattanDistance(a, b), 7)
+
+    def test_chebyshevDistance(self):
+        a, b = self.build_nodes(1, 2, 4, -2)
+        self.assertEqual(search.chebyshevDistance(a, b), 4)
+
+    def test_octileDistance(self):
+        a, b = self.build_nodes(1, 2, 4, -2)
+        self.assertAlmostEqual(search.octileDistance(a, b), 1 + (3 * 2 ** 0.5))
+
+    def test_noHeuristic(self):
+        a, b = self.build_nodes(1, 2, 4, -2)
+        self.assertEqual(search.noHeuristic(a, b), 0)
+
+class test_flagBit(unittest.TestCase):
+
+    def test_flagBit(self):
+        a = search.flagBit("___bit_a")
+        b = search.flagBit("___bit_b")
+
+        # stable, single bit, distinct
+        self.assertEqual(a, search.flagBit("___bit_a"))
+        self.assertEqual(bin(a).count("1"), 1)
+        self.assertEqual(bin(b).count("1"), 1)
+        self.assertNotEqual(a, b)
+
 class test_Node(unittest.TestCase):
 
     def test_constructor_default(self):
@@ -95,6 +138,26 @@ class test_Node(unittest.TestCase):
         tst.resetFlags()
         self.assertFalse(tst.hasFlag("test"))
 
+    def test_flags(self):
+        tst = search.Node()
+
+        tst.addFlag("test")
+        tst.addFlag("other test")
+        self.assertEqual(sorted(tst.flags), ["other test", "test"])
+
+        # assigning a list replaces whatever was there
+        tst.flags = ["third test"]
+        self.assertEqual(tst.flags, ["third test"])
+        self.assertFalse(tst.hasFlag("test"))
+        self.assertTrue(tst.hasFlag("third test"))
+
+    def test_removeFlag_unknown(self):
+        tst = search.Node()
+
+        # never seen anywhere, so it shouldn't be an error
+        tst.removeFlag("___never_interned")
+        self.assertFalse(tst.hasFlag("___never_interned"))
+
 
     def test_removeNeighbor(self):
         tst_a = search.Node()
@@ -118,6 +181,194 @@ class test_Node(unittest.TestCase):
         self.assertFalse(tst_c.hasNeighbor(tst_d))
         self.assertTrue(tst_d.hasNeighbor(tst_c))
 
+    def test_removeNeighbor_duplicates(self):
+        tst = search.Node()
+        nbr = search.Node()
+
+        tst.addNeighbor(nbr, 1.0, False)
+        tst.addNeighbor(nbr, 2.0, False)
+
+        # latest one wins, then the older one takes over
+        self.assertEqual(tst.getConnectingEdge(nbr).cost, 2.0)
+        tst.removeNeighbor(nbr, False)
+        self.assertTrue(tst.hasNeighbor(nbr))
+        self.assertEqual(tst.getConnectingEdge(nbr).cost, 1.0)
+        tst.removeNeighbor(nbr, False)
+        self.assertFalse(tst.hasNeighbor(nbr))
+        self.assertEqual(len(tst.edges), 0)
+
+    def test_isolate(self):
+        tst = search.Node()
+        two = search.Node()
+        out = search.Node()
+        inc = search.Node()
+
+        tst.addNeighbor(two)
+        tst.addNeighbor(out, 1.0, False)
+        inc.addNeighbor(tst, 1.0, False)
+        out.addNeighbor(inc)
+
+        tst.isolate()
+
+        self.assertEqual(len(tst.edges), 0)
+        self.assertFalse(tst.hasNeighbor(two))
+        self.assertFalse(tst.hasNeighbor(out))
+        self.assertFalse(two.hasNeighbor(tst))
+        self.assertFalse(inc.hasNeighbor(tst))
+
+        # and it keeps its hands off everyone else's edges
+        self.assertTrue(out.hasNeighbor(inc))
+        self.assertTrue(inc.hasNeighbor(out))
+
+    def test_isolate_one_way_after_remove(self):
+        tst = search.Node()
+        nbr = search.Node()
+
+        # both ways, then only nbr's way
+        tst.addNeighbor(nbr)
+        tst.removeNeighbor(nbr, False)
+
+        self.assertTrue(nbr.hasNeighbor(tst))
+
+        tst.isolate()
+
+        self.assertFalse(nbr.hasNeighbor(tst))
+
+    def test_isolate_one_way_made_two_way(self):
+        tst = search.Node()
+        nbr = search.Node()
+
+        nbr.addNeighbor(tst, 1.0, False)
+        tst.addNeighbor(nbr, 1.0, False)
+
+        tst.isolate()
+
+        self.assertFalse(nbr.hasNeighbor(tst))
+        self.assertFalse(tst.hasNeighbor(nbr))
+
+    def test_isolate_after_duplicate_mirror(self):
+        tst = search.Node()
+        nbr = search.Node()
+
+        # nbr leads here twice, and the mirrored remove only takes one
+        nbr.addNeighbor(tst)
+        nbr.addNeighbor(tst, 1.0, False)
+        tst.removeNeighbor(nbr)
+
+        self.assertTrue(nbr.hasNeighbor(tst))
+
+        tst.isolate()
+
+        self.assertFalse(nbr.hasNeighbor(tst))
+        self.assertEqual(len(nbr.edges), 0)
+
+    def test_isolate_leaves_nothing_behind(self):
+        graph = search.Graph2D(3, 3, True, True)
+        tst   = graph.grid[1][1]
+
+        tst.isolate()
+
+        # nothing's left remembering edges that aren't there
+        for node in graph.contents:
+            self.assertIsNone(node._strays)
+            self.assertFalse(node.hasNeighbor(tst))
+
+class test_internCost(unittest.TestCase):
+
+    def test_internCost(self):
+        a = search.internCost(6.0 / 4.0)
+        b = search.internCost(3 / 2)
+
+        self.assertEqual(a, 1.5)
+        self.assertIs(a, b)
+        self.assertIsInstance(search.internCost(2), float)
+
+class test_SearchStats(unittest.TestCase):
+
+    def test_sample(self):
+        tst = search.SearchStats(3)
+
+        chk = [tst.sample() for i in range(7)] # pylint: disable=unused-variable
+        self.assertEqual(chk, [True, False, False, True, False, False, True])
+        self.assertEqual(tst.seen, 7)
+
+    def test_record(self):
+        seen = []
+        tst  = search.SearchStats(callback=seen.append, keep=True)
+
+        quick = search.SearchQuery("a", 4, 6, 3, 0.5, 2.0)
+        slow  = search.SearchQuery("b", 10, 20, 7, 1.5, None)
+
+        tst.record(quick)
+        tst.record(slow)
+
+        self.assertEqual(tst.queries, 2)
+        self.assertEqual(tst.found, 1)
+        self.assertEqual(tst.expanded, 14)
+        self.assertEqual(tst.relaxed, 26)
+        self.assertEqual(tst.peakFrontier, 7)
+        self.assertEqual(tst.seconds, 2.0)
+        self.assertIs(tst.slowest, slow)
+        self.assertEqual(tst.history, [quick, slow])
+        self.assertEqual(seen, [quick, slow])
+        self.assertIn("7.0 expanded", tst.summary())
+
+        tst.reset()
+        self.assertEqual(tst.queries, 0)
+        self.assertEqual(tst.history, [])
+
+class test_slots(unittest.TestCase):
+
+    def test_no_dict(self):
+        l = search.Node2D()
+        r = search.Node2D()
+
+        for tst in (l, search.Edge(l, r)):
+            self.assertFalse(hasattr(tst, "__dict__"))
+
+            with self.assertRaises(AttributeError):
+                tst.stray = 1
+
+    def test_subclass(self):
+        # subclasses that don't declare slots work like they always have
+        class Tagged(search.Node2D):
+            def __init__(self):
+                super().__init__()
+                self.screen = "UNSET"
+
+        tst = Tagged()
+        tst.addNeighbor(Tagged(), 2)
+
+        self.assertEqual(tst.screen, "UNSET")
+        self.assertEqual(tst.edges[0].cost, 2.0)
+
+    def test_shared_costs(self):
+        tst = search.Graph2D(4, 4, True, True)
+        tst.contents[0].addNeighbor(tst.contents[5], 2 ** 0.5)
+        tst.contents[1].addNeighbor(tst.contents[6], 2 ** 0.5)
+
+        costs = [e.cost for n in tst.contents for e in n.edges]
+
+        self.assertEqual(len(set(map(id, costs))), 2)
+
+    def test_lazy_neighbor_index(self):
+        tst = search.Graph2D(3, 3, True, True)
+        mid = tst.grid[1][1]
+
+        # building the graph doesn't index anyone's neighbors
+        self.assertTrue(all(n._neighbors is None for n in tst.contents))
+
+        mid.addNeighbor(tst.grid[0][0], 5.0, False)
+
+        # built when first looked up, with the latest edge winning
+        self.assertEqual(mid.getConnectingEdge(tst.grid[0][0]).cost, 5.0)
+        self.assertTrue(mid.hasNeighbor(tst.grid[2][2]))
+        self.assertEqual(len(mid._neighbors), 8)
+
+        # and kept up after that
+        mid.removeNeighbor(tst.grid[0][0], False)
+        self.assertEqual(mid.getConnectingEdge(tst.grid[0][0]).cost, 1.0)
+
 class test_Edge(unittest.TestCase):
 
     def test_constructor_default(self):
@@ -303,6 +554,196 @@ class test_Graph(unittest.TestCase):
         chk = tst.findClosestFlaggedTo("___impossible", nodeA)
         self.assertIs(None, chk)
 
+    def test_findClosestFlaggedTo_start(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeB = tst.contents[1]
+
+        # the start counts if it's flagged
+        nodeA.addFlag("___test")
+        nodeB.addFlag("___test")
+        chk = tst.findClosestFlaggedTo("___test", nodeA)
+        self.assertIs(nodeA, chk)
+
+    def test_findClosestFlaggedTo_costs(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeD = tst.contents[3]
+        nodeE = tst.contents[4]
+
+        # D is reached through B and E, never through the expensive B-D link
+        nodeD.addFlag("___test")
+        chk = tst.findClosestFlaggedTo("___test", nodeA)
+        self.assertIs(nodeD, chk)
+        self.assertEqual(nodeD.cost, 5)
+        self.assertEqual(nodeE.cost, 4)
+
+    def test_findClosestFlaggedTo_repeated(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeD = tst.contents[3]
+        nodeF = tst.contents[5]
+
+        # searches have to clean up after themselves
+        nodeD.addFlag("___test")
+        nodeF.addFlag("___test")
+        self.assertIs(nodeF, tst.findClosestFlaggedTo("___test", nodeA))
+        nodeF.removeFlag("___test")
+        self.assertIs(nodeD, tst.findClosestFlaggedTo("___test", nodeA))
+
+    def test_findClosestFlaggedTo_stats(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeD = tst.contents[3]
+
+        nodeD.addFlag("___test")
+        tst.searchStats = search.SearchStats()
+
+        # same answer measured as not
+        chk = tst.findClosestFlaggedTo("___test", nodeA)
+        self.assertIs(nodeD, chk)
+        self.assertEqual(nodeD.cost, 5)
+
+        stats = tst.searchStats
+        self.assertEqual(stats.queries, 1)
+        self.assertEqual(stats.found, 1)
+        self.assertEqual(stats.slowest.cost, 5)
+        self.assertEqual(stats.slowest.kind, "findClosestFlaggedTo")
+        self.assertGreaterEqual(stats.expanded, 2)
+        self.assertGreaterEqual(stats.relaxed, stats.expanded - 1)
+        self.assertGreater(stats.peakFrontier, 0)
+
+        self.assertIs(tst.findClosestFlaggedTo("___impossible", nodeA), None)
+        self.assertEqual(stats.queries, 2)
+        self.assertEqual(stats.found, 1)
+
+        # only every other one measured
+        tst.searchStats = search.SearchStats(2)
+        tst.findClosestFlaggedTo("___test", nodeA)
+        self.assertIs(nodeD, tst.findClosestFlaggedTo("___test", nodeA))
+        self.assertEqual(tst.searchStats.seen, 2)
+        self.assertEqual(tst.searchStats.queries, 1)
+
+    def test_resetSearch(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeB = tst.contents[1]
+        gen   = tst.searchGeneration
+
+        # a new generation, and the nodes are left alone, but what's on them
+        # doesn't count any more
+        nodeB.cost = 42
+        tst.resetSearch()
+        self.assertEqual(tst.searchGeneration, gen + 1)
+        self.assertEqual(nodeB.cost, 42)
+        self.assertEqual(tst.costOf(nodeB), float("inf"))
+        self.assertFalse(tst.wasChecked(nodeB))
+
+        # left over costs don't leak into the next search
+        nodeA.cost = 0
+        nodeB.addFlag("___test")
+        self.assertIs(nodeB, tst.findClosestFlaggedTo("___test", nodeA))
+        self.assertEqual(nodeB.cost, 1)
+        self.assertEqual(tst.costOf(nodeB), 1)
+        self.assertEqual(tst.costOf(nodeA), 0)
+        self.assertTrue(tst.wasChecked(nodeA))
+
+        # and one that was reached before but not this time reads as unreached
+        tst.findClosestFlaggedTo("___test", nodeB)
+        self.assertEqual(tst.costOf(nodeB), 0)
+        self.assertEqual(tst.costOf(nodeA), float("inf"))
+        self.assertFalse(tst.wasChecked(nodeA))
+
+    def test_clearFlag(self):
+        tst = self.build_common_graph()
+
+        for node in tst.contents:
+            node.addFlag("___test")
+            node.addFlag("___other")
+
+        tst.clearFlag("___test")
+
+        for node in tst.contents:
+            self.assertFalse(node.hasFlag("___test"))
+            self.assertTrue(node.hasFlag("___other"))
+
+    def test_findPath(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeB = tst.contents[1]
+        nodeD = tst.contents[3]
+        nodeE = tst.contents[4]
+
+        chk = tst.findPath(nodeA, nodeD)
+        self.assertEqual(chk.cost, 5)
+        self.assertEqual(chk.nodes, [nodeA, nodeB, nodeE, nodeD])
+        self.assertFalse(chk.failed)
+
+        # to itself
+        chk = tst.findPath(nodeA, nodeA)
+        self.assertEqual(chk.cost, 0)
+        self.assertEqual(chk.nodes, [nodeA])
+
+    def test_findPath_impossible(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeD = tst.contents[3]
+
+        tst.isolateNode(nodeD)
+        self.assertIs(tst.findPath(nodeA, nodeD), None)
+
+        stray = search.Node()
+        self.assertIs(tst.findPath(nodeA, stray), None)
+
+    def test_isolateNode(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeB = tst.contents[1]
+        nodeC = tst.contents[2]
+        nodeE = tst.contents[4]
+
+        tst.isolateNode(nodeB)
+
+        self.assertEqual(len(nodeB.edges), 0)
+        self.assertFalse(nodeA.hasNeighbor(nodeB))
+        self.assertFalse(nodeC.hasNeighbor(nodeB))
+        self.assertFalse(nodeE.hasNeighbor(nodeB))
+        self.assertTrue(nodeA.hasNeighbor(nodeC))
+        self.assertIn(nodeB, tst.contents)
+
+    def test_removeNode(self):
+        tst = self.build_common_graph()
+
+        nodeA = tst.contents[0]
+        nodeB = tst.contents[1]
+        nodeD = tst.contents[3]
+
+        tst.removeNode(nodeB)
+
+        self.assertNotIn(nodeB, tst.contents)
+        self.assertFalse(nodeA.hasNeighbor(nodeB))
+
+        # D is now only reachable the long way around
+        nodeD.addFlag("___test")
+        self.assertIs(nodeD, tst.findClosestFlaggedTo("___test", nodeA))
+        self.assertEqual(nodeD.cost, 6)
+
+    def test_findClosestFlaggedTo_outside(self):
+        tst = self.build_common_graph()
+
+        stray = search.Node()
+        stray.addFlag("___test")
+
+        self.assertIs(None, tst.findClosestFlaggedTo("___test", stray))
+
 
 class test_Node2D(unittest.TestCase):
 
@@ -370,6 +811,46 @@ class testGraph2D(unittest.TestCase):
         self.assertTrue(tst.grid[1][1].hasNeighbor(tst.grid[2][0]))
         self.assertTrue(tst.grid[1][1].hasNeighbor(tst.grid[2][2]))
 
+    def test_findClosestFlaggedTo(self):
+        tst = search.Graph2D(20, 10)
+
+        tst.grid[19][9].addFlag("___test")
+        tst.grid[3][7].addFlag("___test")
+        tst.grid[12][0].addFlag("___test")
+
+        chk = tst.findClosestFlaggedTo("___test", tst.grid[10][5])
+        self.assertIs(tst.grid[12][0], chk)
+        self.assertEqual(chk.cost, 7)
+
+    def test_findPath(self):
+        tst = search.Graph2D(10, 8)
+
+        # a wall with a single gap at the bottom
+        for y in range(7):
+            tst.removeNode(tst.grid[5][y])
+
+        chk = tst.findPath(tst.grid[2][1], tst.grid[8][1])
+        self.assertEqual(chk.cost, 18)
+        self.assertEqual(len(chk.nodes), 19)
+        self.assertIs(chk.start, tst.grid[2][1])
+        self.assertIs(chk.end, tst.grid[8][1])
+        self.assertIn(tst.grid[5][7], chk.nodes)
+
+    def test_findPath_diagonals(self):
+        tst = search.Graph2D(10, 8, True, True)
+
+        chk = tst.findPath(tst.grid[0][0], tst.grid[7][3])
+        self.assertEqual(chk.cost, 7)
+
+    def test_findPath_heuristics(self):
+        tst = search.Graph2D(10, 8)
+
+        # every admissible heuristic should agree on the cost
+        for heuristic in [search.noHeuristic, search.manhattanDistance,
+                          search.chebyshevDistance, search.octileDistance]:
+            chk = tst.findPath(tst.grid[9][0], tst.grid[1][6], heuristic)
+            self.assertEqual(chk.cost, 14)
+
     def test_constructor_sizes(self):
         tst=search.Graph2D(1,2)
 
@@ -388,4 +869,506 @@ class testGraph2D(unittest.TestCase):
         self.assertEquals(1, tst.grid[1][0].x)
         self.assertEquals(0, tst.grid[1][0].y)
         self.assertEquals(1, tst.grid[1][1].x)
-        self.assertEquals(1, tst.grid[1][1].y)
\ No newline at end of file
+        self.assertEquals(1, tst.grid[1][1].y)
+
+class testGridGraph2D(unittest.TestCase):
+
+    def test_constructor_default(self):
+        tst = search.GridGraph2D(4, 3)
+
+        self.assertEqual(tst.width,  4)
+        self.assertEqual(tst.height, 3)
+        self.assertEqual(tst.size,  12)
+        self.assertEqual(len(tst.costs), 12)
+        self.assertEqual(len(tst.walkable), 12)
+        self.assertEqual(tst.flags, {})
+        self.assertEqual(len(tst.steps), 4)
+
+    def test_constructor_diagonals(self):
+        tst = search.GridGraph2D(4, 3, True, True)
+
+        self.assertEqual(len(tst.steps), 8)
+
+    def test_positions(self):
+        tst = search.GridGraph2D(4, 3)
+
+        self.assertEqual(tst.nodeAt(0, 0), 0)
+        self.assertEqual(tst.nodeAt(3, 0), 3)
+        self.assertEqual(tst.nodeAt(1, 2), 9)
+        self.assertEqual(tst.positionOf(9), (1, 2))
+        self.assertEqual(tst.positionOf(11), (3, 2))
+
+    def test_grid(self):
+        tst = search.GridGraph2D(4, 3)
+        chk = search.Graph2D(4, 3)
+
+        # laid out the same as Graph2D's
+        self.assertEqual(len(tst.grid), len(chk.grid))
+        self.assertEqual(len(tst.grid[0]), len(chk.grid[0]))
+        self.assertEqual(tst.grid[1][2], tst.nodeAt(1, 2))
+        self.assertEqual(tst.grid[3][0], 3)
+        self.assertEqual(list(tst.contents), list(range(12)))
+
+        with self.assertRaises(IndexError):
+            tst.grid[1][3]
+
+    def test_neighbors(self):
+        tst = search.GridGraph2D(3, 3)
+
+        # corners shouldn't wrap around
+        chk = sorted(n for n, c in tst.neighbors(tst.nodeAt(0, 0)))
+        self.assertEqual(chk, [tst.nodeAt(1, 0), tst.nodeAt(0, 1)])
+
+        chk = sorted(n for n, c in tst.neighbors(tst.nodeAt(2, 1)))
+        self.assertEqual(chk, [tst.nodeAt(2, 0), tst.nodeAt(1, 1),
+                               tst.nodeAt(2, 2)])
+
+        # costs come from the node being stepped into
+        tst.setCost(tst.nodeAt(1, 1), 3)
+        self.assertIn((tst.nodeAt(1, 1), 3.0), tst.neighbors(tst.nodeAt(2, 1)))
+
+        # and unwalkable nodes are skipped
+        tst.setWalkable(tst.nodeAt(1, 1), False)
+        chk = sorted(n for n, c in tst.neighbors(tst.nodeAt(2, 1)))
+        self.assertEqual(chk, [tst.nodeAt(2, 0), tst.nodeAt(2, 2)])
+
+    def test_neighbors_diagonals(self):
+        tst = search.GridGraph2D(3, 3, False, True)
+
+        chk = sorted(n for n, c in tst.neighbors(tst.nodeAt(1, 1)))
+        self.assertEqual(chk, [0, 2, 6, 8])
+
+    def test_flags(self):
+        tst = search.GridGraph2D(3, 3)
+
+        self.assertFalse(tst.hasFlag(4, "test"))
+        tst.addFlag(4, "test")
+        self.assertTrue(tst.hasFlag(4, "test"))
+        self.assertFalse(tst.hasFlag(5, "test"))
+        tst.removeFlag(4, "test")
+        self.assertFalse(tst.hasFlag(4, "test"))
+
+        tst.addFlag(4, "test")
+        tst.resetFlags()
+        self.assertFalse(tst.hasFlag(4, "test"))
+
+    def test_clearFlag(self):
+        tst = search.GridGraph2D(3, 3)
+
+        tst.addFlag(2, "test")
+        tst.addFlag(7, "test")
+        tst.addFlag(7, "other")
+        tst.clearFlag("test")
+        tst.clearFlag("never set")
+
+        self.assertFalse(tst.hasFlag(2, "test"))
+        self.assertFalse(tst.hasFlag(7, "test"))
+        self.assertTrue(tst.hasFlag(7, "other"))
+
+    def test_findClosestFlaggedTo(self):
+        tst = search.GridGraph2D(20, 10)
+
+        tst.addFlag(tst.nodeAt(19, 9), "___test")
+        tst.addFlag(tst.nodeAt(3, 7), "___test")
+        tst.addFlag(tst.nodeAt(12, 0), "___test")
+
+        chk = tst.findClosestFlaggedTo("___test", tst.nodeAt(10, 5))
+        self.assertEqual(chk, tst.nodeAt(12, 0))
+
+        # start counts if it's flagged
+        chk = tst.findClosestFlaggedTo("___test", tst.nodeAt(3, 7))
+        self.assertEqual(chk, tst.nodeAt(3, 7))
+
+        # deliberately impossible
+        chk = tst.findClosestFlaggedTo("___impossible", tst.nodeAt(10, 5))
+        self.assertIs(chk, None)
+
+    def test_findClosestFlaggedTo_walls(self):
+        tst = search.GridGraph2D(5, 5)
+
+        # wall off column 2 except at the bottom
+        for y in range(4):
+            tst.setWalkable(tst.nodeAt(2, y), False)
+
+        tst.addFlag(tst.nodeAt(3, 0), "___test")
+        tst.addFlag(tst.nodeAt(0, 4), "___test")
+
+        chk = tst.findClosestFlaggedTo("___test", tst.nodeAt(1, 0))
+        self.assertEqual(chk, tst.nodeAt(0, 4))
+
+        # seal it off entirely
+        tst.setWalkable(tst.nodeAt(2, 4), False)
+        tst.removeFlag(tst.nodeAt(0, 4), "___test")
+
+        chk = tst.findClosestFlaggedTo("___test", tst.nodeAt(1, 0))
+        self.assertIs(chk, None)
+
+    def test_findClosestFlaggedTo_costs(self):
+        tst = search.GridGraph2D(5, 1)
+
+        tst.addFlag(tst.nodeAt(0, 0), "___test")
+        tst.addFlag(tst.nodeAt(4, 0), "___test")
+
+        # left is closer until it's made expensive
+        self.assertEqual(tst.findClosestFlaggedTo("___test", 1), 0)
+        tst.setCost(0, 5)
+        self.assertEqual(tst.findClosestFlaggedTo("___test", 1), 4)
+
+class testDistanceField(unittest.TestCase):
+
+    def dijkstra(self, graph, start):
+        # plain costs to everywhere, to check against
+        ret      = {start : 0.0}
+        toSearch = [(0.0, start)]
+
+        while (len(toSearch) > 0):
+            cost, node = heapq.heappop(toSearch)
+
+            if (cost > ret[node]):
+                continue
+
+            for nxt, step in graph.neighbors(node):
+                if (cost + step < ret.get(nxt, float("inf"))):
+                    ret[nxt] = cost + step
+                    heapq.heappush(toSearch, (cost + step, nxt))
+
+        return ret
+
+    def closest(self, graph, start):
+        # cost to the closest flagged node, or None
+        costs = self.dijkstra(graph, start)
+        found = [c for n, c in costs.items() if graph.hasFlag(n, "___test")]
+
+        return min(found) if (len(found) > 0) else None
+
+    def test_empty(self):
+        tst = search.GridGraph2D(4, 4).distanceField("___test")
+
+        self.assertIs(tst.nearest(5), None)
+        self.assertEqual(tst.distance(5), float("inf"))
+
+    def test_nearest(self):
+        graph = search.GridGraph2D(5, 5)
+        graph.addFlag(graph.nodeAt(4, 4), "___test")
+        graph.addFlag(graph.nodeAt(1, 0), "___test")
+
+        tst = graph.distanceField("___test")
+
+        self.assertEqual(tst.nearest(graph.nodeAt(0, 2)), graph.nodeAt(1, 0))
+        self.assertEqual(tst.distance(graph.nodeAt(0, 2)), 3.0)
+        self.assertEqual(tst.nearest(graph.nodeAt(1, 0)), graph.nodeAt(1, 0))
+
+        tst.removeTarget(graph.nodeAt(1, 0))
+
+        self.assertFalse(graph.hasFlag(graph.nodeAt(1, 0), "___test"))
+        self.assertEqual(tst.nearest(graph.nodeAt(0, 2)), graph.nodeAt(4, 4))
+        self.assertEqual(tst.distance(graph.nodeAt(0, 2)), 6.0)
+
+        tst.addTarget(graph.nodeAt(0, 3))
+        self.assertEqual(tst.nearest(graph.nodeAt(0, 2)), graph.nodeAt(0, 3))
+
+    def test_nodeChanged(self):
+        graph = search.GridGraph2D(5, 1)
+        graph.addFlag(0, "___test")
+        graph.addFlag(4, "___test")
+
+        tst = graph.distanceField("___test")
+        self.assertEqual(tst.nearest(1), 0)
+
+        graph.setCost(0, 5)
+        tst.nodeChanged(0)
+        self.assertEqual(tst.nearest(1), 4)
+
+        graph.setWalkable(3, False)
+        tst.nodeChanged(3)
+        self.assertEqual(tst.nearest(1), 0)
+        self.assertEqual(tst.distance(1), 5.0)
+
+        # and cheaper than anything so far
+        graph.setCost(2, 0.5)
+        tst.nodeChanged(2)
+        graph.setWalkable(3, True)
+        tst.nodeChanged(3)
+        self.assertEqual(tst.distance(1), 2.5)
+
+    def test_zero_cost(self):
+        graph = search.GridGraph2D(5, 1)
+        graph.addFlag(4, "___test")
+        graph.setCost(3, 0)
+        graph.setCost(4, 0)
+
+        tst = graph.distanceField("___test")
+
+        # nothing downhill from 2, it's flat all the way
+        self.assertEqual(tst.distance(2), 0.0)
+        self.assertEqual(tst.nearest(2), 4)
+
+        # and nothing left holding itself up once the target's gone
+        tst.removeTarget(4)
+        self.assertEqual(tst.distance(2), float("inf"))
+        self.assertIs(tst.nearest(2), None)
+
+        tst.addTarget(0)
+        self.assertEqual(tst.distance(3), 3.0)
+        self.assertEqual(tst.nearest(3), 0)
+
+    def test_stats(self):
+        graph = search.GridGraph2D(40, 40, True, True)
+        graph.addFlag(graph.nodeAt(2, 2), "___test")
+        graph.addFlag(graph.nodeAt(30, 30), "___test")
+
+        tst = graph.distanceField("___test")
+        tst.nearest(graph.nodeAt(3, 3))
+
+        first = tst.expanded
+        self.assertGreater(first, 0)
+
+        # asking again from the same place has nothing left to do
+        tst.nearest(graph.nodeAt(3, 3))
+        self.assertEqual(tst.expanded, 0)
+        self.assertEqual(tst.queries, 2)
+        self.assertEqual(tst.totalExpanded, first)
+
+    def test_open_grid(self):
+        # ties go to whatever's closest to the start, so an open grid only
+        # needs the nodes along one path
+        for diagonal in (True, False):
+            graph = search.GridGraph2D(40, 40, True, diagonal)
+            graph.addFlag(graph.nodeAt(30, 30), "___test")
+            graph.addFlag(graph.nodeAt(39, 0), "___test")
+
+            tst  = graph.distanceField("___test")
+            cost = tst.distance(graph.nodeAt(10, 12))
+
+            self.assertEqual(cost, 20.0 if (diagonal) else 38.0)
+            self.assertLessEqual(tst.expanded, cost + 1)
+
+    def test_pending(self):
+        rng   = random.Random(42)
+        graph = search.GridGraph2D(64, 48, True, True)
+
+        for node in rng.sample(range(graph.size), 60):
+            graph.addFlag(node, "___test")
+
+        tst   = graph.distanceField("___test")
+        start = graph.nodeAt(0, 0)
+
+        # eat every target, closest first, like plotting a mask does
+        while (True):
+            best = self.closest(graph, start)
+            chk  = tst.nearest(start)
+
+            if (chk is None):
+                break
+
+            self.assertEqual(tst.distance(start), best)
+
+            tst.removeTarget(chk)
+            start = chk
+
+            # nothing's queued between queries, and everything waiting is
+            # waiting once, in the bucket it's in
+            self.assertIs(tst._queue, None)
+
+            waiting = [n for bucket in tst._pending for n in bucket]
+            self.assertEqual(sorted(waiting),
+                             [n for n in range(graph.size)
+                              if (tst.dist[n] != tst.rhs[n])])
+
+            for node in waiting:
+                self.assertIn(node, tst._pending[tst._bucketOf[node]])
+
+    def test_against_dijkstra(self):
+        rng = random.Random(1701)
+
+        for trial in range(20): # pylint: disable=unused-variable
+            width  = rng.randint(3, 16)
+            height = rng.randint(3, 16)
+            graph  = search.GridGraph2D(width, height, True, rng.random() < 0.5)
+
+            for node in range(graph.size):
+                if (rng.random() < 0.2):
+                    graph.setWalkable(node, False)
+                if (rng.random() < 0.3):
+                    graph.setCost(node, rng.choice([1, 2, 3.5]))
+
+            for node in rng.sample(range(graph.size), rng.randint(1, 12)):
+                graph.addFlag(node, "___test")
+
+            tst   = graph.distanceField("___test")
+            start = rng.randrange(graph.size)
+
+            # keep eating the closest target, sometimes wandering off
+            while (True):
+                best = self.closest(graph, start)
+                chk  = tst.nearest(start)
+
+                if (best is None):
+                    self.assertIs(chk, None)
+                    break
+
+                self.assertEqual(self.dijkstra(graph, start)[chk], best)
+                self.assertEqual(tst.distance(start), best)
+
+                tst.removeTarget(chk)
+
+                if (rng.random() < 0.1):
+                    node = rng.randrange(graph.size)
+                    graph.setWalkable(node, not graph.walkable[node])
+                    tst.nodeChanged(node)
+
+                if (rng.random() < 0.1):
+                    tst.addTarget(rng.randrange(graph.size))
+
+                start = chk if (rng.random() < 0.7) else rng.randrange(graph.size)
+
+class testDistanceTransform(unittest.TestCase):
+
+    def dijkstra(self, width, height, blocked, seeds, connectivity):
+        # plain costs from the seeds to everywhere, to check against
+        steps = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0)]
+        corner = {search.CONNECT_DIAGONAL  : 2 ** 0.5,
+                  search.CONNECT_CHEBYSHEV : 1.0}.get(connectivity)
+
+        if (corner is not None):
+            steps.extend([(-1, -1, corner), (1, -1, corner),
+                          (-1, 1, corner), (1, 1, corner)])
+
+        ret      = {seed : 0.0 for seed in seeds}
+        toSearch = [(0.0, seed) for seed in seeds]
+
+        while (len(toSearch) > 0):
+            cost, (x, y) = heapq.heappop(toSearch)
+
+            if (cost > ret[(x, y)]):
+                continue
+
+            for dx, dy, step in steps:
+                nxt = (x + dx, y + dy)
+
+                if ((0 <= nxt[0] < width) and (0 <= nxt[1] < height) and
+                    (nxt not in blocked) and
+                    (cost + step < ret.get(nxt, float("inf")))):
+                    ret[nxt] = cost + step
+                    heapq.heappush(toSearch, (cost + step, nxt))
+
+        return ret
+
+    def test_Graph2D(self):
+        tst = search.Graph2D(7, 5)
+        chk = tst.distanceTransform([tst.grid[1][1]])
+
+        self.assertEqual(chk.shape, (7, 5))
+        self.assertEqual(chk[1][1], 0)
+        self.assertEqual(chk[6][4], 8)
+
+        # defaults follow the neighbors
+        tst = search.Graph2D(7, 5, True, True)
+        chk = tst.distanceTransform([tst.grid[1][1]])
+        self.assertEqual(chk[6][4], 5)
+
+        chk = tst.distanceTransform([tst.grid[1][1]], search.CONNECT_DIAGONAL)
+        self.assertAlmostEqual(chk[6][4], search.octileDistance(
+                               tst.grid[1][1], tst.grid[6][4]))
+
+        with self.assertRaises(ValueError):
+            tst.distanceTransform([tst.grid[1][1]], "knight")
+
+    def test_Graph2D_walls(self):
+        tst = search.Graph2D(10, 8)
+
+        # a wall with a single gap at the bottom, same as findPath's test
+        for y in range(7):
+            tst.removeNode(tst.grid[5][y])
+
+        chk = tst.distanceTransform([tst.grid[2][1]])
+        self.assertEqual(chk[8][1], 18)
+        self.assertEqual(chk[5][0], float("inf"))
+
+    def test_Graph2D_nearestFlagged(self):
+        tst = search.Graph2D(20, 10)
+
+        tst.grid[19][9].addFlag("___test")
+        tst.grid[3][7].addFlag("___test")
+        tst.grid[12][0].addFlag("___test")
+
+        dist = tst.distanceTransform([tst.grid[10][5]])
+        self.assertIs(tst.nearestFlagged("___test", dist), tst.grid[12][0])
+        self.assertIs(tst.nearestFlagged("___impossible", dist), None)
+
+    def test_GridGraph2D_nearestFlagged(self):
+        tst = search.GridGraph2D(5, 5)
+
+        # wall off column 2 except at the bottom
+        for y in range(4):
+            tst.setWalkable(tst.nodeAt(2, y), False)
+
+        tst.addFlag(tst.nodeAt(3, 0), "___test")
+        tst.addFlag(tst.nodeAt(0, 4), "___test")
+
+        dist = tst.distanceTransform([tst.nodeAt(1, 0)])
+        self.assertEqual(len(dist), 25)
+        self.assertEqual(tst.nearestFlagged("___test", dist), tst.nodeAt(0, 4))
+
+        # seal it off entirely
+        tst.setWalkable(tst.nodeAt(2, 4), False)
+        tst.removeFlag(tst.nodeAt(0, 4), "___test")
+
+        dist = tst.distanceTransform([tst.nodeAt(1, 0)])
+        self.assertIs(tst.nearestFlagged("___test", dist), None)
+        self.assertIs(tst.nearestFlagged("___impossible", dist), None)
+
+    def test_against_dijkstra(self):
+        rng = random.Random(1847)
+
+        for trial in range(60): # pylint: disable=unused-variable
+            width  = rng.randint(1, 14)
+            height = rng.randint(1, 14)
+            graph  = search.GridGraph2D(width, height)
+
+            connectivity = rng.choice([search.CONNECT_CARDINAL,
+                                       search.CONNECT_DIAGONAL,
+                                       search.CONNECT_CHEBYSHEV])
+            wallChance   = rng.choice([0.0, 0.2, 0.4])
+            blocked      = set()
+
+            for node in range(graph.size):
+                if (rng.random() < wallChance):
+                    graph.setWalkable(node, False)
+                    blocked.add(graph.positionOf(node))
+
+            seeds = rng.sample(range(graph.size),
+                               rng.randint(1, min(4, graph.size)))
+
+            chk  = graph.distanceTransform(seeds, connectivity)
+            best = self.dijkstra(width, height,
+                                 blocked - {graph.positionOf(s) for s in seeds},
+                                 [graph.positionOf(s) for s in seeds],
+                                 connectivity)
+
+            for node in range(graph.size):
+                self.assertAlmostEqual(chk[node], best.get(
+                                       graph.positionOf(node), float("inf")))
+
+    def test_maze(self):
+        # every column's a wall but for a gap at alternating ends, so a path
+        # turns back on itself far more often than the sweeps will follow
+        for connectivity in (search.CONNECT_CARDINAL, search.CONNECT_DIAGONAL,
+                             search.CONNECT_CHEBYSHEV):
+            graph   = search.GridGraph2D(30, 6)
+            blocked = set()
+
+            for x in range(1, 30, 2):
+                gap = 5 if (0 == (x // 2) % 2) else 0
+
+                for y in range(6):
+                    if (y != gap):
+                        graph.setWalkable(graph.nodeAt(x, y), False)
+                        blocked.add((x, y))
+
+            chk  = graph.distanceTransform([0], connectivity)
+            best = self.dijkstra(30, 6, blocked, [(0, 0)], connectivity)
+
+            for node in range(graph.size):
+                self.assertAlmostEqual(chk[node], best.get(
+                                       graph.positionOf(node), float("inf")))
@@ -0,0 +1,185 @@
+# unit tests for spatial.py
+import random
+import unittest
+
+import tasstuff.any.search as search
+import tasstuff.any.spatial as spatial
+
+class test_PointIndex2D(unittest.TestCase):
+
+    def test_constructor_default(self):
+        tst = spatial.PointIndex2D(-16, 8, 256, 215)
+
+        self.assertEqual(len(tst), 0)
+        self.assertEqual(tst.bucketSize, 8)
+        self.assertEqual(tst.columns, 35)
+        self.assertEqual(tst.rows, 26)
+        self.assertEqual(len(tst.buckets), 35 * 26)
+
+    def test_add(self):
+        tst = spatial.PointIndex2D(0, 0, 99, 99)
+
+        tst.add(3, 4)
+        tst.add(3, 4)
+        tst.add(3, 4, "other")
+
+        self.assertEqual(len(tst), 2)
+        self.assertIn((3, 4, None), tst)
+        self.assertIn((3, 4, "other"), tst)
+        self.assertNotIn((4, 3, None), tst)
+
+        with self.assertRaises(ValueError):
+            tst.add(100, 4)
+
+    def test_remove(self):
+        tst = spatial.PointIndex2D(0, 0, 99, 99)
+
+        tst.add(3, 4)
+
+        self.assertTrue(tst.remove(3, 4))
+        self.assertFalse(tst.remove(3, 4))
+        self.assertEqual(len(tst), 0)
+
+    def test_nearest_empty(self):
+        tst = spatial.PointIndex2D(0, 0, 99, 99)
+
+        self.assertIs(tst.nearest(50, 50), None)
+
+    def test_nearest(self):
+        tst = spatial.PointIndex2D(0, 0, 99, 99)
+
+        tst.add(10, 10, "a")
+        tst.add(40, 12, "b")
+        tst.add(90, 95, "c")
+
+        self.assertEqual(tst.nearest(12, 12), (10, 10, "a"))
+        self.assertEqual(tst.nearest(30, 30), (40, 12, "b"))
+        self.assertEqual(tst.nearest(99, 0), (40, 12, "b"))
+
+        # outside the index is fine for asking
+        self.assertEqual(tst.nearest(500, 500), (90, 95, "c"))
+
+    def test_nearest_ties(self):
+        tst = spatial.PointIndex2D(0, 0, 99, 99)
+
+        # same chebyshev distance, but the straight one is closer
+        tst.add(25, 25)
+        tst.add(25, 20)
+
+        self.assertEqual(tst.nearest(20, 20), (25, 20, None))
+
+    def test_nearest_brute(self):
+        rng = random.Random(1701)
+        tst = spatial.PointIndex2D(-16, 8, 256, 215, 5)
+        pts = set()
+
+        for i in range(300): # pylint: disable=unused-variable
+            pt = (rng.randint(-16, 256), rng.randint(8, 215))
+            pts.add(pt)
+            tst.add(pt[0], pt[1])
+
+        # keep asking and eating points, comparing against a full scan
+        while (len(pts) > 0):
+            x = rng.randint(-30, 270)
+            y = rng.randint(0, 230)
+
+            def score(pt):
+                dx = abs(pt[0] - x)
+                dy = abs(pt[1] - y)
+                return (max(dx, dy), dx + dy)
+
+            best = min(score(pt) for pt in pts)
+            chk  = tst.nearest(x, y)
+
+            self.assertEqual(score(chk), best)
+
+            pts.remove((chk[0], chk[1]))
+            tst.remove(chk[0], chk[1])
+
+        self.assertEqual(len(tst), 0)
+
+    def test_nearest_stats(self):
+        tst = spatial.PointIndex2D(0, 0, 63, 63)
+        tst.add(3, 4, "a")
+        tst.add(60, 60, "b")
+        tst.stats = search.SearchStats()
+
+        self.assertEqual(tst.nearest(50, 50), (60, 60, "b"))
+        self.assertEqual(tst.stats.queries, 1)
+        self.assertEqual(tst.stats.slowest.cost, 10)
+        self.assertGreater(tst.stats.expanded, 0)
+        self.assertGreaterEqual(tst.stats.relaxed, 1)
+
+class test_FieldIndex2D(unittest.TestCase):
+
+    def test_add_remove(self):
+        tst = spatial.FieldIndex2D(0, 0, 99, 99)
+
+        tst.add(3, 4)
+        tst.add(3, 4)
+        tst.add(3, 4, "other")
+
+        self.assertEqual(len(tst), 2)
+        self.assertIn((3, 4, "other"), tst)
+        self.assertNotIn((4, 3, None), tst)
+
+        self.assertTrue(tst.remove(3, 4))
+        self.assertFalse(tst.remove(3, 4))
+        self.assertEqual(len(tst), 1)
+
+        # the spot's still a target while anything's left there
+        self.assertEqual(tst.nearest(50, 50), (3, 4, "other"))
+
+        with self.assertRaises(ValueError):
+            tst.add(100, 4)
+
+    def test_nearest(self):
+        tst = spatial.FieldIndex2D(0, 0, 99, 99)
+
+        self.assertIs(tst.nearest(50, 50), None)
+
+        tst.add(10, 10, "a")
+        tst.add(40, 12, "b")
+        tst.add(90, 95, "c")
+
+        self.assertEqual(tst.nearest(12, 12), (10, 10, "a"))
+        self.assertEqual(tst.nearest(30, 30), (40, 12, "b"))
+        self.assertEqual(tst.nearest(500, 500), (90, 95, "c"))
+
+    def test_nearest_brute(self):
+        rng = random.Random(1701)
+        tst = spatial.FieldIndex2D(-16, 8, 100, 90)
+        pts = set()
+
+        for i in range(150): # pylint: disable=unused-variable
+            pt = (rng.randint(-16, 100), rng.randint(8, 90))
+            pts.add(pt)
+            tst.add(pt[0], pt[1])
+
+        x = 0
+        y = 50
+
+        # eat points like a greedy tour would, checking distances only since
+        # ties can go either way
+        while (len(pts) > 0):
+            best = min(max(abs(p[0] - x), abs(p[1] - y)) for p in pts)
+            chk  = tst.nearest(x, y)
+
+            self.assertEqual(max(abs(chk[0] - x), abs(chk[1] - y)), best)
+
+            pts.remove((chk[0], chk[1]))
+            tst.remove(chk[0], chk[1])
+
+            x = chk[0]
+            y = chk[1]
+
+        self.assertEqual(len(tst), 0)
+
+    def test_nearest_stats(self):
+        tst = spatial.FieldIndex2D(0, 0, 15, 15)
+        tst.add(3, 4, "a")
+        tst.stats = search.SearchStats()
+
+        self.assertEqual(tst.nearest(10, 4), (3, 4, "a"))
+        self.assertEqual(tst.stats.slowest.cost, 7)
+        self.assertGreater(tst.stats.expanded, 0)
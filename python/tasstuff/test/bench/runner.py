@@ -0,0 +1,92 @@
+# unit tests for runner.py
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import tasstuff.bench.runner as runner
+import tasstuff.bench.workloads as workloads
+
+class test_runner(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def build_results(self, **bests):
+        return {
+            "scale"     : 1.0,
+            "workloads" : {name : {"best" : best, "result" : 1}
+                           for name, best in bests.items()},
+        }
+
+    def test_runWorkload(self):
+        calls = []
+
+        def run(state):
+            calls.append(state)
+            return len(calls)
+
+        workload = workloads.Workload("___test", lambda rng, scale: [scale],
+                                      run, lambda state: calls.append("done"))
+
+        chk = runner.runWorkload(workload, 3, 0.5)
+
+        self.assertEqual(len(chk["times"]), 3)
+        self.assertEqual(chk["best"], min(chk["times"]))
+        self.assertEqual(chk["result"], 3)
+        self.assertEqual(calls, [[0.5], [0.5], [0.5], "done"])
+
+    def test_runAll(self):
+        log = io.StringIO()
+        chk = runner.runAll(["graph2d_build"], 1, 0.01, log)
+
+        self.assertEqual(list(chk["workloads"]), ["graph2d_build"])
+        self.assertEqual(chk["scale"], 0.01)
+        self.assertIn("graph2d_build", log.getvalue())
+
+    def test_saveResults(self):
+        path = os.path.join(self.dir, "results.json")
+        tst  = self.build_results(a=1.5, b=0.25)
+
+        runner.saveResults(path, tst)
+        self.assertEqual(runner.loadResults(path), tst)
+
+    def test_compare(self):
+        before = self.build_results(a=1.0, b=1.0, c=1.0, gone=1.0)
+        after  = self.build_results(a=0.5, b=1.05, c=1.2, new=1.0)
+        after["workloads"]["b"]["result"] = 2
+
+        chk = {c.name : c for c in runner.compare(after, before, 0.1)}
+
+        self.assertEqual(sorted(chk), ["a", "b", "c"])
+        self.assertEqual(chk["a"].speedup, 2.0)
+        self.assertFalse(chk["a"].regressed)
+        self.assertFalse(chk["b"].regressed)
+        self.assertFalse(chk["b"].sameResult)
+        self.assertTrue(chk["c"].regressed)
+        self.assertIn("REGRESSED", str(chk["c"]))
+
+        after["scale"] = 0.5
+
+        with self.assertRaises(ValueError):
+            runner.compare(after, before)
+
+    def test_main(self):
+        out  = os.path.join(self.dir, "results.json")
+        base = os.path.join(self.dir, "baseline.json")
+
+        # anything beats a baseline that took no time at all
+        runner.saveResults(base, {"scale"     : 0.01,
+                                  "workloads" : {"graph2d_build" :
+                                                 {"best" : 0.0}}})
+
+        args = ["graph2d_build", "--repeats", "1", "--scale", "0.01",
+                "--out", out]
+
+        self.assertEqual(runner.main(args), 0)
+        self.assertIn("graph2d_build", runner.loadResults(out)["workloads"])
+        self.assertEqual(runner.main(args + ["--baseline", base]), 1)
@@ -0,0 +1,39 @@
+# unit tests for workloads.py
+import random
+import unittest
+
+import tasstuff.bench.workloads as workloads
+
+class test_workloads(unittest.TestCase):
+
+    def test_byName(self):
+        self.assertEqual(len(workloads.byName()), len(workloads.WORKLOADS))
+
+        chk = workloads.byName(["plotter_mask", "graph2d_build"])
+        self.assertEqual([w.name for w in chk], ["plotter_mask",
+                                                 "graph2d_build"])
+
+        with self.assertRaises(ValueError):
+            workloads.byName(["___nothing"])
+
+    def test_names(self):
+        names = [w.name for w in workloads.WORKLOADS]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_reproducible(self):
+        # every workload does the same work each time, even set up again
+        for workload in workloads.WORKLOADS:
+            found = []
+
+            for attempt in range(2): # pylint: disable=unused-variable
+                state = workload.setup(random.Random(workload.seed), 0.01)
+
+                try:
+                    found.append(workload.run(state))
+                    found.append(workload.run(state))
+                finally:
+                    if (workload.teardown is not None):
+                        workload.teardown(state)
+
+            self.assertEqual(len(set(found)), 1, workload.name)
+            self.assertIsNotNone(found[0], workload.name)
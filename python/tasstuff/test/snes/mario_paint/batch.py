@@ -0,0 +1,131 @@
+# unit tests for batch.py
+import unittest
+
+import json
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+import tasstuff.snes.mario_paint.batch as batch
+import tasstuff.snes.mario_paint.ordering as ordering
+import tasstuff.snes.mario_paint.plotter as mpaint
+
+class test_batch(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def build_mask(self, name, black, width=40, height=20):
+        im = Image.new("1", (width, height), 1)
+
+        for px in black:
+            im.putpixel(px, 0)
+
+        im.save(os.path.join(self.dir, name))
+
+        return os.path.join(self.dir, name)
+
+    def build_manifest(self, jobs):
+        path = os.path.join(self.dir, "manifest.json")
+
+        with open(path, "w") as handle:
+            json.dump(jobs, handle)
+
+        return path
+
+    def build_plotter(self):
+        ret = mpaint.Plotter()
+
+        # everything stays in the buffer
+        ret.scrollback = float("inf")
+        ret.jump(0, 8)
+
+        return ret
+
+    def test_loadManifest(self):
+        self.build_mask("a.png", [(1, 1)])
+        path = self.build_manifest([{"image" : "a.png"},
+                                    {"image"  : "a.png",
+                                     "offset" : [16, 24],
+                                     "tool"   : [40, 190]}])
+
+        chk = batch.loadManifest(path)
+
+        self.assertEqual(len(chk), 2)
+        self.assertEqual(chk[0].image, os.path.join(self.dir, "a.png"))
+        self.assertEqual((chk[0].offsetX, chk[0].offsetY, chk[0].tool),
+                         (0, 0, None))
+        self.assertEqual((chk[1].offsetX, chk[1].offsetY, chk[1].tool),
+                         (16, 24, (40, 190)))
+
+    def test_loadManifest_bad(self):
+        with self.assertRaises(ValueError):
+            batch.loadManifest(self.build_manifest({"image" : "a.png"}))
+
+        with self.assertRaises(ValueError):
+            batch.loadManifest(self.build_manifest([{"offset" : [1, 2]}]))
+
+    def test_planBatch(self):
+        jobs = [batch.BatchJob(self.build_mask("a.png", [(1, 1), (5, 1)])),
+                batch.BatchJob(self.build_mask("b.png", [(0, 10), (0, 11)]),
+                               10, 10, (100, 100))]
+
+        chk = batch.planBatch(jobs, 0, 8, 0, 1)
+
+        self.assertEqual(len(chk), 2)
+        self.assertEqual(sorted(chk[0].order), [(1, 8, 1, 8), (5, 8, 5, 8)])
+
+        # planned from the tool, not the start
+        self.assertEqual(chk[1].frames,
+                         ordering.orderFrames(100, 100, chk[1].order))
+
+        # and the same in a pool
+        pooled = batch.planBatch(jobs, 0, 8, 0, 2)
+
+        self.assertEqual([t.order for t in pooled], [t.order for t in chk])
+
+    def test_plotBatch_matches_mask(self):
+        path = self.build_mask("a.png", [(1, 1), (2, 2), (30, 15)])
+
+        tst = self.build_plotter()
+        batch.plotBatch(tst, [batch.BatchJob(path, 4, 0)], 1)
+
+        chk = self.build_plotter()
+        chk.setOffsets(4, 0)
+        chk.mask(path)
+        chk.wait(1)
+
+        self.assertEqual(tst.buffer, chk.buffer)
+
+    def test_plotBatch_tool(self):
+        path = self.build_mask("a.png", [(1, 1)])
+
+        tst = self.build_plotter()
+        batch.plotBatch(tst, [batch.BatchJob(path, 0, 0, (20, 8))], 1)
+
+        # move to the tool, click it, then head for the dot
+        self.assertEqual(tst.buffer[0], "|..|   10,    0,..|............|")
+        self.assertEqual(tst.buffer[3], "|..|    0,    0,l.|............|")
+        self.assertEqual(tst.buffer[11], "|..|  -10,    0,..|............|")
+
+    def test_plotBatch_reverses(self):
+        # a line of dots, planned from the left end, but the pen gets left
+        # near the right end by the job before
+        line = self.build_mask("line.png", [(x, 0) for x in range(0, 40, 12)])
+        dot  = self.build_mask("dot.png", [(39, 0)])
+
+        jobs = [batch.BatchJob(dot, 200, 100), batch.BatchJob(line, 200, 100)]
+        tst  = self.build_plotter()
+        tst.jump(200, 100)
+
+        chk = batch.plotBatch(tst, jobs, 1)
+
+        self.assertEqual(chk[1].order[0][0], 236)
+        self.assertEqual(chk[1].order[-1][0], 200)
+        self.assertIs(tst.lastTour, chk[1])
+        self.assertFalse(tst.down)
@@ -0,0 +1,79 @@
+# unit tests for greenzone.py
+import unittest
+
+import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.greenzone as greenzone
+import tasstuff.snes.mario_paint.plotter as plotter
+
+from tasstuff.any.bizhawk.controller import SnesPreset_MarioPaint
+from tasstuff.any.bizhawk.history import PianoRoll
+from tasstuff.any.bizhawk.inputlog import MemorySink
+from tasstuff.any.bizhawk.mnemonic import MnemonicFormat
+
+class test_greenzone(unittest.TestCase):
+
+    def setUp(self):
+        self.plot = plotter.Plotter()
+        self.plot.sink = MemorySink()
+        self.plot.jump(100, 100)
+
+        self.start = greenzone.penOf(self.plot)
+
+        # frame -> pen, wherever a move or click finished
+        self.pens = {}
+
+        for x, y in [(20, 30), (200, 180), (mp.SCREEN_MIN_X, mp.SCREEN_MAX_Y),
+                     (128, 100)]:
+            self.plot.plotAbsolute(x, y)
+            self.mark()
+
+            self.plot.penDown()
+            self.plot.plotRelative(15, -7)
+            self.mark()
+
+            self.plot.penUp()
+            self.plot.rightclick()
+            self.mark()
+
+        self.roll = PianoRoll()
+
+        for inpt in self.plot.sink.frames:
+            self.roll.addFrame(inpt)
+
+    def mark(self):
+        self.plot.outputBuffer(True)
+        self.pens[len(self.plot.sink.frames) - 1] = greenzone.penOf(self.plot)
+
+    def test_penStepper(self):
+        controls = SnesPreset_MarioPaint()
+        step     = greenzone.penStepper(controls)
+        pen      = (0, 100, False, False)
+
+        # right button held, moving left and down
+        controls.mR.pressed = True
+        controls.mX.current = -10
+        controls.mY.current = 3
+
+        pen = step(pen, *MnemonicFormat(controls).pack())
+        self.assertEqual(pen, (-10, 103, False, True))
+
+        # and then just the left, which can't take it off screen
+        controls.mR.pressed = False
+        controls.mL.pressed = True
+
+        pen = step(pen, *MnemonicFormat(controls).pack())
+        self.assertEqual(pen, (mp.SCREEN_MIN_X, 106, True, False))
+
+    def test_plotGreenzone(self):
+        tst = greenzone.plotGreenzone(self.roll, self.start, interval=8)
+
+        for frame in sorted(self.pens, reverse=True):
+            self.assertEqual(tst.seek(frame).tracked, self.pens[frame])
+
+    def test_restorePen(self):
+        tst = greenzone.plotGreenzone(self.roll, self.start, interval=8)
+        frame = sorted(self.pens)[4]
+
+        greenzone.restorePen(self.plot, tst.load(frame))
+
+        self.assertEqual(greenzone.penOf(self.plot), self.pens[frame])
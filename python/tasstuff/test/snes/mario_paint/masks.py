@@ -0,0 +1,70 @@
+# unit tests for masks.py
+import unittest
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from PIL import Image
+
+import tasstuff.snes.mario_paint.constants as mp
+import tasstuff.snes.mario_paint.masks as masks
+import tasstuff.snes.mario_paint.ordering as ordering
+
+class test_masks(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def build_mask(self, black, width=40, height=20):
+        im = Image.new("1", (width, height), 1)
+
+        for px in black:
+            im.putpixel(px, 0)
+
+        path = os.path.join(self.dir, "mask.png")
+        im.save(path)
+
+        return path
+
+    def test_onScreen(self):
+        self.assertTrue(masks.onScreen(mp.SCREEN_MIN_X, mp.SCREEN_MAX_Y))
+        self.assertFalse(masks.onScreen(mp.SCREEN_MIN_X - 1, mp.SCREEN_MAX_Y))
+        self.assertFalse(masks.onScreen(0, mp.SCREEN_MAX_Y + 1))
+
+    def test_maskTargets(self):
+        path = self.build_mask([(1, 1), (2, 1), (3, 1), (10, 5)])
+
+        self.assertEqual(masks.maskTargets(path, 20, 30),
+                         [(21, 31, 23, 31), (30, 35, 30, 35)])
+
+    def test_maskTargets_offScreen(self):
+        path = self.build_mask([(0, 0), (1, 0), (2, 0)])
+
+        # hanging off the left, so it's dots, clamped one at a time
+        self.assertEqual(masks.maskTargets(path, mp.SCREEN_MIN_X - 1, 8),
+                         [(-16, 8, -16, 8), (-15, 8, -15, 8)])
+
+    def test_planMask(self):
+        path = self.build_mask([(1, 1), (5, 1)])
+        chk  = masks.planMask(path, 0, 8, 0, 8, 0)
+
+        self.assertEqual(sorted(chk.order), [(1, 9, 1, 9), (5, 9, 5, 9)])
+        self.assertEqual(chk.frames, ordering.orderFrames(0, 8, chk.order))
+
+    def test_batch_leaves_plotter_alone(self):
+        # what the pool runs doesn't drag the plotter in with it
+        code = ("import sys, tasstuff.snes.mario_paint.batch; "
+                "print('tasstuff.snes.mario_paint.plotter' in sys.modules)")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+               os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+        found = subprocess.run([sys.executable, "-c", code], cwd=root,
+                               capture_output=True, text=True, check=True)
+
+        self.assertEqual(found.stdout.strip(), "False")
@@ -0,0 +1,158 @@
+# unit tests for ordering.py
+import random
+import unittest
+
+import tasstuff.any.spatial as spatial
+import tasstuff.snes.mario_paint.ordering as ordering
+
+class test_costs(unittest.TestCase):
+
+    def test_travelFrames(self):
+        self.assertEqual(ordering.travelFrames(0, 0, 0, 0), 0)
+        self.assertEqual(ordering.travelFrames(0, 0, 10, -10), 1)
+        self.assertEqual(ordering.travelFrames(0, 0, 11, 3), 2)
+        self.assertEqual(ordering.travelFrames(5, 5, -30, 9), 4)
+
+    def test_travelFrames_speed(self):
+        self.assertEqual(ordering.travelFrames(0, 0, 25, -3, 1), 25)
+        self.assertEqual(ordering.travelFrames(0, 0, 7, 7, 3), 3)
+
+    def test_canDrag(self):
+        self.assertTrue(ordering.canDrag(0, 0, 1, -1))
+        self.assertTrue(ordering.canDrag(0, 0, 0, 0))
+        self.assertFalse(ordering.canDrag(0, 0, 2, 0))
+        self.assertFalse(ordering.canDrag(0, 0, 10, -10))
+
+    def test_linkFrames(self):
+        # dragging
+        self.assertEqual(ordering.linkFrames(0, 0, 1, 1), 1)
+        self.assertEqual(ordering.linkFrames(0, 0, 0, 0), 0)
+
+        # lift, travel, drop
+        self.assertEqual(ordering.linkFrames(0, 0, 4, 4), 10)
+        self.assertEqual(ordering.linkFrames(0, 0, 20, 4), 11)
+
+        # pen already up
+        self.assertEqual(ordering.linkFrames(0, 0, 4, 4, False), 10)
+        self.assertEqual(ordering.linkFrames(0, 0, 0, 0, False), 9)
+
+    def test_strokeFrames(self):
+        self.assertEqual(ordering.strokeFrames((0, 0, 0, 0)), 0)
+        self.assertEqual(ordering.strokeFrames((0, 0, 25, 0)), 25)
+        self.assertEqual(ordering.strokeFrames((3, 3, -4, 10)), 7)
+
+    def test_orderFrames(self):
+        order = [(0, 0, 0, 0), (1, 0, 21, 0), (100, 100, 100, 100)]
+
+        # 9 to drop, 1 + 20 to drag along, 9 + 10 to jump over
+        self.assertEqual(ordering.orderFrames(0, 0, order), 49)
+        self.assertEqual(ordering.orderFrames(0, 0, []), 0)
+
+    def test_flipStroke(self):
+        self.assertEqual(ordering.flipStroke((1, 2, 3, 4)), (3, 4, 1, 2))
+
+class test_Tour(unittest.TestCase):
+
+    def test_saved(self):
+        tst = ordering.Tour([], 90, 100)
+
+        self.assertEqual(tst.saved(), 10)
+
+class test_ordering(unittest.TestCase):
+
+    def build_strokes(self, count, seed):
+        rng = random.Random(seed)
+        ret = set()
+
+        while (len(ret) < count):
+            x = rng.randint(0, 120)
+            y = rng.randint(0, 90)
+
+            if (rng.random() < 0.5):
+                ret.add((x, y, x, y))
+            else:
+                ret.add((x, y, x + rng.randint(-12, 12), y))
+
+        return sorted(ret)
+
+    def assertSameStrokes(self, order, strokes):
+        # every stroke in there once, in one direction or the other
+        chk = sorted(min(s, ordering.flipStroke(s)) for s in order)
+        exp = sorted(min(s, ordering.flipStroke(s)) for s in strokes)
+
+        self.assertEqual(chk, exp)
+
+    def test_greedyOrder(self):
+        strokes = [(50, 0, 40, 0), (0, 0, 0, 0), (30, 0, 20, 0)]
+
+        chk = ordering.greedyOrder(0, 0, strokes)
+
+        self.assertEqual(chk, [(0, 0, 0, 0), (20, 0, 30, 0), (40, 0, 50, 0)])
+        self.assertEqual(ordering.greedyOrder(0, 0, []), [])
+
+    def test_greedyOrder_field(self):
+        strokes = [(50, 0, 40, 0), (0, 0, 0, 0), (30, 0, 20, 0)]
+
+        chk = ordering.greedyOrder(0, 0, strokes, spatial.FieldIndex2D)
+
+        self.assertEqual(chk, [(0, 0, 0, 0), (20, 0, 30, 0), (40, 0, 50, 0)])
+
+        strokes = self.build_strokes(150, 42)
+        chk     = ordering.greedyOrder(0, 0, strokes, spatial.FieldIndex2D)
+
+        self.assertSameStrokes(chk, strokes)
+
+    def test_improveOrder(self):
+        strokes = self.build_strokes(150, 42)
+        greedy  = ordering.greedyOrder(0, 0, strokes)
+
+        chk = ordering.improveOrder(0, 0, greedy, 5)
+
+        self.assertSameStrokes(chk, strokes)
+        self.assertLessEqual(ordering.orderFrames(0, 0, chk),
+                             ordering.orderFrames(0, 0, greedy))
+
+    def test_improveOrder_limits(self):
+        order = [(0, 0, 0, 0), (40, 0, 40, 0), (20, 0, 20, 0),
+                 (60, 0, 60, 0)]
+
+        # no passes, or no time, leaves it alone
+        self.assertEqual(ordering.improveOrder(0, 0, order, 0), order)
+        self.assertEqual(ordering.improveOrder(0, 0, order, 5, timeBudget=0),
+                         order)
+
+        # and passes alone always come out the same
+        strokes = self.build_strokes(150, 42)
+        greedy  = ordering.greedyOrder(0, 0, strokes)
+
+        self.assertEqual(ordering.improveOrder(0, 0, greedy),
+                         ordering.improveOrder(0, 0, greedy))
+
+    def test_improveOrder_crossing(self):
+        # going out and back along a line the long way is an easy fix
+        order = [(0, 0, 0, 0), (40, 0, 40, 0), (20, 0, 20, 0),
+                 (60, 0, 60, 0)]
+
+        chk = ordering.improveOrder(0, 0, order, 5)
+
+        self.assertEqual(chk, [(0, 0, 0, 0), (20, 0, 20, 0), (40, 0, 40, 0),
+                               (60, 0, 60, 0)])
+
+    def test_planOrder(self):
+        strokes = self.build_strokes(150, 7)
+
+        tst = ordering.planOrder(3, 3, strokes, 5)
+
+        self.assertSameStrokes(tst.order, strokes)
+        self.assertEqual(tst.frames, ordering.orderFrames(3, 3, tst.order))
+        self.assertEqual(tst.greedyFrames, ordering.orderFrames(
+            3, 3, ordering.greedyOrder(3, 3, strokes)))
+        self.assertGreaterEqual(tst.saved(), 0)
+
+    def test_planOrder_greedy(self):
+        strokes = self.build_strokes(50, 9)
+
+        tst = ordering.planOrder(3, 3, strokes, 0)
+
+        self.assertEqual(tst.order, ordering.greedyOrder(3, 3, strokes))
+        self.assertEqual(tst.saved(), 0)
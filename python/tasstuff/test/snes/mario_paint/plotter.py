@@ -1,6 +1,418 @@
 # unit tests for plotter.py
 import unittest
 
-# import tasstuff.any.search as search
+import os
+import random
+import tempfile
+
+from PIL import Image
+
+import tasstuff.any.bizhawk.inputlog as inputlog
+import tasstuff.any.bizhawk.mnemonic as mnemonic
+import tasstuff.any.search as search
+import tasstuff.any.spatial as spatial
+import tasstuff.snes.mario_paint.greenzone as greenzone
 import tasstuff.snes.mario_paint.plotter as mpaint
+import tasstuff.snes.mario_paint.profiling as profiling
+
+class test_mouseFramesHeuristic(unittest.TestCase):
+
+    def test_mouseFramesHeuristic(self):
+        a = search.Node2D()
+        b = search.Node2D()
+
+        a.x, a.y = 0, 0
+        b.x, b.y = 0, 0
+        self.assertEqual(mpaint.mouseFramesHeuristic(a, b), 0)
+
+        b.x, b.y = 10, -3
+        self.assertEqual(mpaint.mouseFramesHeuristic(a, b), 1)
+
+        b.x, b.y = -4, 21
+        self.assertEqual(mpaint.mouseFramesHeuristic(a, b), 3)
+
+class test_moveDeltas(unittest.TestCase):
+
+    def test_moveDeltas(self):
+        self.assertEqual(mpaint.moveDeltas(0, 0), ())
+        self.assertEqual(mpaint.moveDeltas(10, -3), ((10, -3),))
+        self.assertEqual(mpaint.moveDeltas(-25, 12),
+                         ((-10, 10), (-10, 2), (-5, 0)))
+        self.assertEqual(mpaint.moveDeltas(7, 7, 3), ((3, 3), (3, 3), (1, 1)))
+
+    def test_moveDeltas_matches_getMaxDelta(self):
+        # the old frame by frame way of doing it
+        tst = mpaint.Plotter()
+
+        for dx in range(-31, 32):
+            for dy in (-27, -10, -1, 0, 9, 20):
+                x   = 0
+                y   = 0
+                chk = []
+
+                while ((x != dx) or (y != dy)):
+                    stepX = tst.getMaxDelta(x, dx)
+                    stepY = tst.getMaxDelta(y, dy)
+
+                    chk.append((stepX, stepY))
+
+                    x = x + stepX
+                    y = y + stepY
+
+                self.assertEqual(mpaint.moveDeltas(dx, dy), tuple(chk))
+
+    def test_moveFrames(self):
+        chk = mpaint.moveFrames("{},{}", 12, 0)
+
+        self.assertEqual(chk, ("10,0", "2,0"))
+        self.assertIs(mpaint.moveFrames("{},{}", 12, 0), chk)
+
+class test_Plotter(unittest.TestCase):
+
+    def build_mask(self, width, height, black):
+        """Writes a 1 bit mask to a temporary file.
+
+        Args:
+            width (uint): width of the mask
+            height (uint): height of the mask
+            black (list): (x, y) tuples to fill in
+
+        Returns:
+            str: path to the mask. Caller is in charge of cleanup.
+        """
+        im = Image.new("1", (width, height), 1)
+
+        for px in black:
+            im.putpixel(px, 0)
+
+        handle, path = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        im.save(path)
+
+        return path
+
+    def build_plotter(self):
+        ret = mpaint.Plotter()
+
+        # keep everything in the buffer so it can be inspected
+        ret.scrollback = float("inf")
+
+        return ret
+
+    def test_mask(self):
+        path = self.build_mask(30, 4, [(0, 0), (2, 0), (25, 3)])
+        tst  = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(0, 10)
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # first dot: already there, wait, drop pen, wait
+        self.assertEqual(tst.buffer[0], "|..|    0,    0,..|............|")
+        self.assertEqual(tst.buffer[1], "|..|    0,    0,l.|............|")
+
+        # dragging to the second dot would draw the white pixel between, so
+        # the pen's lifted for that
+        self.assertEqual(tst.buffer[9], "|..|    0,    0,..|............|")
+        self.assertEqual(tst.buffer[10], "|..|    2,    0,..|............|")
+        self.assertEqual(tst.buffer[11], "|..|    0,    0,l.|............|")
+
+        # and for the trip to the third
+        self.assertEqual(tst.buffer[19], "|..|    0,    0,..|............|")
+        self.assertEqual(tst.buffer[20], "|..|   10,    3,..|............|")
+        self.assertEqual(tst.buffer[21], "|..|   10,    0,..|............|")
+        self.assertEqual(tst.buffer[22], "|..|    3,    0,..|............|")
+        self.assertEqual(tst.buffer[23], "|..|    0,    0,l.|............|")
+        self.assertEqual(len(tst.buffer), 31)
+
+        self.assertEqual(tst.x, 25)
+        self.assertEqual(tst.y, 13)
+        self.assertFalse(tst.down)
+
+        # the order mask planned has to cost exactly what it emitted
+        self.assertEqual(tst.lastTour.frames, len(tst.buffer))
+
+    def render(self, frames, x, y):
+        """Works out what a run of frames draws.
+
+        Wherever the pen's down on a frame gets drawn. If it was down on the
+        frame before too, so does everything on the line between, in case
+        the game joins them up.
+
+        Args:
+            frames (list): mnemonics to replay
+            x (int): x the pen starts at
+            y (int): y the pen starts at
+
+        Returns:
+            set: (x, y) for every pixel drawn
+        """
+        controls  = mpaint.SnesPreset_MarioPaint()
+        step      = greenzone.penStepper(controls)
+        bits, axes = mnemonic.MnemonicFormat(controls).parseMany(frames)
+
+        ret = set()
+        pen = (x, y, False, False)
+
+        for frame, b in enumerate(bits):
+            last = pen
+            pen  = step(pen, b, [a[frame] for a in axes])
+
+            if (pen[2] and last[2]):
+                dx    = pen[0] - last[0]
+                dy    = pen[1] - last[1]
+                steps = max(abs(dx), abs(dy), 1)
+
+                for i in range(steps + 1):
+                    ret.add((last[0] + round(i * dx / steps),
+                             last[1] + round(i * dy / steps)))
+            elif (pen[2]):
+                ret.add((pen[0], pen[1]))
+
+        return ret
+
+    def test_mask_draws_mask(self):
+        rng   = random.Random(8)
+        black = set()
+
+        # lines every way a stroke can go, dots a pixel apart, and noise
+        black.update((x, 2) for x in range(3, 30))
+        black.update((5, y) for y in range(4, 19))
+        black.update((10 + i, 4 + i) for i in range(12))
+        black.update((35 - i, 4 + i) for i in range(12))
+        black.update((x, 0) for x in range(0, 40, 2))
+        black.update((rng.randrange(40), rng.randrange(20)) for i in range(150)) # pylint: disable=unused-variable
+
+        path = self.build_mask(40, 20, sorted(black))
+        tst  = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(20, 40)
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        chk = self.render(tst.buffer, 0, 10)
+
+        self.assertEqual(chk, set((x + 20, y + 40) for x, y in black))
+        self.assertEqual(tst.lastTour.frames, len(tst.buffer))
+
+    def test_mask_targetIndex(self):
+        path = self.build_mask(30, 4, [(0, 0), (2, 0), (25, 3)])
+        tst  = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(0, 10)
+        tst.targetIndex = spatial.FieldIndex2D
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # same drawing as with the default index
+        self.assertEqual(len(tst.buffer), 31)
+        self.assertEqual((tst.x, tst.y), (25, 13))
+
+    def test_mask_searchStats(self):
+        path = self.build_mask(30, 4, [(0, 0), (2, 0), (25, 3)])
+        tst  = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(0, 10)
+        tst.searchStats = search.SearchStats()
+
+        try:
+            tst.mask(path)
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # one search per dot and one more to find nothing's left, piled
+        # up over both masks
+        self.assertEqual(tst.searchStats.queries, 2 * 4)
+        self.assertEqual(tst.searchStats.found, 2 * 3)
+
+    def test_profile(self):
+        tst = self.build_plotter()
+        tst.jump(0, 10)
+        tst.profile = profiling.FrameProfile()
+
+        # travel, wait, drop, wait, drag
+        tst.drawStroke(5, 10, 25, 10)
+        tst.click()
+        tst.rightclick()
+        tst.bufferInstruction(3, 0)
+
+        self.assertEqual(tst.profile.totals,
+                         {profiling.TAG_TRAVEL      : 1,
+                          profiling.TAG_WAIT_UP     : 1,
+                          profiling.TAG_WAIT_DOWN   : 8,
+                          profiling.TAG_STROKE      : 20,
+                          profiling.TAG_CLICK       : 9,
+                          profiling.TAG_RIGHTCLICK  : 9,
+                          profiling.TAG_INSTRUCTION : 1})
+
+        # every frame's counted exactly once
+        self.assertEqual(sum(tst.profile.totals.values()), len(tst.buffer))
+
+    def test_profile_mask(self):
+        path = self.build_mask(30, 4, [(0, 0), (2, 0), (25, 3)])
+        tst  = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(0, 10)
+        tst.penDown()
+        tst.profile = profiling.FrameProfile()
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        label, counts = tst.profile.sections[0]
+
+        self.assertEqual(label, "mask " + path)
+        self.assertEqual(sum(counts.values()), len(tst.buffer))
+
+        # the lift before starting is a pen up wait
+        self.assertGreaterEqual(counts[profiling.TAG_WAIT_UP], 10)
+
+    def test_mask_tour(self):
+        black = [(x, (x * 7) % 20) for x in range(0, 40, 3)]
+        path  = self.build_mask(40, 20, black)
+        tst   = self.build_plotter()
+        tst.jump(30, 30)
+        tst.setOffsets(10, 10)
+        tst.penDown()
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # the extra 10 are for lifting the pen first
+        self.assertEqual(tst.lastTour.frames + 10, len(tst.buffer))
+        self.assertEqual(len(tst.lastTour.order), len(black))
+
+    def test_mask_strokes(self):
+        black = [(x, 2) for x in range(3, 28)] + [(30, y) for y in range(5)]
+        path  = self.build_mask(40, 8, black)
+        tst   = self.build_plotter()
+        tst.jump(0, 10)
+        tst.setOffsets(0, 10)
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # a line across and a line down, not thirty dots, either way round
+        chk = sorted(min(s, (s[2], s[3], s[0], s[1]))
+                     for s in tst.lastTour.order)
+        self.assertEqual(chk, [(3, 12, 27, 12), (30, 10, 30, 14)])
+
+    def test_mask_offscreen(self):
+        black = [(x, 0) for x in range(10)]
+        path  = self.build_mask(10, 1, black)
+        tst   = self.build_plotter()
+        tst.setOffsets(mpaint.mp.SCREEN_MAX_X - 4, 20)
+
+        try:
+            tst.mask(path)
+        finally:
+            os.remove(path)
+
+        # the part past the edge piles up on the edge
+        chk = sorted(tst.lastTour.order)
+        self.assertEqual(len(chk), 5)
+        self.assertEqual(chk[-1], (mpaint.mp.SCREEN_MAX_X, 20,
+                                   mpaint.mp.SCREEN_MAX_X, 20))
+
+    def test_plotAbsolute(self):
+        tst = self.build_plotter()
+
+        tst.penDown()
+        tst.plotAbsolute(15, -50)
+
+        # starting from 0, 0, which is above the screen
+        self.assertEqual(tst.buffer, ["|..|   10,    8,l.|............|",
+                                      "|..|    5,    0,l.|............|"])
+        self.assertEqual((tst.x, tst.y), (15, mpaint.mp.SCREEN_MIN_Y))
+
+        tst.plotRelative(-1, 1)
+        self.assertEqual(tst.buffer[-1], "|..|   -1,    1,l.|............|")
+        self.assertEqual((tst.x, tst.y), (14, mpaint.mp.SCREEN_MIN_Y + 1))
+
+    def test_bufferInstruction(self):
+        tst = self.build_plotter()
+
+        tst.bufferInstruction(-10, 7)
+        tst.penDown()
+        tst.bufferInstruction(3.0, 0)
+        tst.rightDown()
+        tst.bufferInstruction(0, -2)
+        tst.penUp()
+        tst.bufferInstruction(0, 0)
+
+        self.assertEqual(tst.buffer, ["|..|  -10,    7,..|............|",
+                                      "|..|    3,    0,l.|............|",
+                                      "|..|    0,   -2,lr|............|",
+                                      "|..|    0,    0,.r|............|"])
+
+    def test_outputBuffer(self):
+        tst = mpaint.Plotter()
+        tst.scrollback = 4
+        tst.sink = inputlog.MemorySink()
+
+        tst.wait(6)
+
+        # one batch handed off, the rest waits
+        self.assertEqual(len(tst.sink.frames), 4)
+        self.assertEqual(len(tst.buffer), 2)
+
+        tst.outputBuffer(True)
+        self.assertEqual(len(tst.sink.frames), 6)
+        self.assertEqual(len(tst.buffer), 0)
+
+    def test_setSink(self):
+        tst = mpaint.Plotter()
+        old = inputlog.MemorySink()
+        new = inputlog.MemorySink()
+
+        tst.sink = old
+        tst.wait(3)
+        tst.setSink(new)
+        tst.wait(2)
+        tst.outputBuffer(True)
+
+        self.assertEqual(len(old.frames), 3)
+        self.assertEqual(len(new.frames), 2)
+
+    def test_drawStroke(self):
+        tst = self.build_plotter()
+        tst.jump(0, 10)
+
+        # pen up, so travel, wait, drop, wait, drag a pixel a frame
+        tst.drawStroke(5, 10, 25, 10)
+        self.assertEqual(len(tst.buffer), 1 + 1 + 8 + 20)
+        self.assertEqual(tst.buffer[-1], "|..|    1,    0,l.|............|")
+        self.assertTrue(tst.down)
+
+        # right next to it, so drag there
+        tst.buffer = []
+        tst.drawStroke(26, 11, 26, 13)
+        self.assertEqual(tst.buffer[0], "|..|    1,    1,l.|............|")
+        self.assertEqual(len(tst.buffer), 1 + 2)
+
+        # any further, lift first
+        tst.buffer = []
+        tst.drawStroke(28, 13, 28, 13)
+        self.assertEqual(tst.buffer[0], "|..|    0,    0,..|............|")
+        self.assertEqual(len(tst.buffer), 1 + 1 + 8)
 
+        tst.buffer = []
+        tst.drawStroke(60, 10, 60, 10)
+        self.assertEqual(tst.buffer[0], "|..|    0,    0,..|............|")
+        self.assertEqual(len(tst.buffer), 1 + 4 + 8)
@@ -0,0 +1,62 @@
+# unit tests for profiling.py
+import unittest
+
+import tasstuff.snes.mario_paint.profiling as profiling
+
+class test_FrameProfile(unittest.TestCase):
+
+    def test_add(self):
+        tst = profiling.FrameProfile()
+
+        tst.add(profiling.TAG_TRAVEL, 5)
+        tst.add(profiling.TAG_TRAVEL, 3)
+        tst.add(profiling.TAG_CLICK, 9)
+
+        self.assertEqual(tst.totals, {profiling.TAG_TRAVEL : 8,
+                                      profiling.TAG_CLICK  : 9})
+
+    def test_sections(self):
+        tst = profiling.FrameProfile()
+
+        tst.add(profiling.TAG_TRAVEL, 1)
+        tst.begin("outer")
+        tst.add(profiling.TAG_TRAVEL, 2)
+        tst.begin("inner")
+        tst.add(profiling.TAG_WAIT_UP, 4)
+
+        self.assertEqual(tst.end(), ("inner", {profiling.TAG_WAIT_UP : 4}))
+
+        tst.add(profiling.TAG_STROKE, 8)
+
+        self.assertEqual(tst.end(), ("outer", {profiling.TAG_TRAVEL  : 2,
+                                               profiling.TAG_WAIT_UP : 4,
+                                               profiling.TAG_STROKE  : 8}))
+        self.assertEqual([label for label, counts in tst.sections],
+                         ["inner", "outer"])
+        self.assertEqual(sum(tst.totals.values()), 15)
+
+        with self.assertRaises(ValueError):
+            tst.end()
+
+        tst.reset()
+        self.assertEqual(tst.totals, {})
+        self.assertEqual(tst.sections, [])
+
+    def test_report(self):
+        tst = profiling.FrameProfile()
+
+        self.assertEqual(tst.report(), "total: 0 frames")
+
+        tst.add(profiling.TAG_WAIT_DOWN, 1)
+        tst.add(profiling.TAG_TRAVEL, 3)
+
+        chk = tst.report().split("\n")
+
+        # biggest first
+        self.assertEqual(chk[0], "total: 4 frames")
+        self.assertIn(profiling.TAG_TRAVEL, chk[1])
+        self.assertIn("75.0%", chk[1])
+        self.assertIn(profiling.TAG_WAIT_DOWN, chk[2])
+
+        chk = tst.report({profiling.TAG_CLICK : 9}, "mask")
+        self.assertTrue(chk.startswith("mask: 9 frames"))
@@ -0,0 +1,112 @@
+# unit tests for strokes.py
+import os
+import random
+import tempfile
+import unittest
+
+from PIL import Image
+
+import tasstuff.snes.mario_paint.strokes as strokes
+
+class test_strokes(unittest.TestCase):
+
+    def build_bits(self, rows):
+        """Turns a list of strings into a mask, where # is black.
+
+        Args:
+            rows (list): one string per row, all the same length
+
+        Returns:
+            tuple: (width, height, bits)
+        """
+        width  = len(rows[0])
+        height = len(rows)
+        bits   = bytearray()
+
+        for row in rows:
+            bits.extend(1 if ("#" == c) else 0 for c in row)
+
+        return width, height, bits
+
+    def assertCovers(self, width, height, bits, found):
+        # every black pixel covered, no white pixel touched
+        drawn = bytearray(len(bits))
+
+        for stroke in found:
+            for px in strokes.runPixels(width, stroke):
+                self.assertTrue(bits[px])
+                drawn[px] = 1
+
+        self.assertEqual(drawn, bytearray(1 if b else 0 for b in bits))
+
+    def test_loadMask(self):
+        im = Image.new("RGB", (3, 2), (255, 255, 255))
+        im.putpixel((0, 0), (0, 0, 0))
+        im.putpixel((2, 1), (0, 0, 0))
+        im.putpixel((1, 1), (0, 0, 1))
+
+        handle, path = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+
+        try:
+            im.save(path)
+            chk = strokes.loadMask(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(chk, (3, 2, bytearray([1, 0, 0, 0, 0, 1])))
+
+    def test_findRuns(self):
+        width, height, bits = self.build_bits(["##.",
+                                               ".#.",
+                                               "..#"])
+
+        chk = set(strokes.findRuns(width, height, bits))
+
+        # horizontal
+        self.assertIn((0, 0, 1, 0), chk)
+        self.assertIn((1, 1, 1, 1), chk)
+        # vertical
+        self.assertIn((1, 0, 1, 1), chk)
+        self.assertIn((0, 0, 0, 0), chk)
+        # down and right
+        self.assertIn((0, 0, 2, 2), chk)
+        # up and right has nothing longer than one
+        self.assertIn((1, 0, 1, 0), chk)
+        self.assertNotIn((1, 1, 2, 0), chk)
+        self.assertNotIn((1, 1, 2, 2), chk)
+        self.assertEqual(len(chk), 7)
+
+    def test_runPixels(self):
+        self.assertEqual(strokes.runPixels(5, (1, 1, 3, 1)), [6, 7, 8])
+        self.assertEqual(strokes.runPixels(5, (2, 3, 2, 1)), [17, 12, 7])
+        self.assertEqual(strokes.runPixels(5, (0, 2, 2, 0)), [10, 6, 2])
+        self.assertEqual(strokes.runPixels(5, (4, 4, 4, 4)), [24])
+
+    def test_extractStrokes(self):
+        width, height, bits = self.build_bits(["##########..",
+                                               "#...........",
+                                               "#.....#.....",
+                                               "#......#....",
+                                               "#.......#..#"])
+
+        chk = strokes.extractStrokes(width, height, bits)
+
+        self.assertCovers(width, height, bits, chk)
+        self.assertEqual(len(chk), 4)
+
+    def test_extractStrokes_empty(self):
+        width, height, bits = self.build_bits(["....", "...."])
+
+        self.assertEqual(strokes.extractStrokes(width, height, bits), [])
+
+    def test_extractStrokes_random(self):
+        rng   = random.Random(1138)
+        rows  = ["".join("#" if (rng.random() < 0.4) else "." for x in range(30))
+                 for y in range(20)]
+
+        width, height, bits = self.build_bits(rows)
+        chk = strokes.extractStrokes(width, height, bits)
+
+        self.assertCovers(width, height, bits, chk)
+        self.assertLess(len(chk), sum(bits))